@@ -0,0 +1 @@
+"""Komponen komputasi (agregasi, cache, model) untuk dashboard streamlit_app.py."""
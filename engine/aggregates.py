@@ -0,0 +1,287 @@
+"""Tabel agregat siap pakai untuk panel dashboard.
+
+Semua tabel (termasuk tabel per pilihan dropdown: per negara, per hari,
+per segment, per cluster) dihitung sekali per versi data oleh cache warmer,
+sehingga panel hanya membaca hasilnya.
+"""
+
+import pandas as pd
+
+ORDER_DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+ORDER_MONTHS = [
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December"
+]
+
+
+# ======================= INDEKS BARIS =======================
+
+def row_index(df, column):
+    """Posisi baris transaksi per nilai kolom (mis. per RFM_Segment / Country)."""
+    return {key: rows for key, rows in df.groupby(column, observed=True).indices.items()}
+
+
+# ======================= TRANSAKSI: NEGARA & WAKTU =======================
+# agregasi transaksi dijalankan lewat query plan (engine/query_plans.py), di
+# memori (pandas) atau di-push ke DuckDB; di sini hanya finishing per panel
+
+def _split(grouped, column):
+    """Hasil plan dengan kunci ``column`` di depan -> dict nilai kunci -> tabel tanpa kolom tsb."""
+    return {
+        key: part.drop(columns=column).reset_index(drop=True)
+        for key, part in grouped.groupby(column, observed=True, sort=False)
+    }
+
+
+def country_overview(queries):
+    return queries.run("country_overview")
+
+
+def country_sales(queries, plan="country_sales", where=()):
+    country = (
+        queries.run(plan, where)
+        .set_index('Country')
+        .sort_values('TotalRevenue', ascending=False)
+    )
+
+    # Persentase pemasukan
+    country['RevenuePercentage'] = (
+        country['TotalRevenue'] / country['TotalRevenue'].sum() * 100
+    ).round(2)
+    return country
+
+
+def monthly_trend(monthly):
+    monthly = monthly.sort_values('InvoiceYearMonth').reset_index(drop=True)
+
+    # Average Order Value (AOV)
+    monthly['AOV'] = monthly['TotalAmount'] / monthly['Orders']
+    return monthly
+
+
+def day_sales(queries):
+    return (
+        queries.run("day_sales")
+        .set_index('DayName')
+        .reindex(ORDER_DAYS, fill_value=0)   # pastikan urut, hari tanpa transaksi = 0
+        .rename_axis('DayName')
+        .reset_index()
+    )
+
+
+def hourly_sales(hourly):
+    # Pastikan jam 0–23 muncul semua
+    all_hours = pd.DataFrame({"Hour": range(24)})
+    return all_hours.merge(hourly, on="Hour", how="left").fillna(0)
+
+
+def month_sales(queries):
+    return (
+        queries.run("month_sales")
+        .set_index('InvoiceMonthName')
+        .reindex(ORDER_MONTHS, fill_value=0)     # agar urut
+        .rename_axis('InvoiceMonthName')
+        .reset_index()
+    )
+
+
+# ======================= TRANSAKSI: RFM SEGMENT =======================
+
+def segment_counts(queries, total_customers):
+    counts = queries.run("segment_customers")
+
+    # Urutkan berdasarkan jumlah terbanyak
+    counts = counts.sort_values("Count", ascending=False)
+    counts["Percentage"] = (counts["Count"] / total_customers) * 100
+    return counts
+
+
+def segment_revenue(queries):
+    revenue = queries.run("segment_revenue")
+    revenue["Percentage"] = (
+        revenue["TotalRevenue"] / revenue["TotalRevenue"].sum() * 100
+    )
+    return revenue
+
+
+def segment_scores(seg_data):
+    """Rata-rata R/F/M score satu segment (untuk radar chart)."""
+    return {
+        "R": seg_data["R_Score"].mean(),
+        "F": seg_data["F_Score"].mean(),
+        "M": seg_data["M_Score"].mean(),
+    }
+
+
+def top_countries(countries, n=5):
+    return (
+        countries
+        .sort_values("Customer_Count", ascending=False)
+        .head(n)
+        .reset_index(drop=True)
+    )
+
+
+# ======================= CUSTOMER: CLUSTER =======================
+
+def cluster_distribution(data):
+    return (
+        data
+        .groupby("Cluster")["CustomerID"]
+        .nunique()
+        .reset_index(name="Customer_Count")
+        .sort_values("Customer_Count", ascending=False)
+    )
+
+
+def cluster_score_distribution(df_cluster):
+    """Jumlah customer per score 1–5 untuk R, F, dan M dalam satu cluster."""
+    plot_rows = []
+    for score in range(1, 6):
+        r_val = df_cluster[df_cluster["R_Score"] == score]["Recency"].count()
+        f_val = df_cluster[df_cluster["F_Score"] == score]["Frequency"].count()
+        m_val = df_cluster[df_cluster["M_Score"] == score]["Monetary"].count()
+
+        for metric, value in (("Recency", r_val), ("Frequency", f_val), ("Monetary", m_val)):
+            plot_rows.append({
+                "Score": f"Score {score}",
+                "Metric": metric,
+                "Value": value,
+                "Total_R": r_val,
+                "Total_F": f_val,
+                "Total_M": m_val
+            })
+    return pd.DataFrame(plot_rows)
+
+
+def cluster_revenue(data):
+    revenue = (
+        data
+        .dropna(subset=["Cluster"])
+        .groupby("Cluster")
+        .agg(TotalRevenue=("TotalAmount_total", "sum"))
+        .reset_index()
+    )
+    revenue["Percentage"] = (
+        revenue["TotalRevenue"] / revenue["TotalRevenue"].sum() * 100
+    )
+    return revenue
+
+
+def cluster_quantity(data):
+    return (
+        data
+        .dropna(subset=["Cluster"])
+        .groupby("Cluster")
+        .agg(TotalQuantity=("Quantity_total", "sum"))
+        .reset_index()
+        .sort_values("TotalQuantity", ascending=False)
+    )
+
+
+def cluster_segments(cluster_frame):
+    composition = (
+        cluster_frame
+        .dropna(subset=["RFM_Segment"])
+        .groupby("RFM_Segment")
+        .agg(Customer_Count=("CustomerID", "nunique"))
+        .reset_index()
+        .sort_values("Customer_Count", ascending=False)
+    )
+    composition["Percentage"] = (
+        composition["Customer_Count"] / composition["Customer_Count"].sum() * 100
+    )
+    return composition
+
+
+# ======================= CUSTOMER LIFETIME VALUE =======================
+
+def clv_by_group(customers, column):
+    """Ringkasan CLV per segment/cluster dari tabel customer yang sudah di-join CLV."""
+    return (
+        customers.dropna(subset=[column, "CLV"])
+        .groupby(column, observed=True)
+        .agg(
+            Customer_Count=("CustomerID", "nunique"),
+            TotalCLV=("CLV", "sum"),
+            AvgCLV=("CLV", "mean"),
+            AvgProbAlive=("ProbAlive", "mean"),
+            PredictedPurchases=("PredictedPurchases", "sum")
+        )
+        .reset_index()
+        .sort_values("AvgCLV", ascending=False)
+    )
+
+
+# ======================= TRANSAKSI: CLUSTER =======================
+
+CLUSTER_BREAKDOWNS = {"Produk": "Description", "Negara": "Country", "Bulan": "InvoiceYearMonth"}
+CLUSTER_PLANS = {"Description": "cluster_by_product", "Country": "cluster_by_country",
+                 "InvoiceYearMonth": "cluster_by_month"}
+
+
+# ======================= SEMUA TABEL =======================
+
+def build_aggregates(df, data, agg, labels=None, clv=None, queries=None):
+    from engine.query_plans import PandasQueries
+
+    queries = queries or PandasQueries(df, agg, labels)
+    segment_rows = row_index(df, "RFM_Segment")
+    country_rows = row_index(df, "Country")
+    clusters = sorted(data["Cluster"].dropna().unique())
+    customers_clv = clv.join(data) if clv is not None else None
+    # label cluster per baris transaksi diambil lewat kode customer (engine/labels.py)
+    # di pandas, atau lewat join tabel customer di SQL
+    with_clusters = labels is not None or queries.engine != "pandas"
+    hourly = _split(queries.run("hourly_by_day"), "DayName")
+    no_hours = pd.DataFrame({"Hour": pd.Series(dtype="int64"), "TransactionCount": pd.Series(dtype="int64")})
+
+    return {
+        "segment_rows": segment_rows,
+        "country_rows": country_rows,
+
+        "country_overview": country_overview(queries),
+        "country_sales": country_sales(queries),
+        "country_sales_excl_uk": country_sales(
+            queries, "country_sales_lines", where=[("Country", "!=", "United Kingdom")]
+        ),
+        "monthly": monthly_trend(queries.run("monthly")),
+        "monthly_by_country": {
+            country: monthly_trend(monthly)
+            for country, monthly in _split(queries.run("monthly_by_country"), "Country").items()
+        },
+        "monthly_by_segment": {
+            segment: monthly_trend(monthly)
+            for segment, monthly in _split(queries.run("monthly_by_segment"), "RFM_Segment").items()
+        },
+        "day_sales": day_sales(queries),
+        "hourly_by_day": {
+            day: hourly_sales(hourly.get(day, no_hours)) for day in ORDER_DAYS
+        },
+        "month_sales": month_sales(queries),
+
+        "segment_counts": segment_counts(queries, total_customers=len(data)),
+        "segment_revenue": segment_revenue(queries),
+        "segment_scores": {
+            segment: segment_scores(df.take(rows)) for segment, rows in segment_rows.items()
+        },
+        "top_countries_by_segment": {
+            segment: top_countries(countries)
+            for segment, countries in _split(queries.run("segment_countries"), "RFM_Segment").items()
+        },
+
+        "cluster_distribution": cluster_distribution(data),
+        "cluster_scores": {
+            cluster: cluster_score_distribution(data[data["Cluster"] == cluster]) for cluster in clusters
+        },
+        "cluster_revenue": cluster_revenue(data),
+        "cluster_quantity": cluster_quantity(data),
+        "cluster_segments": {
+            cluster: cluster_segments(data[data["Cluster"] == cluster]) for cluster in clusters
+        },
+        "segment_clv": clv_by_group(customers_clv, "RFM_Segment") if clv is not None else pd.DataFrame(),
+        "cluster_clv": clv_by_group(customers_clv, "Cluster") if clv is not None else pd.DataFrame(),
+        "cluster_breakdowns": {} if not with_clusters else {
+            name: queries.run(CLUSTER_PLANS[column]) for name, column in CLUSTER_BREAKDOWNS.items()
+        },
+    }
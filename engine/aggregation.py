@@ -0,0 +1,117 @@
+"""Backend agregasi groupby untuk tabel transaksi.
+
+Semua backend mengembalikan hasil yang sama dengan
+``df.groupby(by, observed=observed).agg(**aggs)``. Backend paralel membagi
+tabel menjadi beberapa partisi, mengagregasi tiap partisi di thread/process
+pool, lalu menggabungkan hasil parsialnya.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from itertools import repeat
+
+import numpy as np
+import pandas as pd
+
+from engine import config
+
+# fungsi agregasi yang hasil parsialnya bisa digabung ulang (partisi range)
+_DECOMPOSABLE = {"sum": "sum", "count": "sum", "size": "sum", "min": "min", "max": "max"}
+# nilai kategori yang tidak muncul di data (observed=False)
+_EMPTY_FILL = {"sum": 0, "count": 0, "size": 0, "nunique": 0}
+
+
+def _agg_partition(part, by, aggs):
+    return part.groupby(by, observed=True).agg(**aggs)
+
+
+class PandasBackend:
+    name = "pandas"
+
+    def groupby_agg(self, df, by, observed=False, **aggs):
+        return df.groupby(by, observed=observed).agg(**aggs)
+
+
+class PartitionedBackend(PandasBackend):
+    def __init__(self, name, executor, workers, partition="hash", min_rows=0):
+        self.name = name
+        self.executor = executor
+        self.workers = workers
+        self.partition = partition
+        self.min_rows = min_rows
+
+    def groupby_agg(self, df, by, observed=False, **aggs):
+        if self.workers < 2 or len(df) < self.min_rows:
+            return super().groupby_agg(df, by, observed=observed, **aggs)
+
+        keys = [by] if isinstance(by, str) else list(by)
+        funcs = [func for _, func in aggs.values()]
+
+        if self.partition == "range" and all(func in _DECOMPOSABLE for func in funcs):
+            bounds = np.linspace(0, len(df), self.workers + 1).astype(np.int64)
+            parts = [df.iloc[lo:hi] for lo, hi in zip(bounds[:-1], bounds[1:])]
+            partial = pd.concat(self.executor.map(_agg_partition, parts, repeat(by), repeat(aggs)))
+            merged = partial.groupby(level=list(range(len(keys))), observed=True).agg(
+                {col: _DECOMPOSABLE[func] for col, (_, func) in aggs.items()}
+            )
+        else:
+            # Partisi hash: setiap grup utuh berada di satu partisi,
+            # sehingga hasil parsial cukup disambung lalu diurutkan.
+            parts = self._hash_partitions(df, keys)
+            merged = pd.concat(self.executor.map(_agg_partition, parts, repeat(by), repeat(aggs)))
+            merged = merged.sort_index()
+
+        if not observed:
+            merged = self._add_unobserved(merged, df, keys, aggs)
+        return merged
+
+    def _hash_partitions(self, df, keys):
+        if len(keys) == 1 and isinstance(df[keys[0]].dtype, pd.CategoricalDtype):
+            codes = df[keys[0]].cat.codes.to_numpy().astype(np.int64)
+        else:
+            codes = pd.util.hash_pandas_object(df[keys], index=False).to_numpy()
+        pid = (codes % self.workers).astype(np.int16)
+
+        # urutan stabil: baris dalam satu partisi tetap berurutan seperti aslinya
+        order = np.argsort(pid, kind="stable")
+        bounds = np.concatenate([[0], np.cumsum(np.bincount(pid, minlength=self.workers))])
+        return [df.take(order[lo:hi]) for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+    @staticmethod
+    def _add_unobserved(result, df, keys, aggs):
+        """Tambahkan kategori yang tidak muncul, seperti groupby(observed=False)."""
+        dtypes = [df[key].dtype for key in keys]
+        if not any(isinstance(dtype, pd.CategoricalDtype) for dtype in dtypes):
+            return result
+
+        levels = []
+        for key, dtype in zip(keys, dtypes):
+            if isinstance(dtype, pd.CategoricalDtype):
+                levels.append(pd.CategoricalIndex(dtype.categories, dtype=dtype, name=key))
+            else:
+                levels.append(result.index.get_level_values(key).unique().sort_values())
+        full = levels[0] if len(levels) == 1 else pd.MultiIndex.from_product(levels)
+
+        out = result.reindex(full)
+        for col, (_, func) in aggs.items():
+            if func in _EMPTY_FILL:
+                out[col] = out[col].fillna(_EMPTY_FILL[func]).astype(result[col].dtype)
+        return out
+
+
+@lru_cache(maxsize=None)
+def get_backend(name=None, workers=None, partition=None):
+    """Backend sesuai config (DASHBOARD_AGG_BACKEND); dibuat sekali per proses."""
+    name = name or config.AGG_BACKEND
+    workers = workers or config.AGG_WORKERS
+    partition = partition or config.AGG_PARTITION
+
+    if name == "pandas":
+        return PandasBackend()
+    if name == "threads":
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="agg")
+    elif name == "processes":
+        executor = ProcessPoolExecutor(max_workers=workers)
+    else:
+        raise ValueError(f"Backend agregasi tidak dikenal: {name!r}")
+    return PartitionedBackend(name, executor, workers, partition, config.AGG_MIN_ROWS)
@@ -0,0 +1,77 @@
+"""Average Order Value (AOV) per customer dan distribusinya per RFM segment.
+
+Revenue dan jumlah order per customer dihitung langsung dari ID yang sudah
+di-encode menjadi integer (bincount), tanpa groupby string dua kolom.
+
+Tabel customer (customer_segmentation.csv) tidak dipakai sebagai jalan pintas.
+Kolom ``Frequency``-nya menghitung baris invoice, bukan invoice unik, dan
+transaksi sudah dibersihkan. Memastikan semua customer konsisten juga butuh
+scan transaksi yang sama dengan menghitungnya langsung.
+"""
+
+import numpy as np
+import pandas as pd
+
+PERCENTILES = (0.25, 0.5, 0.75, 0.9)
+
+
+def _amount(series):
+    values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.nan_to_num(values, nan=0.0)
+
+
+def customer_orders(df):
+    """Revenue dan jumlah invoice unik per (CustomerID, RFM_Segment)."""
+    cust_codes, customers = pd.factorize(df["CustomerID"])
+    seg_codes, segments = pd.factorize(df["RFM_Segment"])
+    inv_codes, invoices = pd.factorize(df["InvoiceNo"])
+
+    valid = (cust_codes >= 0) & (seg_codes >= 0)
+    pair = cust_codes[valid].astype(np.int64) * max(len(segments), 1) + seg_codes[valid]
+    pair_keys, pair_idx = np.unique(pair, return_inverse=True)
+
+    revenue = np.bincount(pair_idx, weights=_amount(df["TotalAmount"])[valid], minlength=len(pair_keys))
+
+    # invoice unik per pasangan: kunci (pasangan, invoice) yang berbeda
+    inv = inv_codes[valid]
+    has_inv = inv >= 0
+    order_keys = np.unique(pair_idx[has_inv].astype(np.int64) * max(len(invoices), 1) + inv[has_inv])
+    orders = np.bincount(order_keys // max(len(invoices), 1), minlength=len(pair_keys))
+
+    n_seg = max(len(segments), 1)
+    return pd.DataFrame({
+        "CustomerID": np.asarray(customers, dtype=object)[pair_keys // n_seg],
+        "RFM_Segment": np.asarray(segments, dtype=object)[pair_keys % n_seg],
+        "TotalRevenue": revenue,
+        "TotalOrders": orders,
+    })
+
+
+class AOVEngine:
+    def __init__(self, customers):
+        customers = customers.copy()
+        # customer tanpa order -> AOV kosong (bukan tak hingga)
+        customers["AOV"] = customers["TotalRevenue"] / customers["TotalOrders"].where(customers["TotalOrders"] > 0)
+        self.customers = customers
+        self.segments = self._summarise(customers)
+
+    @classmethod
+    def from_transactions(cls, df):
+        return cls(customer_orders(df))
+
+    @staticmethod
+    def _summarise(customers):
+        grouped = customers.groupby("RFM_Segment")
+        summary = grouped.agg(
+            Avg_AOV=("AOV", "mean"),
+            Customer_Count=("CustomerID", "nunique"),
+        )
+        quantiles = grouped["AOV"].quantile(list(PERCENTILES)).unstack()
+        quantiles.columns = [f"P{int(q * 100)}_AOV" for q in PERCENTILES]
+        summary = summary.join(quantiles)
+        summary["Median_AOV"] = summary["P50_AOV"]
+        return summary.reset_index().sort_values("Avg_AOV", ascending=False)
+
+    def segment_summary(self):
+        """Avg/median/persentil AOV dan jumlah customer per segment (urut Avg_AOV)."""
+        return self.segments
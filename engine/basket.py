@@ -0,0 +1,268 @@
+"""Market basket analysis: association rule antar produk per RFM segment / cluster.
+
+Setiap invoice adalah satu keranjang. Keranjang disimpan sebagai matriks
+sparse boolean (invoice x StockCode, CSR) dan tidak pernah diubah menjadi
+matriks dense:
+
+- item dengan support < ``min_support`` dibuang lebih dulu (pruning)
+- pasangan item dihitung dengan perkalian sparse ``X.T @ X``
+- itemset >= 3 item diperluas dari itemset frequent sebelumnya
+  (irisan daftar invoice per item), kandidat hanya dari pasangan frequent
+
+Opsional: FP-growth dari ``mlxtend`` (``DASHBOARD_BASKET_METHOD=fpgrowth``);
+jika mlxtend tidak terpasang, miner sparse di atas yang dipakai. Mining per
+segment / cluster berjalan paralel di thread pool.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from math import ceil
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from engine import config
+from engine.labels import CustomerLabels
+
+RULE_COLUMNS = [
+    "Antecedents", "Consequent", "AntecedentDescription", "ConsequentDescription",
+    "Count", "Support", "Confidence", "Lift",
+]
+
+
+# ======================= MATRIKS KERANJANG =======================
+
+class Baskets:
+    """Matriks invoice x produk (sparse boolean) beserta label baris/kolomnya."""
+
+    def __init__(self, matrix, invoices, items, descriptions):
+        self.matrix = matrix
+        self.invoices = invoices
+        self.items = items
+        self.descriptions = descriptions
+
+    @classmethod
+    def from_transactions(cls, df, basket="InvoiceNo", item="StockCode", purchases=None):
+        """Keranjang dari transaksi. Jika ``purchases`` (PurchaseMatrix) diberikan,
+        kolom matriks memakai kode produk yang sama dengan matriks pembelian."""
+        # baris pembelian saja (tanpa invoice pembatalan / quantity <= 0)
+        valid = (
+            df[basket].notna()
+            & df[item].notna()
+            & ~df[basket].astype("string").str.startswith("C").fillna(False)
+            & (pd.to_numeric(df["Quantity"], errors="coerce") > 0)
+        ).to_numpy()
+        rows = df.loc[valid]
+
+        if purchases is not None:
+            item_codes = purchases.products.encode(rows[item], grow=False)
+            rows = rows.loc[item_codes >= 0]
+            item_codes = item_codes[item_codes >= 0]
+            items, descriptions = purchases.products.keys, purchases.descriptions
+        else:
+            item_codes, items = pd.factorize(rows[item])
+            # deskripsi = deskripsi pertama yang muncul untuk tiap produk
+            _, first = np.unique(item_codes, return_index=True)
+            descriptions = rows["Description"].astype("string").fillna("").to_numpy(dtype=object)[first]
+        inv_codes, invoices = pd.factorize(rows[basket])
+
+        matrix = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=bool), (inv_codes, item_codes)),
+            shape=(len(invoices), len(items)),
+        )
+        # item yang sama beberapa kali dalam satu invoice -> tetap True
+        matrix.sum_duplicates()
+        return cls(matrix, np.asarray(invoices), np.asarray(items), descriptions)
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    def subset(self, rows):
+        """Keranjang untuk sebagian invoice (posisi baris)."""
+        return Baskets(self.matrix[rows], self.invoices[rows], self.items, self.descriptions)
+
+
+def invoice_groups(df, baskets, column, basket="InvoiceNo"):
+    """Posisi baris keranjang per nilai ``column`` (nilai baris pertama tiap invoice)."""
+    first = df.drop_duplicates(basket).set_index(basket)[column]
+    labels = first.reindex(baskets.invoices).reset_index(drop=True)
+    return dict(labels.groupby(labels, observed=True).indices)
+
+
+# ======================= FREQUENT ITEMSETS =======================
+
+def _pairs(X, min_count):
+    co = sparse.triu(X.T @ X, k=1).tocoo()
+    keep = co.data >= min_count
+    return co.row[keep], co.col[keep], co.data[keep]
+
+
+def frequent_itemsets(matrix, min_support, max_len=3):
+    """Itemset frequent -> jumlah invoice, sebagai dict ``{tuple(kolom): count}``."""
+    n_baskets = matrix.shape[0]
+    if n_baskets == 0:
+        return {}
+    min_count = max(1, ceil(min_support * n_baskets))
+
+    counts = np.asarray(matrix.sum(axis=0)).ravel()
+    keep = np.flatnonzero(counts >= min_count)
+    itemsets = {(int(i),): int(counts[i]) for i in keep}
+    if max_len < 2 or len(keep) < 2:
+        return itemsets
+
+    X = matrix[:, keep].astype(np.int32).tocsr()
+    X = X[np.diff(X.indptr) >= 2]   # keranjang 1 item tidak ikut pasangan
+    rows, cols, pair_counts = _pairs(X, min_count)
+
+    frequent_pair = np.zeros((len(keep), len(keep)), dtype=bool)
+    frequent_pair[rows, cols] = True
+    level = {}
+    for a, b, count in zip(rows, cols, pair_counts):
+        level[(int(a), int(b))] = int(count)
+
+    found = dict(level)
+    X_csc = X.tocsc()
+    for _ in range(3, max_len + 1):
+        next_level = {}
+        for prefix in level:
+            # kandidat c > item terakhir yang berpasangan frequent dengan semua item prefix
+            candidates = frequent_pair[list(prefix)].all(axis=0)
+            candidates[: prefix[-1] + 1] = False
+            if not candidates.any():
+                continue
+
+            tids = X_csc.indices[X_csc.indptr[prefix[0]]:X_csc.indptr[prefix[0] + 1]]
+            for i in prefix[1:]:
+                tids = np.intersect1d(tids, X_csc.indices[X_csc.indptr[i]:X_csc.indptr[i + 1]], assume_unique=True)
+            if len(tids) < min_count:
+                continue
+
+            ext = np.bincount(X[tids].indices, minlength=len(keep))
+            for c in np.flatnonzero(candidates & (ext >= min_count)):
+                next_level[prefix + (int(c),)] = int(ext[c])
+        if not next_level:
+            break
+        found.update(next_level)
+        level = next_level
+
+    itemsets.update({tuple(int(keep[i]) for i in items): count for items, count in found.items()})
+    return itemsets
+
+
+def frequent_itemsets_fpgrowth(matrix, min_support, max_len=3):
+    """Sama seperti ``frequent_itemsets`` tetapi memakai FP-growth mlxtend."""
+    from mlxtend.frequent_patterns import fpgrowth
+
+    n_baskets = matrix.shape[0]
+    if n_baskets == 0:
+        return {}
+    counts = np.asarray(matrix.sum(axis=0)).ravel()
+    keep = np.flatnonzero(counts >= max(1, ceil(min_support * n_baskets)))
+    if len(keep) == 0:
+        return {}
+
+    frame = pd.DataFrame.sparse.from_spmatrix(
+        matrix[:, keep].tocsc(), columns=[str(i) for i in keep]
+    ).astype(pd.SparseDtype(bool, False))
+    result = fpgrowth(frame, min_support=min_support, use_colnames=True, max_len=max_len)
+    return {
+        tuple(sorted(int(i) for i in items)): int(round(support * n_baskets))
+        for items, support in zip(result["itemsets"], result["support"])
+    }
+
+
+# ======================= ASSOCIATION RULES =======================
+
+def association_rules(itemsets, baskets, min_confidence=0.2, min_lift=1.0):
+    """Rule ``antecedents -> consequent`` (consequent satu item) dari itemset frequent."""
+    n_baskets = len(baskets)
+    rows = []
+    for items, count in itemsets.items():
+        if len(items) < 2:
+            continue
+        for j, consequent in enumerate(items):
+            antecedents = items[:j] + items[j + 1:]
+            confidence = count / itemsets[antecedents]
+            lift = confidence / (itemsets[(consequent,)] / n_baskets)
+            if confidence >= min_confidence and lift >= min_lift:
+                rows.append((antecedents, consequent, count, confidence, lift))
+
+    if not rows:
+        return pd.DataFrame(columns=RULE_COLUMNS)
+
+    antecedents, consequents, counts, confidence, lift = zip(*rows)
+    rules = pd.DataFrame({
+        "Antecedents": [tuple(baskets.items[list(a)]) for a in antecedents],
+        "Consequent": baskets.items[list(consequents)],
+        "AntecedentDescription": [", ".join(baskets.descriptions[list(a)]) for a in antecedents],
+        "ConsequentDescription": baskets.descriptions[list(consequents)],
+        "Count": counts,
+        "Support": np.asarray(counts) / n_baskets,
+        "Confidence": confidence,
+        "Lift": lift,
+    })
+    return rules.sort_values(
+        ["Lift", "Confidence", "AntecedentDescription", "ConsequentDescription"],
+        ascending=[False, False, True, True],
+    ).reset_index(drop=True)
+
+
+def mine_rules(baskets, min_support, min_confidence, max_len=3, method="sparse"):
+    if method == "fpgrowth":
+        try:
+            itemsets = frequent_itemsets_fpgrowth(baskets.matrix, min_support, max_len)
+        except ImportError:
+            itemsets = frequent_itemsets(baskets.matrix, min_support, max_len)
+    else:
+        itemsets = frequent_itemsets(baskets.matrix, min_support, max_len)
+    return association_rules(itemsets, baskets, min_confidence)
+
+
+# ======================= ENGINE PER SEGMENT / CLUSTER =======================
+
+class BasketEngine:
+    def __init__(self, rules, basket_counts, params):
+        self._rules = rules                  # {(dimensi, grup): DataFrame rule}
+        self.basket_counts = basket_counts   # {(dimensi, grup): jumlah invoice}
+        self.params = params
+
+    @classmethod
+    def from_transactions(cls, df, data, min_support=None, min_confidence=None,
+                          max_len=None, method=None, workers=None, min_baskets=None, purchases=None,
+                          labels=None):
+        params = {
+            "min_support": min_support or config.BASKET_MIN_SUPPORT,
+            "min_confidence": min_confidence or config.BASKET_MIN_CONFIDENCE,
+            "max_len": max_len or config.BASKET_MAX_LEN,
+            "method": method or config.BASKET_METHOD,
+        }
+        min_baskets = config.BASKET_MIN_BASKETS if min_baskets is None else min_baskets
+
+        baskets = Baskets.from_transactions(df, purchases=purchases)
+        labels = labels or CustomerLabels.build(df, data)
+        tagged = df.assign(Cluster=labels.cluster_of_rows())
+
+        groups = {}
+        for dimension, column in (("segment", "RFM_Segment"), ("cluster", "Cluster")):
+            for key, rows in invoice_groups(tagged, baskets, column).items():
+                groups[(dimension, key)] = rows
+
+        def mine(key):
+            subset = baskets.subset(groups[key])
+            if len(subset) < min_baskets:
+                return pd.DataFrame(columns=RULE_COLUMNS)
+            return mine_rules(subset, **params)
+
+        with ThreadPoolExecutor(max_workers=workers or config.BASKET_WORKERS) as pool:
+            mined = dict(zip(groups, pool.map(mine, groups)))
+        return cls(mined, {key: len(rows) for key, rows in groups.items()}, params)
+
+    def groups(self, dimension):
+        return sorted(key for dim, key in self._rules if dim == dimension)
+
+    def rules(self, dimension, group, n=None):
+        """Rule untuk satu segment/cluster, urut dari lift tertinggi."""
+        rules = self._rules.get((dimension, group))
+        if rules is None:
+            return pd.DataFrame(columns=RULE_COLUMNS)
+        return rules if n is None else rules.head(n)
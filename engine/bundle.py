@@ -0,0 +1,180 @@
+"""Format bundle model clustering tanpa pickle.
+
+``clustering_bundle.pkl`` (joblib) berisi objek sklearn: PowerTransformer
+(Yeo-Johnson) -> StandardScaler untuk Recency/Frequency/Monetary, lalu
+MiniBatchKMeans pada fitur hasil scaling + Quantity_total dan UnitPrice_avg.
+Modul ini mengekspor parameter numeriknya saja ke file ``.npz`` dan
+menyediakan inferensi NumPy murni, sehingga saat serving tidak perlu
+import sklearn maupun unpickle.
+
+Ekspor (butuh sklearn + joblib, cukup sekali setelah training)::
+
+    python -m engine.bundle clustering_bundle.pkl clustering_bundle.npz
+"""
+
+import json
+import sys
+
+import numpy as np
+
+FORMAT_VERSION = 1
+_EPS = np.spacing(1.0)
+
+
+def _yeo_johnson(x, lmbda):
+    out = np.empty_like(x)
+    pos = x >= 0
+
+    if abs(lmbda) < _EPS:
+        out[pos] = np.log1p(x[pos])
+    else:
+        out[pos] = (np.power(x[pos] + 1, lmbda) - 1) / lmbda
+
+    if abs(lmbda - 2) > _EPS:
+        out[~pos] = -(np.power(-x[~pos] + 1, 2 - lmbda) - 1) / (2 - lmbda)
+    else:
+        out[~pos] = -np.log1p(-x[~pos])
+    return out
+
+
+def _box_cox(x, lmbda):
+    if lmbda == 0:
+        return np.log(x)
+    return (np.power(x, lmbda) - 1) / lmbda
+
+
+class ClusteringModel:
+    """Inferensi bundle clustering dengan NumPy saja."""
+
+    def __init__(self, arrays, meta):
+        self.meta = meta
+        self.lambdas = arrays["power_lambdas"]
+        self.power_mean = arrays["power_mean"]
+        self.power_scale = arrays["power_scale"]
+        self.scaler_mean = arrays["scaler_mean"]
+        self.scaler_scale = arrays["scaler_scale"]
+        self.centers = arrays["cluster_centers"]
+
+        self.features = meta["features"]              # input PowerTransformer
+        self.model_features = meta["model_features"]  # input KMeans
+        self.passthrough = meta["passthrough_features"]
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as npz:
+            arrays = {name: npz[name] for name in npz.files}
+        meta = json.loads(str(arrays.pop("meta")))
+        if meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Versi format bundle tidak didukung: {meta.get('format_version')}")
+        return cls(arrays, meta)
+
+    @property
+    def n_clusters(self):
+        return len(self.centers)
+
+    def scale_rfm(self, X):
+        """PowerTransformer + StandardScaler untuk kolom ``self.features``."""
+        X = np.asarray(X, dtype=np.float64)
+        out = np.empty_like(X)
+        transform = _box_cox if self.meta["power_method"] == "box-cox" else _yeo_johnson
+        for j, lmbda in enumerate(self.lambdas):
+            out[:, j] = transform(X[:, j], lmbda)
+        if self.meta["power_standardize"]:
+            out = (out - self.power_mean) / self.power_scale
+        return (out - self.scaler_mean) / self.scaler_scale
+
+    def transform(self, frame):
+        """DataFrame customer -> matriks fitur KMeans (urut ``self.model_features``)."""
+        scaled = self.scale_rfm(frame[self.features].to_numpy(dtype=np.float64))
+        if not self.passthrough:
+            return scaled
+        extra = frame[self.passthrough].to_numpy(dtype=np.float64)
+        return np.hstack([scaled, extra])
+
+    def predict_features(self, X):
+        """Cluster terdekat untuk matriks fitur hasil ``transform``."""
+        X = np.asarray(X, dtype=np.float64)
+        distances = (
+            (X * X).sum(axis=1)[:, None]
+            - 2 * X @ self.centers.T
+            + (self.centers * self.centers).sum(axis=1)[None, :]
+        )
+        return distances.argmin(axis=1).astype(np.int32)
+
+    def predict(self, frame):
+        return self.predict_features(self.transform(frame))
+
+
+def export_bundle(src, dst, verify=True):
+    """Ekspor bundle joblib (sklearn) ke format .npz; dijalankan di lingkungan training."""
+    import joblib
+
+    bundle = joblib.load(src)
+    power, scaler, model = bundle["power_transformer"], bundle["scaler"], bundle["model"]
+
+    features = [str(f) for f in bundle["features"]]
+    model_features = [str(f) for f in getattr(model, "feature_names_in_", [])]
+    if not model_features:
+        model_features = [f"{f}_scaled" for f in features]
+    passthrough = model_features[len(features):]
+
+    if power.standardize:
+        power_mean, power_scale = power._scaler.mean_, power._scaler.scale_
+    else:
+        power_mean, power_scale = np.zeros(len(features)), np.ones(len(features))
+    scaler_mean = scaler.mean_ if scaler.with_mean else np.zeros(len(features))
+    scaler_scale = scaler.scale_ if scaler.with_std else np.ones(len(features))
+
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "features": features,
+        "model_features": model_features,
+        "passthrough_features": passthrough,
+        "power_method": power.method,
+        "power_standardize": bool(power.standardize),
+        "model_type": str(bundle.get("model_type", type(model).__name__)),
+        "n_clusters": int(model.n_clusters),
+        "pipeline_order": [str(step) for step in bundle.get("pipeline_order", [])],
+        "model_params": {k: (v.item() if hasattr(v, "item") else v) for k, v in model.get_params().items()},
+        "created_at": str(bundle.get("created_at", "")),
+    }
+
+    np.savez(
+        dst,
+        meta=np.array(json.dumps(meta)),
+        power_lambdas=np.asarray(power.lambdas_, dtype=np.float64),
+        power_mean=np.asarray(power_mean, dtype=np.float64),
+        power_scale=np.asarray(power_scale, dtype=np.float64),
+        scaler_mean=np.asarray(scaler_mean, dtype=np.float64),
+        scaler_scale=np.asarray(scaler_scale, dtype=np.float64),
+        cluster_centers=np.asarray(model.cluster_centers_, dtype=np.float64),
+    )
+
+    if verify:
+        _verify_export(dst, power, scaler, model, features, passthrough)
+
+
+def _verify_export(path, power, scaler, model, features, passthrough, n=5000):
+    """Bandingkan inferensi NumPy dengan sklearn pada data acak."""
+    import pandas as pd
+
+    rng = np.random.default_rng(0)
+    probe = pd.DataFrame({col: rng.lognormal(3, 2, n) for col in features + passthrough})
+    probe[features[0]] = rng.integers(0, 400, n)
+
+    clustering = ClusteringModel.load(path)
+    scaled = scaler.transform(power.transform(probe[features]))
+    expected = model.predict(pd.DataFrame(
+        np.hstack([scaled, probe[passthrough].to_numpy()]), columns=clustering.model_features
+    ))
+    if not np.allclose(clustering.scale_rfm(probe[features]), scaled):
+        raise AssertionError("Hasil transformasi NumPy berbeda dengan sklearn")
+    if not (clustering.predict(probe) == expected).all():
+        raise AssertionError("Prediksi cluster NumPy berbeda dengan sklearn")
+
+
+if __name__ == "__main__":
+    src = sys.argv[1] if len(sys.argv) > 1 else "clustering_bundle.pkl"
+    dst = sys.argv[2] if len(sys.argv) > 2 else "clustering_bundle.npz"
+    export_bundle(src, dst)
+    print(f"Bundle diekspor ke {dst}")
@@ -0,0 +1,117 @@
+"""Pembersihan tabel transaksi saat ingest: rule berbasis mask, tanpa iterasi baris.
+
+Setiap rule adalah fungsi ``(df, thresholds) -> mask boolean`` yang dievaluasi
+sekali untuk seluruh kolom. Baris yang terkena minimal satu rule aktif
+dipindahkan ke tabel karantina beserta nama rule pertama yang cocok
+(urutan ``RULES``); sisanya menjadi tabel transaksi bersih yang dipakai
+semua tahap berikutnya (agregat, CLV, cohort, forecast, ...).
+
+Rule aktif diatur lewat ``DASHBOARD_CLEAN_RULES``. Ambang order grosir
+ekstrem dihitung robust dari distribusi log Quantity baris yang valid:
+``exp(median + z * 1.4826 * MAD)``, dengan ``z = DASHBOARD_CLEAN_OUTLIER_Z``.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from engine import config
+
+
+def _cancelled(df, thresholds):
+    return df["InvoiceNo"].astype("string").str.startswith("C").fillna(False).to_numpy(dtype=bool)
+
+
+def _non_positive_quantity(df, thresholds):
+    return ~(df["Quantity"].to_numpy(dtype=np.float64, na_value=np.nan) > 0)
+
+
+def _non_positive_price(df, thresholds):
+    return ~(df["UnitPrice"].to_numpy(dtype=np.float64, na_value=np.nan) > 0)
+
+
+def _extreme_quantity(df, thresholds):
+    return df["Quantity"].to_numpy(dtype=np.float64, na_value=np.nan) > thresholds["max_quantity"]
+
+
+# nama -> (keterangan, fungsi mask)
+RULES = {
+    "cancelled": ("Invoice dibatalkan (InvoiceNo diawali 'C')", _cancelled),
+    "non_positive_quantity": ("Quantity <= 0 (retur / koreksi stok)", _non_positive_quantity),
+    "non_positive_price": ("UnitPrice <= 0 (bonus / penyesuaian)", _non_positive_price),
+    "extreme_quantity": ("Quantity ekstrem (order grosir outlier)", _extreme_quantity),
+}
+
+
+def quantity_threshold(quantity, z=None):
+    """Ambang Quantity ekstrem: exp(median + z * 1.4826 * MAD) pada log Quantity positif."""
+    z = config.CLEAN_OUTLIER_Z if z is None else z
+    logs = np.log(quantity[quantity > 0])
+    if len(logs) == 0 or z <= 0:
+        return np.inf
+    median = np.median(logs)
+    mad = 1.4826 * np.median(np.abs(logs - median))
+    return float(np.exp(median + z * max(mad, 1e-9)))
+
+
+def clean_transactions(df, rules=None, z=None):
+    """(tabel bersih, ``Quarantine``) dari tabel transaksi ``df``."""
+    rules = config.CLEAN_RULES if rules is None else rules
+    unknown = [rule for rule in rules if rule not in RULES]
+    if unknown:
+        raise ValueError(f"Rule cleaning tidak dikenal: {unknown}")
+    rules = [rule for rule in RULES if rule in rules]
+
+    # ambang outlier dihitung dari baris yang bukan pembatalan/retur
+    quantity = df["Quantity"].to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = ~_cancelled(df, {}) & (quantity > 0)
+    thresholds = {"max_quantity": quantity_threshold(quantity[valid], z)}
+
+    masks = np.zeros((len(df), len(rules)), dtype=bool)
+    for i, rule in enumerate(rules):
+        masks[:, i] = RULES[rule][1](df, thresholds)
+    flagged = masks.any(axis=1)
+    first = masks.argmax(axis=1)[flagged]
+
+    amount = df["TotalAmount"].to_numpy(dtype=np.float64, na_value=0.0)[flagged]
+    summary = pd.DataFrame({
+        "Rule": rules,
+        "Keterangan": [RULES[rule][0] for rule in rules],
+        "Matched": masks.sum(axis=0),                       # semua baris yang cocok (bisa tumpang tindih)
+        "Quarantined": np.bincount(first, minlength=len(rules)),  # per rule pertama yang cocok
+        "TotalAmount": np.bincount(first, weights=amount, minlength=len(rules)),
+    })
+    rows = df.loc[flagged].assign(QuarantineRule=np.asarray(rules, dtype=object)[first])
+    return df.loc[~flagged], Quarantine(rows, summary, thresholds["max_quantity"], len(df))
+
+
+class Quarantine:
+    def __init__(self, rows, summary, max_quantity, total_rows):
+        self.rows = rows                  # baris yang dikeluarkan + kolom QuarantineRule
+        self.summary = summary            # jumlah baris dan TotalAmount per rule
+        self.max_quantity = max_quantity  # ambang Quantity ekstrem yang dipakai
+        self.total_rows = total_rows      # jumlah baris sebelum cleaning
+
+    def save(self, path):
+        """Simpan ke ``<path>.parquet`` (baris) dan ``<path>.json`` (ringkasan, ditulis terakhir)."""
+        tmp = f"{path}.tmp-{os.getpid()}"
+        self.rows.to_parquet(tmp, index=False)
+        os.replace(tmp, f"{path}.parquet")
+        with open(tmp, "w") as f:
+            json.dump({
+                "max_quantity": self.max_quantity,
+                "total_rows": self.total_rows,
+                "summary": self.summary.to_dict(orient="records"),
+            }, f, indent=2)
+        os.replace(tmp, f"{path}.json")
+
+    @classmethod
+    def load(cls, path):
+        with open(f"{path}.json") as f:
+            meta = json.load(f)
+        return cls(
+            pd.read_parquet(f"{path}.parquet"), pd.DataFrame(meta["summary"]),
+            meta["max_quantity"], meta["total_rows"],
+        )
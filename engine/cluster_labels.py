@@ -0,0 +1,172 @@
+"""Label cluster yang stabil walaupun model di-retrain.
+
+KMeans memberi id cluster secara acak setiap training, sehingga nama,
+warna, dan insight yang ditulis untuk "Cluster 1" bisa tertukar. File
+``cluster_labels.json`` menyimpan id stabil beserta nama/warna/insight-nya,
+centroid referensi (centroid bundle sebelumnya, diurutkan per id stabil),
+dan pemetaan id mentah bundle saat ini -> id stabil.
+
+Saat bundle berubah, centroid baru dicocokkan dengan centroid referensi
+memakai Hungarian matching (``scipy.optimize.linear_sum_assignment``) pada
+jarak antar centroid, lalu pemetaan dan referensi diperbarui. Semua panel
+membaca id stabil, nama, dan warna dari sini.
+"""
+
+import hashlib
+import json
+import os
+import sys
+
+import numpy as np
+
+from engine import config
+
+# warna untuk cluster baru yang belum punya label (model dengan cluster lebih banyak)
+FALLBACK_COLORS = ["#8E44AD", "#16A085", "#F39C12", "#7F8C8D", "#2C3E50", "#C0392B"]
+
+
+def centers_hash(centers):
+    return hashlib.sha1(np.ascontiguousarray(centers, dtype=np.float64).tobytes()).hexdigest()
+
+
+def match_centers(reference, centers):
+    """Id mentah (baris ``centers``) -> indeks baris ``reference`` dengan total jarak minimum.
+
+    Tiap fitur dinormalisasi dengan sebaran centroid referensi supaya fitur
+    berskala besar (mis. Quantity_total) tidak mendominasi jarak.
+    """
+    from scipy.optimize import linear_sum_assignment
+
+    reference = np.asarray(reference, dtype=np.float64)
+    centers = np.asarray(centers, dtype=np.float64)
+    scale = reference.std(axis=0)
+    scale[scale == 0] = 1.0
+
+    diff = centers[:, None, :] / scale - reference[None, :, :] / scale
+    cost = np.sqrt((diff ** 2).sum(axis=2))
+    rows, cols = linear_sum_assignment(cost)
+    return dict(zip(rows.tolist(), cols.tolist()))
+
+
+class ClusterLabels:
+    def __init__(self, doc):
+        self.doc = doc
+        self.labels = {int(label["id"]): label for label in doc["labels"]}
+        self.raw_to_stable = {int(raw): int(stable) for raw, stable in doc["raw_to_stable"].items()}
+        self.saved = False  # True jika reconcile_with_bundle baru menulis file ini
+
+    @property
+    def version(self):
+        """Hash pemetaan id mentah -> id stabil yang dipakai kolom ``Cluster``."""
+        mapping = json.dumps(self.raw_to_stable, sort_keys=True)
+        return hashlib.sha1(mapping.encode()).hexdigest()[:16]
+
+    @classmethod
+    def load(cls, path=None):
+        with open(path or config.CLUSTER_LABELS_PATH, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def save(self, path=None):
+        path = path or config.CLUSTER_LABELS_PATH
+        tmp = f"{path}.tmp-{os.getpid()}"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.doc, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        os.replace(tmp, path)
+
+    # ======================= REKONSILIASI =======================
+
+    def reconcile(self, centers, model_features=None):
+        """Label untuk bundle dengan ``centers``; sama dengan self jika bundle tidak berubah."""
+        centers = np.asarray(centers, dtype=np.float64)
+        if centers_hash(centers) == self.doc["centers_hash"]:
+            return self
+
+        stable_ids = sorted(self.labels)
+        reference = np.asarray(self.doc["reference_centers"], dtype=np.float64)
+        matched = match_centers(reference, centers)
+        raw_to_stable = {raw: stable_ids[ref] for raw, ref in matched.items()}
+
+        # cluster baru tanpa pasangan -> id stabil baru dengan label default
+        labels = [dict(self.labels[stable]) for stable in sorted(raw_to_stable.values())]
+        next_id = max(stable_ids, default=-1) + 1
+        for raw in range(len(centers)):
+            if raw not in raw_to_stable:
+                raw_to_stable[raw] = next_id
+                labels.append({
+                    "id": next_id,
+                    "name": "Cluster Baru",
+                    "color": FALLBACK_COLORS[next_id % len(FALLBACK_COLORS)],
+                    "insight": "",
+                })
+                next_id += 1
+
+        order = sorted(range(len(centers)), key=raw_to_stable.get)
+        doc = {
+            "model_features": list(model_features or self.doc.get("model_features", [])),
+            "centers_hash": centers_hash(centers),
+            "raw_to_stable": {str(raw): raw_to_stable[raw] for raw in range(len(centers))},
+            "reference_centers": centers[order].tolist(),
+            "labels": sorted(labels, key=lambda label: label["id"]),
+        }
+        return ClusterLabels(doc)
+
+    def apply(self, data, column="Cluster"):
+        """Tabel customer dengan id cluster mentah diganti id stabil."""
+        if all(raw == stable for raw, stable in self.raw_to_stable.items()):
+            return data
+        data = data.copy()
+        mapped = data[column].map(self.raw_to_stable)
+        data[column] = mapped.astype(data[column].dtype) if mapped.notna().all() else mapped
+        return data
+
+    # ======================= LABEL UNTUK PANEL =======================
+
+    def name(self, cluster_id):
+        label = self.labels.get(int(cluster_id))
+        return label["name"] if label else f"Cluster {cluster_id}"
+
+    def title(self, cluster_id):
+        """Mis. ``Cluster 1: VIP Customers``."""
+        return f"Cluster {int(cluster_id)}: {self.name(cluster_id)}"
+
+    def titles(self, cluster_ids):
+        return [self.title(cid) for cid in cluster_ids]
+
+    def color(self, cluster_id):
+        label = self.labels.get(int(cluster_id))
+        return label["color"] if label else "#999999"
+
+    def color_map(self):
+        """Judul cluster -> warna (untuk ``color_discrete_map`` plotly)."""
+        return {self.title(cid): label["color"] for cid, label in self.labels.items()}
+
+    def insight(self, cluster_id):
+        label = self.labels.get(int(cluster_id))
+        return label["insight"] if label else ""
+
+
+def reconcile_with_bundle(labels_path=None, bundle_path=None):
+    """Cocokkan label dengan bundle saat ini dan simpan jika pemetaannya berubah.
+
+    Retrain yang menghasilkan pemetaan dan label yang sama tidak menulis file
+    (yang dipantau cache warmer); pencocokan diulang dari referensi lama."""
+    labels = ClusterLabels.load(labels_path)
+    bundle_path = bundle_path or config.BUNDLE_PATH
+    if not os.path.exists(bundle_path):
+        return labels
+
+    from engine.bundle import ClusteringModel
+
+    model = ClusteringModel.load(bundle_path)
+    reconciled = labels.reconcile(model.centers, model.model_features)
+    if reconciled.raw_to_stable != labels.raw_to_stable or reconciled.doc["labels"] != labels.doc["labels"]:
+        reconciled.save(labels_path)
+        reconciled.saved = True
+    return reconciled
+
+
+if __name__ == "__main__":
+    labels = reconcile_with_bundle(*sys.argv[1:3])
+    for raw, stable in sorted(labels.raw_to_stable.items()):
+        print(f"id bundle {raw} -> {labels.title(stable)}")
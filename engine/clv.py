@@ -0,0 +1,267 @@
+"""Customer lifetime value: BG/NBD (jumlah pembelian) + Gamma-Gamma (nilai pembelian).
+
+Ringkasan per customer dihitung dari tabel transaksi lewat kode customer
+padat (engine/labels.py), dalam satuan hari:
+
+- ``x``  : jumlah pembelian berulang (hari pembelian unik - 1)
+- ``t_x``: jarak pembelian pertama ke terakhir (recency model)
+- ``T``  : umur customer, dari pembelian pertama ke akhir periode data
+- ``m``  : rata-rata nilai per hari pembelian (monetary / pembelian)
+
+Kolom ``Frequency`` tabel customer menghitung baris invoice, bukan hari
+pembelian, sehingga ringkasan model dibentuk ulang dari transaksi.
+
+Likelihood kedua model dievaluasi pada tabel teragregasi (kombinasi unik
+``x, t_x, T`` / ``x, m`` beserta jumlah customer-nya) dan dioptimasi dengan
+``scipy.optimize.minimize`` pada parameter log. Prediksi (jumlah pembelian,
+peluang masih aktif, nilai rata-rata, CLV terdiskonto) dihitung sekaligus
+untuk semua customer dengan operasi array.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+from scipy.special import gammaln, hyp2f1
+
+from engine import config
+
+DAYS_PER_MONTH = 30
+# batas parameter (skala log) agar optimasi tetap berhingga pada data tanpa
+# dropout/heterogenitas (MLE menuju 0 atau tak hingga); prediksi pada batas ini
+# memakai limit tanpa dropout, lihat ``expected_purchases``
+_LOG_BOUNDS = (np.log(1e-6), np.log(1e6))
+# naik setiap cara fit berubah, agar cache CLV dari fit lama tidak dipakai lagi
+_FIT_VERSION = 2
+OUTPUT_COLUMNS = ["CustomerID", "Purchases", "ProbAlive", "PredictedPurchases", "ExpectedValue", "CLV"]
+
+
+# ======================= RINGKASAN PER CUSTOMER =======================
+
+def customer_summary(df, labels):
+    """x, t_x, T, m per kode customer (urutan ``labels.customers``)."""
+    codes = labels.row_codes.astype(np.int64)
+    n_customers = len(labels.customers)
+    days = df["InvoiceDate"].to_numpy().astype("datetime64[D]").astype(np.int64)
+
+    n_days = days.max() - days.min() + 1
+    pairs = np.unique(codes * n_days + (days - days.min()))
+    pair_codes = pairs // n_days
+    pair_days = pairs % n_days + days.min()
+
+    purchases = np.bincount(pair_codes, minlength=n_customers)
+    first = np.full(n_customers, np.iinfo(np.int64).max)
+    last = np.full(n_customers, np.iinfo(np.int64).min)
+    np.minimum.at(first, pair_codes, pair_days)
+    np.maximum.at(last, pair_codes, pair_days)
+    revenue = np.bincount(codes, weights=df["TotalAmount"].to_numpy(dtype=np.float64), minlength=n_customers)
+
+    return pd.DataFrame({
+        "CustomerID": labels.customers,
+        "x": purchases - 1,
+        "t_x": last - first,
+        "T": days.max() - first,
+        "m": revenue / np.maximum(purchases, 1),
+    })
+
+
+def _aggregate(frame, columns):
+    """Kombinasi unik ``columns`` beserta jumlah customer (bobot likelihood)."""
+    grouped = frame.groupby(columns, sort=False).size().reset_index(name="weight")
+    return {col: grouped[col].to_numpy(dtype=np.float64) for col in columns + ["weight"]}
+
+
+# ======================= BG/NBD =======================
+
+def _bgnbd_loglik(params, x, t_x, T):
+    r, alpha, a, b = params
+    a1 = gammaln(r + x) - gammaln(r) + r * np.log(alpha)
+    a2 = gammaln(a + b) + gammaln(b + x) - gammaln(b) - gammaln(a + b + x)
+    a3 = -(r + x) * np.log(alpha + T)
+    repeat = x > 0
+    a4 = np.where(
+        repeat,
+        np.log(a) - np.log(np.where(repeat, b + x - 1, 1)) - (r + x) * np.log(alpha + t_x),
+        -np.inf,
+    )
+    return a1 + a2 + np.logaddexp(a3, a4)
+
+
+def _objective(loglik, agg, columns, penalizer):
+    """Negatif rata-rata log-likelihood berbobot + penalti L2 pada log parameter
+    (tidak bergantung satuan waktu/nilai, mencegah parameter menuju 0 atau tak hingga)."""
+    total = agg["weight"].sum()
+
+    def objective(log_params):
+        params = np.exp(log_params)
+        ll = (agg["weight"] * loglik(params, *(agg[col] for col in columns))).sum() / total
+        return -ll + penalizer * (log_params ** 2).sum()
+    return objective
+
+
+def fit_bgnbd(summary, penalizer=None):
+    penalizer = config.CLV_PENALIZER if penalizer is None else penalizer
+    agg = _aggregate(summary, ["x", "t_x", "T"])
+    objective = _objective(_bgnbd_loglik, agg, ["x", "t_x", "T"], penalizer)
+
+    start = np.log([1.0, max(summary["T"].mean(), 1.0), 1.0, 1.0])
+    result = minimize(objective, start, method="L-BFGS-B", bounds=[_LOG_BOUNDS] * 4)
+    return dict(zip(["r", "alpha", "a", "b"], np.exp(result.x)))
+
+
+def prob_alive(params, x, t_x, T):
+    r, alpha, a, b = params["r"], params["alpha"], params["a"], params["b"]
+    ratio = np.where(x > 0, a / np.maximum(b + x - 1, 1e-12) * ((alpha + T) / (alpha + t_x)) ** (r + x), 0.0)
+    return 1.0 / (1.0 + ratio)
+
+
+def expected_purchases(params, t, x, t_x, T):
+    """Perkiraan jumlah pembelian dalam ``t`` hari ke depan (broadcast numpy).
+
+    Jika fit berada di batas parameter (r, b sangat besar, a mendekati 0: data
+    hampir tanpa dropout), hyp2f1 overflow; di titik tersebut dipakai limit BG/NBD
+    tanpa dropout, yaitu NBD: ``(r + x) / (alpha + T) * t``."""
+    r, alpha, a, b = params["r"], params["alpha"], params["a"], params["b"]
+    z = t / (alpha + T + t)
+    with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+        head = (a + b + x - 1) / (a - 1)
+        tail = 1 - ((alpha + T) / (alpha + T + t)) ** (r + x) * hyp2f1(r + x, b + x, a + b + x - 1, z)
+        expected = head * tail
+    no_dropout = (r + x) / (alpha + T) * t
+    expected = np.where(np.isfinite(expected) & (expected >= 0), expected, no_dropout)
+    return expected * prob_alive(params, x, t_x, T)
+
+
+# ======================= GAMMA-GAMMA =======================
+
+def _gamma_gamma_loglik(params, x, m):
+    p, q, v = params
+    return (
+        gammaln(p * x + q) - gammaln(p * x) - gammaln(q) + q * np.log(v)
+        + (p * x - 1) * np.log(m) + p * x * np.log(x) - (p * x + q) * np.log(x * m + v)
+    )
+
+
+def _gamma_gamma_loglik_shifted(params, x, m):
+    # dioptimasi sebagai (p, q - 1, v): rata-rata p*v/(q-1) hanya terdefinisi untuk q > 1
+    p, q_minus_one, v = params
+    return _gamma_gamma_loglik((p, q_minus_one + 1, v), x, m)
+
+
+def fit_gamma_gamma(summary, penalizer=None):
+    penalizer = config.CLV_PENALIZER if penalizer is None else penalizer
+    # hanya customer dengan pembelian berulang dan nilai positif
+    repeat = summary[(summary["x"] > 0) & (summary["m"] > 0)]
+    agg = _aggregate(repeat.assign(m=repeat["m"].round(2)), ["x", "m"])
+    objective = _objective(_gamma_gamma_loglik_shifted, agg, ["x", "m"], penalizer)
+
+    start = np.log([1.0, 1.0, max(repeat["m"].mean(), 1.0)])
+    result = minimize(objective, start, method="L-BFGS-B", bounds=[_LOG_BOUNDS] * 3)
+    p, q_minus_one, v = np.exp(result.x)
+    return {"p": p, "q": q_minus_one + 1, "v": v}
+
+
+def expected_value(params, x, m):
+    p, q, v = params["p"], params["q"], params["v"]
+    population = p * v / (q - 1)
+    return np.where((x > 0) & (m > 0), p * (v + x * m) / (p * x + q - 1), population)
+
+
+# ======================= CLV =======================
+
+class CLVModel:
+    def __init__(self, bgnbd, gamma_gamma, customers):
+        self.bgnbd = bgnbd                # parameter r, alpha, a, b
+        self.gamma_gamma = gamma_gamma    # parameter p, q, v
+        self.customers = customers        # output per customer (OUTPUT_COLUMNS)
+
+    @classmethod
+    def fit(cls, df, labels, horizon=None, discount=None):
+        summary = customer_summary(df, labels)
+        bgnbd, gamma_gamma = fit_bgnbd(summary), fit_gamma_gamma(summary)
+        return cls(bgnbd, gamma_gamma, score(summary, bgnbd, gamma_gamma, horizon, discount))
+
+    @classmethod
+    def open_or_fit(cls, df, labels, source_version):
+        """Model dari cache per versi data (Parquet output + JSON parameter); fit ulang jika belum ada."""
+        horizon, discount = config.CLV_HORIZON_MONTHS, config.CLV_DISCOUNT_RATE
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            return cls.fit(df, labels, horizon, discount)
+
+        key = hashlib.sha1(f"{source_version}|{horizon}|{discount}|fit={_FIT_VERSION}".encode()).hexdigest()[:16]
+        directory = os.path.join(config.CACHE_DIR, "clv")
+        path = os.path.join(directory, f"clv-{key}")
+        if os.path.exists(f"{path}.json"):
+            with open(f"{path}.json") as f:
+                params = json.load(f)
+            return cls(params["bgnbd"], params["gamma_gamma"], pd.read_parquet(f"{path}.parquet"))
+
+        model = cls.fit(df, labels, horizon, discount)
+        os.makedirs(directory, exist_ok=True)
+        tmp = f"{path}.tmp-{os.getpid()}"
+        model.customers.to_parquet(tmp, index=False)
+        os.replace(tmp, f"{path}.parquet")
+        with open(tmp, "w") as f:
+            json.dump({
+                "bgnbd": {k: float(v) for k, v in model.bgnbd.items()},
+                "gamma_gamma": {k: float(v) for k, v in model.gamma_gamma.items()},
+            }, f, indent=2)
+        # JSON ditulis terakhir: menandai cache lengkap
+        os.replace(tmp, f"{path}.json")
+        for old in os.listdir(directory):
+            if not old.startswith(os.path.basename(path)):
+                os.remove(os.path.join(directory, old))
+        return model
+
+    def join(self, data):
+        """Tabel customer ``data`` ditambah kolom CLV (customer tanpa transaksi -> NaN)."""
+        position = pd.Index(self.customers["CustomerID"]).get_indexer(data["CustomerID"])
+        found = position >= 0
+        columns = {}
+        for col in OUTPUT_COLUMNS[1:]:
+            values = np.full(len(data), np.nan)
+            values[found] = self.customers[col].to_numpy(dtype=np.float64)[position[found]]
+            columns[col] = values
+        return data.assign(**columns)
+
+
+def score(summary, bgnbd, gamma_gamma, horizon=None, discount=None):
+    """Prediksi semua customer sekaligus; CLV = jumlah (pembelian bulan ke-i x nilai
+    rata-rata) yang didiskonto per bulan selama ``horizon`` bulan."""
+    horizon = config.CLV_HORIZON_MONTHS if horizon is None else horizon
+    discount = config.CLV_DISCOUNT_RATE if discount is None else discount
+    x, t_x, T = (summary[col].to_numpy(dtype=np.float64)[:, None] for col in ("x", "t_x", "T"))
+
+    months = np.arange(horizon + 1, dtype=np.float64)[None, :]
+    cumulative = expected_purchases(bgnbd, months * DAYS_PER_MONTH, x, t_x, T)
+    per_month = np.diff(cumulative, axis=1)
+    factors = (1 + discount) ** -months[:, 1:]
+
+    value = expected_value(gamma_gamma, summary["x"].to_numpy(), summary["m"].to_numpy())
+    clv = (per_month * factors).sum(axis=1) * value
+    invalid = ~np.isfinite(clv)
+    if invalid.any():
+        # gagal keras di warmer, bukan panel CLV kosong tanpa penjelasan
+        raise ValueError(
+            f"Prediksi CLV tidak berhingga untuk {invalid.sum()} customer "
+            f"(BG/NBD {bgnbd}, Gamma-Gamma {gamma_gamma})"
+        )
+    non_positive = value <= 0
+    if non_positive.any():
+        raise ValueError(
+            f"Nilai transaksi prediksi tidak positif untuk {non_positive.sum()} customer "
+            f"(Gamma-Gamma {gamma_gamma})"
+        )
+    return pd.DataFrame({
+        "CustomerID": summary["CustomerID"].to_numpy(),
+        "Purchases": summary["x"].to_numpy() + 1,
+        "ProbAlive": prob_alive(bgnbd, x[:, 0], t_x[:, 0], T[:, 0]),
+        "PredictedPurchases": cumulative[:, -1],
+        "ExpectedValue": value,
+        "CLV": clv,
+    })
@@ -0,0 +1,112 @@
+"""Analisis cohort berdasarkan bulan pembelian pertama customer.
+
+Bulan transaksi diubah menjadi bilangan bulat (bulan sejak 1970), lalu
+bulan pertama tiap customer diambil dengan satu groupby-min pada kode
+customer padat (engine/labels.py). Matriks cohort x umur (bulan sejak
+pembelian pertama) dibentuk dalam satu pass:
+
+- ``active``  : jumlah customer unik yang bertransaksi (pasangan unik
+  customer-sel dideduplikasi dengan hash, bukan sort)
+- ``revenue`` : total TotalAmount
+
+Semua langkah linear terhadap jumlah transaksi. Hasil disimpan per versi
+data di ``<CACHE_DIR>/cohorts/``.
+"""
+
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from engine import config
+
+METRICS = {
+    "Retensi (%)": "retention",
+    "Revenue (£)": "revenue",
+    "Revenue per Customer Cohort (£)": "revenue_per_customer",
+}
+
+
+def _month_numbers(dates):
+    return dates.to_numpy().astype("datetime64[M]").astype(np.int64)
+
+
+class CohortEngine:
+    def __init__(self, start_month, sizes, active, revenue):
+        self.start_month = int(start_month)  # bulan cohort pertama (bulan sejak 1970)
+        self.sizes = sizes                    # jumlah customer per cohort
+        self.active = active                  # cohort x umur: customer aktif
+        self.revenue = revenue                # cohort x umur: revenue
+
+    @classmethod
+    def build(cls, df, labels):
+        codes = labels.row_codes.astype(np.int64)
+        n_customers = len(labels.customers)
+        month = _month_numbers(df["InvoiceDate"])
+
+        first = np.full(n_customers, np.iinfo(np.int64).max)
+        np.minimum.at(first, codes, month)
+        start = int(month.min())
+        n_months = int(month.max()) - start + 1
+
+        cohort = first[codes] - start
+        cell = cohort * n_months + (month - start - cohort)   # umur = bulan - bulan pertama
+        customer_cells = pd.unique(cell * n_customers + codes)
+
+        n_cells = n_months * n_months
+        active = np.bincount(customer_cells // n_customers, minlength=n_cells).reshape(n_months, n_months)
+        revenue = np.bincount(
+            cell, weights=df["TotalAmount"].to_numpy(dtype=np.float64), minlength=n_cells
+        ).reshape(n_months, n_months)
+        present = first[first != np.iinfo(np.int64).max]
+        sizes = np.bincount(present - start, minlength=n_months)
+        return cls(start, sizes, active, revenue)
+
+    @classmethod
+    def open_or_build(cls, df, labels, source_version):
+        """Matriks cohort dari cache per versi data; dibangun ulang jika belum ada."""
+        directory = os.path.join(config.CACHE_DIR, "cohorts")
+        key = hashlib.sha1(source_version.encode()).hexdigest()[:16]
+        path = os.path.join(directory, f"cohorts-{key}.npz")
+        if os.path.exists(path):
+            with np.load(path) as saved:
+                return cls(saved["start_month"], saved["sizes"], saved["active"], saved["revenue"])
+
+        engine = cls.build(df, labels)
+        os.makedirs(directory, exist_ok=True)
+        tmp = f"{path}.tmp-{os.getpid()}.npz"
+        np.savez(tmp, start_month=engine.start_month, sizes=engine.sizes, active=engine.active, revenue=engine.revenue)
+        os.replace(tmp, path)
+        for old in os.listdir(directory):
+            if old != os.path.basename(path):
+                os.remove(os.path.join(directory, old))
+        return engine
+
+    @property
+    def cohort_labels(self):
+        months = np.arange(self.start_month, self.start_month + len(self.sizes)).astype("datetime64[M]")
+        return [str(m) for m in months]
+
+    def matrix(self, metric="retention"):
+        """Tabel cohort (baris, 'YYYY-MM') x umur bulan (kolom 0, 1, ...); sel di luar
+        periode data bernilai NaN."""
+        n = len(self.sizes)
+        sizes = self.sizes[:, None].astype(np.float64)
+        if metric == "retention":
+            values = np.divide(self.active * 100.0, sizes, out=np.full((n, n), np.nan), where=sizes > 0)
+        elif metric == "revenue":
+            values = self.revenue.astype(np.float64)
+        elif metric == "revenue_per_customer":
+            values = np.divide(self.revenue, sizes, out=np.full((n, n), np.nan), where=sizes > 0)
+        else:
+            raise ValueError(f"Metric cohort tidak dikenal: {metric!r}")
+
+        # cohort ke-i hanya punya umur 0 .. n - 1 - i
+        values = np.where(np.arange(n)[None, :] < n - np.arange(n)[:, None], values, np.nan)
+        table = pd.DataFrame(values, index=pd.Index(self.cohort_labels, name="Cohort"))
+        table.columns.name = "Bulan ke-"
+        return table.loc[self.sizes > 0]
+
+    def cohort_sizes(self):
+        return pd.Series(self.sizes, index=pd.Index(self.cohort_labels, name="Cohort"), name="Customers")[self.sizes > 0]
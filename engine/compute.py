@@ -0,0 +1,80 @@
+"""Pool komputasi bersama untuk semua sesi dashboard dalam satu proses server.
+
+Setiap sesi Streamlit menjalankan script secara terpisah, sehingga banyak
+analis yang membuka panel dengan pilihan yang sama akan menghitung hal yang
+sama berulang kali. ``ComputePool`` menjalankan komputasi di thread pool
+dengan kunci (panel, parameter, versi data):
+
+- permintaan identik yang masih berjalan tidak dihitung ulang (single-flight);
+  semua sesi menunggu ``Future`` yang sama
+- hasil yang sudah selesai disimpan di LRU kecil, sehingga sesi berikutnya
+  langsung memakai hasilnya; versi data baru otomatis memakai kunci baru
+
+Hasil dipakai bersama oleh semua sesi, jadi pemanggil tidak boleh mengubahnya.
+"""
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from engine import config
+
+
+class ComputePool:
+    def __init__(self, workers=None, cache_size=None):
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers or config.COMPUTE_WORKERS, thread_name_prefix="compute"
+        )
+        self.cache_size = config.COMPUTE_CACHE_SIZE if cache_size is None else cache_size
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._done = OrderedDict()
+
+    def submit(self, key, fn, *args):
+        """Future hasil ``fn(*args)``; dihitung sekali untuk setiap ``key``."""
+        with self._lock:
+            if key in self._done:
+                self._done.move_to_end(key)
+                future = Future()
+                future.set_result(self._done[key])
+                return future
+
+            future = self._inflight.get(key)
+            if future is not None:
+                return future
+
+            future = self.executor.submit(fn, *args)
+            self._inflight[key] = future
+        future.add_done_callback(lambda done: self._finish(key, done))
+        return future
+
+    def run(self, key, fn, *args):
+        """Seperti ``submit`` tetapi menunggu hasilnya (error diteruskan ke semua pemanggil)."""
+        return self.submit(key, fn, *args).result()
+
+    def _finish(self, key, future):
+        with self._lock:
+            self._inflight.pop(key, None)
+            # hasil gagal tidak disimpan: permintaan berikutnya mencoba lagi
+            if future.cancelled() or future.exception() is not None or self.cache_size <= 0:
+                return
+            self._done[key] = future.result()
+            while len(self._done) > self.cache_size:
+                self._done.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._done.clear()
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_pool():
+    """Satu pool untuk seluruh proses server (dipakai bersama semua sesi)."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = ComputePool()
+        return _shared
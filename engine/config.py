@@ -0,0 +1,133 @@
+"""Konfigurasi dashboard, dibaca dari environment variable."""
+
+import os
+
+# ===== Sumber data (engine/sources.py) =====
+# csv : file DASHBOARD_DATA_PATH / DASHBOARD_SEGMENTATION_PATH
+# sql : tabel di database DASHBOARD_SQL_URL (SQLite)
+DATA_SOURCE = os.environ.get("DASHBOARD_DATA_SOURCE", "csv")
+DATA_PATH = os.environ.get("DASHBOARD_DATA_PATH", "data.csv")
+SEGMENTATION_PATH = os.environ.get("DASHBOARD_SEGMENTATION_PATH", "customer_segmentation.csv")
+SQL_URL = os.environ.get("DASHBOARD_SQL_URL", "sqlite:///dashboard.db")
+SQL_TRANSACTIONS_TABLE = os.environ.get("DASHBOARD_SQL_TRANSACTIONS_TABLE", "transactions")
+SQL_SEGMENTATION_TABLE = os.environ.get("DASHBOARD_SQL_SEGMENTATION_TABLE", "customer_segmentation")
+# Jumlah koneksi (= thread pembaca paralel) dan jumlah baris per potongan baca
+SQL_POOL_SIZE = int(os.environ.get("DASHBOARD_SQL_POOL_SIZE", 4))
+SQL_CHUNK_ROWS = int(os.environ.get("DASHBOARD_SQL_CHUNK_ROWS", 100_000))
+
+# ===== Startup =====
+# 1: snapshot pertama dibangun di background, UI kerangka langsung tampil
+# 0: tunggu snapshot pertama selesai sebelum render
+BACKGROUND_LOAD = os.environ.get("DASHBOARD_BACKGROUND_LOAD", "1") == "1"
+
+# ===== Cache warmer =====
+# Interval (detik) pengecekan perubahan file data
+WARMER_INTERVAL = float(os.environ.get("DASHBOARD_WARMER_INTERVAL", 30))
+
+# ===== Backend agregasi groupby =====
+# pandas     : groupby biasa (single-thread)
+# threads    : partisi tabel, agregasi paralel di thread pool
+# processes  : partisi tabel, agregasi paralel di process pool
+AGG_BACKEND = os.environ.get("DASHBOARD_AGG_BACKEND", "pandas")
+AGG_WORKERS = int(os.environ.get("DASHBOARD_AGG_WORKERS", os.cpu_count() or 1))
+# hash  : partisi berdasarkan hash key (berlaku untuk semua fungsi agregasi)
+# range : partisi berdasarkan rentang baris (hanya sum/count/size/min/max)
+AGG_PARTITION = os.environ.get("DASHBOARD_AGG_PARTITION", "hash")
+# Tabel lebih kecil dari ini tetap diagregasi langsung oleh pandas
+AGG_MIN_ROWS = int(os.environ.get("DASHBOARD_AGG_MIN_ROWS", 200_000))
+
+# ===== Engine query agregasi panel (engine/query_plans.py) =====
+# pandas : groupby di memori lewat backend agregasi di atas
+# duckdb : plan dijalankan sebagai SQL oleh DuckDB di atas cache Parquet (opsional)
+QUERY_ENGINE = os.environ.get("DASHBOARD_QUERY_ENGINE", "pandas")
+QUERY_THREADS = int(os.environ.get("DASHBOARD_QUERY_THREADS", os.cpu_count() or 1))
+
+# ===== Tipe kolom tabel input (engine/schema.py) =====
+# 1: kolom numerik dipersempit & string bernilai sedikit jadi category (lossless)
+SCHEMA_OPTIMIZE = os.environ.get("DASHBOARD_SCHEMA_OPTIMIZE", "1") == "1"
+# String dengan nilai unik lebih dari ini tetap string
+SCHEMA_MAX_CATEGORIES = int(os.environ.get("DASHBOARD_SCHEMA_MAX_CATEGORIES", 256))
+
+# ===== Cleaning transaksi saat ingest (engine/cleaning.py) =====
+# Rule aktif, dipisah koma: cancelled, non_positive_quantity, non_positive_price, extreme_quantity
+CLEAN_RULES = [
+    rule.strip()
+    for rule in os.environ.get(
+        "DASHBOARD_CLEAN_RULES", "cancelled,non_positive_quantity,non_positive_price,extreme_quantity"
+    ).split(",")
+    if rule.strip()
+]
+# Ambang Quantity ekstrem: median + z x MAD (skala log); 0 = rule outlier nonaktif
+CLEAN_OUTLIER_Z = float(os.environ.get("DASHBOARD_CLEAN_OUTLIER_Z", 6))
+
+# ===== Customer lifetime value (engine/clv.py) =====
+# Horizon prediksi CLV (bulan) dan tingkat diskonto per bulan
+CLV_HORIZON_MONTHS = int(os.environ.get("DASHBOARD_CLV_HORIZON_MONTHS", 12))
+CLV_DISCOUNT_RATE = float(os.environ.get("DASHBOARD_CLV_DISCOUNT_RATE", 0.01))
+# Penalti L2 pada log parameter model (0 = maximum likelihood murni)
+CLV_PENALIZER = float(os.environ.get("DASHBOARD_CLV_PENALIZER", 0))
+
+# ===== Sampel terstratifikasi untuk eksplorasi cepat (engine/sampling.py) =====
+# Fraksi invoice yang diambil dari setiap stratum (Country x bulan x RFM_Segment)
+SAMPLE_FRACTION = float(os.environ.get("DASHBOARD_SAMPLE_FRACTION", 0.05))
+# Jumlah invoice minimum per stratum (stratum lebih kecil diambil seluruhnya)
+SAMPLE_MIN_PER_STRATUM = int(os.environ.get("DASHBOARD_SAMPLE_MIN_PER_STRATUM", 5))
+# Tingkat kepercayaan interval estimasi
+SAMPLE_CONFIDENCE = float(os.environ.get("DASHBOARD_SAMPLE_CONFIDENCE", 0.95))
+SAMPLE_SEED = int(os.environ.get("DASHBOARD_SAMPLE_SEED", 0))
+
+# ===== Forecast tren pendapatan bulanan (engine/forecast.py) =====
+# Jumlah bulan yang diproyeksikan dan tingkat kepercayaan interval forecast
+FORECAST_HORIZON = int(os.environ.get("DASHBOARD_FORECAST_HORIZON", 6))
+FORECAST_CONFIDENCE = float(os.environ.get("DASHBOARD_FORECAST_CONFIDENCE", 0.95))
+# Jumlah proses untuk fit seri paralel (1 = serial)
+FORECAST_WORKERS = int(os.environ.get("DASHBOARD_FORECAST_WORKERS", os.cpu_count() or 1))
+
+# ===== Cache di disk (feature store, tabel turunan) =====
+CACHE_DIR = os.environ.get("DASHBOARD_CACHE_DIR", ".cache")
+
+# ===== Bundle model clustering (format .npz, lihat engine/bundle.py) =====
+BUNDLE_PATH = os.environ.get("DASHBOARD_BUNDLE_PATH", "clustering_bundle.npz")
+# Id cluster stabil + nama/warna/insight, diselaraskan otomatis dengan bundle (engine/cluster_labels.py)
+CLUSTER_LABELS_PATH = os.environ.get("DASHBOARD_CLUSTER_LABELS_PATH", "cluster_labels.json")
+
+# ===== Market basket analysis (engine/basket.py) =====
+# Support minimum relatif terhadap jumlah invoice dalam satu segment/cluster
+BASKET_MIN_SUPPORT = float(os.environ.get("DASHBOARD_BASKET_MIN_SUPPORT", 0.02))
+BASKET_MIN_CONFIDENCE = float(os.environ.get("DASHBOARD_BASKET_MIN_CONFIDENCE", 0.3))
+# Jumlah item maksimum dalam satu itemset
+BASKET_MAX_LEN = int(os.environ.get("DASHBOARD_BASKET_MAX_LEN", 3))
+# sparse   : miner bawaan berbasis matriks sparse
+# fpgrowth : FP-growth dari mlxtend (fallback ke sparse jika tidak terpasang)
+BASKET_METHOD = os.environ.get("DASHBOARD_BASKET_METHOD", "sparse")
+# Segment/cluster dengan invoice lebih sedikit dari ini tidak di-mining
+BASKET_MIN_BASKETS = int(os.environ.get("DASHBOARD_BASKET_MIN_BASKETS", 100))
+BASKET_WORKERS = int(os.environ.get("DASHBOARD_BASKET_WORKERS", os.cpu_count() or 1))
+
+# ===== Pencarian customer serupa (engine/neighbors.py) =====
+# Mode approximate KD-tree dipakai jika jumlah customer >= nilai ini
+NEIGHBORS_APPROX_MIN_ROWS = int(os.environ.get("DASHBOARD_NEIGHBORS_APPROX_MIN_ROWS", 100_000))
+# Toleransi mode approximate: tetangga boleh <= (1 + eps) x jarak tetangga sebenarnya
+NEIGHBORS_EPS = float(os.environ.get("DASHBOARD_NEIGHBORS_EPS", 0.1))
+# Jumlah thread query KD-tree (-1 = semua core)
+NEIGHBORS_WORKERS = int(os.environ.get("DASHBOARD_NEIGHBORS_WORKERS", -1))
+
+# ===== Monitor perpindahan customer antar snapshot (engine/drift.py) =====
+# Jumlah arsip snapshot segmentasi yang disimpan (hasil diff tetap disimpan semua)
+DRIFT_KEEP_SNAPSHOTS = int(os.environ.get("DASHBOARD_DRIFT_KEEP_SNAPSHOTS", 6))
+
+# ===== Payload figure ke browser (engine/payload.py) =====
+# Selisih maksimum agar array float dikirim sebagai float32 (0 = hanya jika persis sama)
+PAYLOAD_FLOAT_TOLERANCE = float(os.environ.get("DASHBOARD_PAYLOAD_FLOAT_TOLERANCE", 0.005))
+
+# ===== Simulasi promosi what-if (engine/promotion.py) =====
+PROMO_DRAWS = int(os.environ.get("DASHBOARD_PROMO_DRAWS", 5000))
+PROMO_WORKERS = int(os.environ.get("DASHBOARD_PROMO_WORKERS", os.cpu_count() or 1))
+# Ketidakpastian response rate: makin besar, draw makin dekat dengan asumsi
+PROMO_CONCENTRATION = float(os.environ.get("DASHBOARD_PROMO_CONCENTRATION", 200))
+PROMO_SEED = int(os.environ.get("DASHBOARD_PROMO_SEED", 0))
+
+# ===== Pool komputasi bersama antar sesi (engine/compute.py) =====
+COMPUTE_WORKERS = int(os.environ.get("DASHBOARD_COMPUTE_WORKERS", min(8, os.cpu_count() or 1)))
+# Jumlah hasil (panel, parameter, versi data) yang disimpan; 0 = hanya coalescing
+COMPUTE_CACHE_SIZE = int(os.environ.get("DASHBOARD_COMPUTE_CACHE_SIZE", 256))
@@ -0,0 +1,286 @@
+"""Monitor perpindahan customer (churn risk) dan drift cluster antar snapshot.
+
+Setiap versi customer_segmentation.csv diarsipkan sebagai feature store
+kecil (kolom urut CustomerID, lihat engine/feature_store.py). Dua snapshot
+berurutan di-join dengan merge pada kunci yang sudah terurut (binary search,
+tanpa hash join), lalu dihitung:
+
+- matriks transisi segment -> segment dan cluster -> cluster
+- customer baru / hilang / turun RFM_Score
+- pergeseran populasi per segment & cluster (termasuk PSI)
+- drift centroid tiap cluster (dalam satuan standar deviasi snapshot lama)
+
+Hasil diff disimpan sebagai JSON kecil, sehingga riwayatnya tetap tersedia
+walaupun arsip snapshot lama sudah dihapus. Diff dua file secara langsung::
+
+    python -m engine.drift segmentasi_lama.csv segmentasi_baru.csv
+"""
+
+import glob
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from engine import config
+from engine.feature_store import FeatureStore, canonical_keys, write_store
+
+SNAPSHOT_COLUMNS = [
+    "RFM_Segment", "Cluster", "RFM_Score",
+    "Recency", "Frequency", "Monetary", "Quantity_total", "UnitPrice_avg",
+]
+CENTROID_FEATURES = ["Recency", "Frequency", "Monetary", "Quantity_total", "UnitPrice_avg"]
+_PSI_EPS = 1e-6
+
+
+# ======================= MERGE SNAPSHOT =======================
+
+def align(prev_keys, curr_keys):
+    """Merge dua array kunci terurut: posisi (prev, curr) untuk customer yang sama."""
+    curr_keys = np.asarray(curr_keys)
+    prev_keys = np.asarray(prev_keys)
+    if len(curr_keys) == 0 or len(prev_keys) == 0:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty
+    pos = np.searchsorted(curr_keys, prev_keys)
+    clipped = pos.clip(max=len(curr_keys) - 1)
+    matched = (pos < len(curr_keys)) & (curr_keys[clipped] == prev_keys)
+    return np.flatnonzero(matched), clipped[matched]
+
+
+def common_keys(prev, curr):
+    """Samakan jenis kunci dua snapshot (``attrs["key_kind"]``). Satu ID non-numerik
+    membuat snapshot memakai kunci str; snapshot lain lalu di-key ulang sebagai str."""
+    if prev.attrs.get("key_kind") == curr.attrs.get("key_kind"):
+        return prev, curr
+    return _rekey(prev, "str"), _rekey(curr, "str")
+
+
+def _rekey(frame, kind):
+    keys, _ = canonical_keys(frame["key"].astype(str), kind=kind)
+    order = np.argsort(keys, kind="stable")
+    frame = frame.iloc[order].reset_index(drop=True)
+    frame["key"] = keys[order]
+    frame.attrs["key_kind"] = kind
+    return frame
+
+
+def _labels(values):
+    """Kategori gabungan dua snapshot (urut), untuk label transisi."""
+    return sorted(pd.unique(pd.Series(values).dropna()).tolist())
+
+
+def transition_matrix(prev_labels, curr_labels):
+    """Jumlah customer dari label lama (baris) ke label baru (kolom)."""
+    prev_labels = pd.Series(prev_labels).astype(object)
+    curr_labels = pd.Series(curr_labels).astype(object)
+    categories = _labels(pd.concat([prev_labels, curr_labels]))
+    a = pd.Categorical(prev_labels, categories=categories).codes.astype(np.int64)
+    b = pd.Categorical(curr_labels, categories=categories).codes.astype(np.int64)
+    valid = (a >= 0) & (b >= 0)
+    n = len(categories)
+    counts = np.bincount(a[valid] * n + b[valid], minlength=n * n).reshape(n, n)
+    return pd.DataFrame(counts, index=categories, columns=categories)
+
+
+def population_shift(prev_labels, curr_labels):
+    """Jumlah & proporsi per label di kedua snapshot, plus PSI per label."""
+    prev_counts = pd.Series(prev_labels).astype(object).value_counts()
+    curr_counts = pd.Series(curr_labels).astype(object).value_counts()
+    labels = _labels(pd.concat([prev_counts.index.to_series(), curr_counts.index.to_series()]))
+
+    shift = pd.DataFrame({
+        "Previous": prev_counts.reindex(labels, fill_value=0).to_numpy(),
+        "Current": curr_counts.reindex(labels, fill_value=0).to_numpy(),
+    }, index=pd.Index(labels, name="Label"))
+    prev_share = shift["Previous"] / max(shift["Previous"].sum(), 1)
+    curr_share = shift["Current"] / max(shift["Current"].sum(), 1)
+    shift["PreviousShare"] = prev_share
+    shift["CurrentShare"] = curr_share
+    shift["Delta"] = shift["Current"] - shift["Previous"]
+    shift["PSI"] = (curr_share - prev_share) * np.log((curr_share + _PSI_EPS) / (prev_share + _PSI_EPS))
+    return shift.reset_index()
+
+
+def centroid_drift(prev, curr, features=CENTROID_FEATURES):
+    """Pergeseran rata-rata fitur per cluster, dinormalisasi std snapshot lama."""
+    scale = prev[features].std(ddof=0).replace(0, 1.0)
+    prev_centers = prev.groupby("Cluster")[features].mean()
+    curr_centers = curr.groupby("Cluster")[features].mean()
+    clusters = prev_centers.index.intersection(curr_centers.index)
+
+    delta = (curr_centers.loc[clusters] - prev_centers.loc[clusters]) / scale
+    drift = delta.add_suffix("_shift")
+    drift.insert(0, "Drift", np.sqrt((delta ** 2).sum(axis=1)))
+    drift.index.name = "Cluster"
+    return drift.reset_index()
+
+
+def diff_snapshots(prev, curr):
+    """Bandingkan dua tabel snapshot yang sudah urut berdasarkan ``key``."""
+    prev, curr = common_keys(prev, curr)
+    prev_pos, curr_pos = align(prev["key"].to_numpy(), curr["key"].to_numpy())
+    before = prev.iloc[prev_pos].reset_index(drop=True)
+    after = curr.iloc[curr_pos].reset_index(drop=True)
+
+    segment_changed = before["RFM_Segment"].astype(object).ne(after["RFM_Segment"].astype(object))
+    summary = {
+        "previous_customers": int(len(prev)),
+        "current_customers": int(len(curr)),
+        "retained": int(len(prev_pos)),
+        "new": int(len(curr) - len(curr_pos)),
+        "lost": int(len(prev) - len(prev_pos)),
+        "segment_changed": int(segment_changed.sum()),
+        "cluster_changed": int((before["Cluster"].to_numpy() != after["Cluster"].to_numpy()).sum()),
+        "downgraded": int((after["RFM_Score"].to_numpy() < before["RFM_Score"].to_numpy()).sum()),
+        "upgraded": int((after["RFM_Score"].to_numpy() > before["RFM_Score"].to_numpy()).sum()),
+    }
+
+    segment_shift = population_shift(prev["RFM_Segment"], curr["RFM_Segment"])
+    cluster_shift = population_shift(prev["Cluster"], curr["Cluster"])
+    drift = centroid_drift(prev, curr)
+    summary["segment_psi"] = float(segment_shift["PSI"].sum())
+    summary["cluster_psi"] = float(cluster_shift["PSI"].sum())
+    summary["max_centroid_drift"] = float(drift["Drift"].max()) if len(drift) else 0.0
+
+    return {
+        "summary": summary,
+        "segment_transitions": transition_matrix(before["RFM_Segment"], after["RFM_Segment"]),
+        "cluster_transitions": transition_matrix(before["Cluster"], after["Cluster"]),
+        "segment_shift": segment_shift,
+        "cluster_shift": cluster_shift,
+        "centroid_drift": drift,
+    }
+
+
+# ======================= ARSIP SNAPSHOT =======================
+
+def _store_frame(store):
+    frame = pd.DataFrame({col: store.column(col) for col in SNAPSHOT_COLUMNS if col in store.columns})
+    frame.insert(0, "key", np.asarray(store.keys))
+    frame.attrs["key_kind"] = store.meta["key_kind"]
+    return frame
+
+
+def _to_json(result, meta):
+    def frame(df):
+        return {"columns": [str(c) for c in df.columns], "data": df.astype(object).where(df.notna(), None).values.tolist()}
+
+    def matrix(df):
+        return {"labels": [str(c) for c in df.index], "counts": df.to_numpy().tolist()}
+
+    return {
+        **meta,
+        "summary": result["summary"],
+        "segment_transitions": matrix(result["segment_transitions"]),
+        "cluster_transitions": matrix(result["cluster_transitions"]),
+        "segment_shift": frame(result["segment_shift"]),
+        "cluster_shift": frame(result["cluster_shift"]),
+        "centroid_drift": frame(result["centroid_drift"]),
+    }
+
+
+def _from_json(payload):
+    result = dict(payload)
+    for key in ("segment_transitions", "cluster_transitions"):
+        labels = payload[key]["labels"]
+        result[key] = pd.DataFrame(payload[key]["counts"], index=labels, columns=labels)
+    for key in ("segment_shift", "cluster_shift", "centroid_drift"):
+        result[key] = pd.DataFrame(payload[key]["data"], columns=payload[key]["columns"])
+    return result
+
+
+class DriftMonitor:
+    def __init__(self, path=None, keep=None):
+        self.path = path or os.path.join(config.CACHE_DIR, "drift")
+        self.keep = keep or config.DRIFT_KEEP_SNAPSHOTS
+        self.snapshot_dir = os.path.join(self.path, "snapshots")
+        self.diff_dir = os.path.join(self.path, "diffs")
+
+    def snapshots(self):
+        """Arsip snapshot, urut dari yang terlama."""
+        return sorted(glob.glob(os.path.join(self.snapshot_dir, "*")))
+
+    def record(self, data, source_version):
+        """Arsipkan ``data`` jika versinya baru, lalu diff dengan snapshot sebelumnya."""
+        snapshots = self.snapshots()
+        for path in snapshots:
+            if FeatureStore(path).meta.get("source_version") == source_version:
+                return self
+
+        recorded_at = time.time()
+        name = f"{int(recorded_at * 1000):015d}-{hashlib.sha1(source_version.encode()).hexdigest()[:10]}"
+        path = os.path.join(self.snapshot_dir, name)
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        columns = ["CustomerID"] + [col for col in SNAPSHOT_COLUMNS if col in data.columns]
+        write_store(path, data[columns], score_columns=(), source_version=source_version)
+
+        if snapshots:
+            previous = snapshots[-1]
+            result = diff_snapshots(_store_frame(FeatureStore(previous)), _store_frame(FeatureStore(path)))
+            meta = {
+                "previous": os.path.basename(previous),
+                "current": name,
+                "recorded_at": recorded_at,
+            }
+            os.makedirs(self.diff_dir, exist_ok=True)
+            tmp = os.path.join(self.diff_dir, f".{name}.json")
+            with open(tmp, "w") as f:
+                json.dump(_to_json(result, meta), f)
+            os.replace(tmp, os.path.join(self.diff_dir, f"{name}.json"))
+
+        # snapshot lama dihapus, hasil diff (kecil) tetap disimpan
+        for old in self.snapshots()[:-self.keep]:
+            shutil.rmtree(old, ignore_errors=True)
+        return self
+
+    def diffs(self):
+        paths = sorted(glob.glob(os.path.join(self.diff_dir, "*.json")))
+        results = []
+        for path in paths:
+            with open(path) as f:
+                results.append(_from_json(json.load(f)))
+        return results
+
+    def history(self):
+        """Ringkasan setiap diff (satu baris per pasangan snapshot berurutan)."""
+        rows = [
+            {"RecordedAt": pd.to_datetime(d["recorded_at"], unit="s"), **d["summary"]}
+            for d in self.diffs()
+        ]
+        return pd.DataFrame(rows)
+
+    def latest(self):
+        diffs = self.diffs()
+        return diffs[-1] if diffs else None
+
+
+def _snapshot_frame(data):
+    """Tabel segmentasi -> tabel snapshot urut kunci (tanpa menulis ke disk)."""
+    keys, kind = canonical_keys(data["CustomerID"])
+    order = np.argsort(keys, kind="stable")
+    frame = data[[col for col in SNAPSHOT_COLUMNS if col in data.columns]].iloc[order].reset_index(drop=True)
+    frame.insert(0, "key", keys[order])
+    frame.attrs["key_kind"] = kind
+    return frame
+
+
+if __name__ == "__main__":
+    from engine.loader import load_segmentation
+
+    result = diff_snapshots(
+        _snapshot_frame(load_segmentation(sys.argv[1])),
+        _snapshot_frame(load_segmentation(sys.argv[2])),
+    )
+    print(json.dumps(result["summary"], indent=2))
+    print("\nTransisi segment:")
+    print(result["segment_transitions"].to_string())
+    print("\nTransisi cluster:")
+    print(result["cluster_transitions"].to_string())
+    print("\nDrift centroid:")
+    print(result["centroid_drift"].to_string(index=False))
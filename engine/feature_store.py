@@ -0,0 +1,193 @@
+"""Feature store customer: layout kolom di disk + indeks CustomerID terurut.
+
+Setiap kolom disimpan sebagai file .npy terpisah (urut berdasarkan
+CustomerID) dan dibuka dengan memory-map, sehingga lookup hanya membaca
+halaman yang dibutuhkan:
+
+- point lookup / batch lookup : binary search pada ``key.npy`` (O(log n))
+- range scan berdasarkan score : ``sorted_<kolom>.npy`` + ``order_<kolom>.npy``
+"""
+
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+SCORE_COLUMNS = ("RFM_Score", "Recency", "Frequency", "Monetary", "CLV")
+
+
+def canonical_keys(ids, kind=None):
+    """ID customer -> kunci yang bisa diurutkan ("12346.0" dan "12346" sama)."""
+    ids = pd.Series(ids, dtype="string").str.strip()
+    numbers = pd.to_numeric(ids, errors="coerce")
+    if kind is None:
+        kind = "int" if len(ids) and numbers.notna().all() and (numbers % 1 == 0).all() else "str"
+    if kind == "int":
+        # ID pecahan ("12346.5") bukan ID integer: jadi -1 (tidak ditemukan), bukan dibulatkan
+        return numbers.where(numbers % 1 == 0).fillna(-1).to_numpy().astype(np.int64), kind
+    # ID bulat ditulis tanpa ".0", agar kunci str cocok dengan kunci int ID yang sama
+    integral = numbers.notna() & (numbers % 1 == 0)
+    ids = ids.mask(integral, numbers[integral].astype(np.int64).astype("string"))
+    return ids.fillna("").to_numpy(dtype=str), kind
+
+
+def write_store(path, table, key="CustomerID", score_columns=SCORE_COLUMNS, source_version=""):
+    """Tulis tabel customer ke ``path`` (diganti secara atomik)."""
+    keys, kind = canonical_keys(table[key])
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    if len(keys) > 1 and (keys[1:] == keys[:-1]).any():
+        raise ValueError(f"Kolom {key} tidak unik, feature store butuh satu baris per customer")
+
+    tmp = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    np.save(os.path.join(tmp, "key.npy"), keys)
+
+    columns = {}
+    for col in table.columns:
+        values = table[col].iloc[order]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes = values.cat.codes.to_numpy()
+            np.save(os.path.join(tmp, f"col_{col}.npy"), codes)
+            columns[col] = {"kind": "category", "categories": [str(c) for c in values.cat.categories]}
+        elif pd.api.types.is_numeric_dtype(values.dtype):
+            np.save(os.path.join(tmp, f"col_{col}.npy"), values.to_numpy())
+            columns[col] = {"kind": "numeric"}
+        else:
+            np.save(os.path.join(tmp, f"col_{col}.npy"), values.astype("string").fillna("").to_numpy(dtype=str))
+            columns[col] = {"kind": "string"}
+
+    indexed = [col for col in score_columns if columns.get(col, {}).get("kind") == "numeric"]
+    for col in indexed:
+        values = np.load(os.path.join(tmp, f"col_{col}.npy"))
+        score_order = np.argsort(values, kind="stable")
+        np.save(os.path.join(tmp, f"order_{col}.npy"), score_order)
+        np.save(os.path.join(tmp, f"sorted_{col}.npy"), values[score_order])
+
+    meta = {
+        "n_rows": int(len(keys)),
+        "key": key,
+        "key_kind": kind,
+        "columns": columns,
+        "score_columns": indexed,
+        "source_version": source_version,
+    }
+    with open(os.path.join(tmp, "meta.json"), "w") as f:
+        json.dump(meta, f)
+
+    old = f"{path}.old-{os.getpid()}"
+    if os.path.exists(path):
+        os.replace(path, old)
+    os.replace(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+class FeatureStore:
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self._arrays = {}
+
+    @classmethod
+    def open_or_build(cls, path, table, source_version, **kwargs):
+        """Buka store yang ada jika versinya sama; selain itu tulis ulang dari ``table``."""
+        try:
+            store = cls(path)
+            if store.meta.get("source_version") == source_version:
+                return store
+        except (FileNotFoundError, ValueError):
+            pass
+        write_store(path, table, source_version=source_version, **kwargs)
+        return cls(path)
+
+    def __len__(self):
+        return self.meta["n_rows"]
+
+    @property
+    def columns(self):
+        return list(self.meta["columns"])
+
+    @property
+    def score_columns(self):
+        return list(self.meta["score_columns"])
+
+    def _array(self, name):
+        if name not in self._arrays:
+            self._arrays[name] = np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode="r")
+        return self._arrays[name]
+
+    @property
+    def keys(self):
+        """CustomerID kanonik, urut naik (memory-map)."""
+        return self._array("key")
+
+    def column(self, name):
+        """Satu kolom penuh (urut CustomerID); kolom kategori sebagai Categorical."""
+        info = self.meta["columns"][name]
+        values = np.asarray(self._array(f"col_{name}"))
+        if info["kind"] == "category":
+            return pd.Categorical.from_codes(values, categories=info["categories"])
+        return values
+
+    def _rows(self, positions, columns=None):
+        positions = np.asarray(positions, dtype=np.int64)
+        out = {}
+        for col in columns or self.columns:
+            info = self.meta["columns"][col]
+            values = np.asarray(self._array(f"col_{col}")[positions])
+            if info["kind"] == "category":
+                values = pd.Categorical.from_codes(values, categories=info["categories"])
+            out[col] = values
+        return pd.DataFrame(out)
+
+    def _positions(self, customer_ids):
+        """Posisi baris untuk setiap ID (-1 jika tidak ditemukan)."""
+        queries, _ = canonical_keys(customer_ids, kind=self.meta["key_kind"])
+        keys = self._array("key")
+        pos = np.searchsorted(keys, queries)
+        found = pos < len(keys)
+        found[found] = keys[pos[found]] == queries[found]
+        return np.where(found, pos, -1)
+
+    def get(self, customer_id, columns=None):
+        """Satu customer sebagai dict, atau None jika tidak ada."""
+        pos = self._positions([customer_id])[0]
+        if pos < 0:
+            return None
+        return self._rows([pos], columns).iloc[0].to_dict()
+
+    def get_many(self, customer_ids, columns=None):
+        """Batch lookup; hasil mengikuti urutan input, ID yang tidak ada dilewati."""
+        pos = self._positions(customer_ids)
+        return self._rows(pos[pos >= 0], columns)
+
+    def score_bounds(self, column):
+        """(min, max) sebuah kolom score, dibaca dari ujung indeks terurut."""
+        sorted_values = self._array(f"sorted_{column}")
+        if np.issubdtype(sorted_values.dtype, np.floating):
+            # NaN berada di akhir indeks
+            last = np.searchsorted(sorted_values, np.inf, side="right") - 1
+        else:
+            last = len(sorted_values) - 1
+        if last < 0:
+            return None
+        return sorted_values[0].item(), sorted_values[last].item()
+
+    def scan(self, column, low=None, high=None, limit=None, descending=True, columns=None):
+        """Customer dengan ``low <= column <= high`` (urut berdasarkan column)."""
+        if column not in self.meta["score_columns"]:
+            raise KeyError(f"Kolom {column!r} tidak memiliki indeks score")
+        sorted_values = self._array(f"sorted_{column}")
+        lo = 0 if low is None else np.searchsorted(sorted_values, low, side="left")
+        hi = len(sorted_values) if high is None else np.searchsorted(sorted_values, high, side="right")
+
+        positions = np.asarray(self._array(f"order_{column}")[lo:hi])
+        if descending:
+            positions = positions[::-1]
+        if limit is not None:
+            positions = positions[:limit]
+        return self._rows(positions, columns)
@@ -0,0 +1,780 @@
+"""Figure panel dashboard dan pre-render kondisi default-nya.
+
+Setiap fungsi ``fig_*`` membangun satu figure panel dari artefak snapshot
+(tabel agregat, top-N, tabel customer, label cluster). Setelah snapshot
+baru selesai, cache warmer memanggil ``render_defaults`` untuk membangun
+figure dengan pilihan default (sama seperti saat panel pertama dibuka) dan
+menyimpannya di snapshot. Panel hanya membangun figure sendiri jika user
+mengubah pilihan dropdown.
+"""
+
+import plotly.express as px
+import plotly.graph_objects as go
+
+from engine import config
+from engine.aggregates import CLUSTER_BREAKDOWNS
+from engine.cohorts import METRICS as COHORT_METRICS
+from engine.compute import shared_pool
+from engine.payload import encode_figure
+
+PALETTE = [
+    "#FF8C00", "#FFA733", "#FFA726", "#FFB74D", "#FFBE66",
+    "#FFCC80", "#FFD599", "#FFECCC", "#FFF5E6", "#FFE0B2"
+]
+SCATTER_AXES = {
+    "Monetary vs Recency": ("Recency", "Monetary"),
+    "Monetary vs Frequency": ("Frequency", "Monetary"),
+    "Frequency vs Recency": ("Recency", "Frequency"),
+}
+
+
+# ======================= NEGARA =======================
+
+def fig_atlas(snapshot):
+    country_info = snapshot["aggregates"]["country_overview"].copy()
+
+    country_info["Purchased"] = 1  # indikator negara pembeli
+
+    # --- ALL COUNTRY LIST dari Plotly (gapminder) ---
+    world = px.data.gapminder()[["country"]].drop_duplicates()
+    world.columns = ["Country"]
+
+    # --- Merge: negara pembeli + negara yang tidak beli ---
+    world_map = world.merge(country_info, on="Country", how="left")
+    world_map["Purchased"] = world_map["Purchased"].fillna(0)
+
+    # --- warna: negara beli = warna atlas, negara lain = abu muda ---
+    world_map["ColorValue"] = world_map["Purchased"].astype(int)
+
+    fig_atlas = px.choropleth(
+        world_map,
+        locations="Country",
+        locationmode="country names",
+        color="ColorValue",
+        hover_name="Country",
+        hover_data={
+            "TotalRevenue": ":,.0f",
+            "TransactionCount": ":,",
+            "Purchased": False,
+            "ColorValue": False
+        },
+        color_continuous_scale=["#d3d3d3", "#ff9933"],  # abu → oranye atlas
+    )
+
+    # --- STYLE SEPERTI ATLAS ---
+    fig_atlas.update_geos(
+        showcountries=True,
+        showcoastlines=True,
+        showland=True,
+        landcolor="white",
+        oceancolor="#f8f8f8",
+        lakecolor="#f8f8f8",
+        projection_type="natural earth"
+    )
+
+    fig_atlas.update_layout(
+        height=700,
+        width=1500,
+        coloraxis_showscale=False,   # sembunyikan legend warna
+        title="Peta Persebaran Pelanggan Secara Global",
+        margin=dict(l=20, r=20, t=60, b=20)
+    )
+    return fig_atlas
+
+
+def _country_bar(top, title):
+    fig = px.bar(
+        top,
+        x="Country",
+        y="TotalRevenue",
+        text="TotalRevenue",
+        color="Country",
+        color_discrete_sequence=PALETTE,
+        title=title
+    )
+
+    fig.update_traces(
+        texttemplate='£%{y:,.0f}',
+        textposition='outside',
+        hovertemplate=
+            "<b>%{x}</b><br>" +
+            "Revenue: £%{y:,.0f}<br>"
+    )
+    return fig
+
+
+def fig_country_top(snapshot):
+    top = snapshot["aggregates"]["country_sales"].head(5).reset_index()
+    return _country_bar(top, "5 Negara dengan Penjualan Terbesar")
+
+
+def fig_country_top_excl_uk(snapshot):
+    top = snapshot["aggregates"]["country_sales_excl_uk"].head(10).reset_index()
+    fig = _country_bar(top, "Top 10 Negara (Tanpa UK)")
+    fig.update_layout(
+        xaxis_tickangle=-45
+    )
+    return fig
+
+
+def fig_country_bottom(snapshot):
+    bottom = (
+        snapshot["aggregates"]["country_sales_excl_uk"]
+        .sort_values('TotalRevenue', ascending=True)
+        .head(5)
+        .reset_index()
+    )
+    return _country_bar(bottom, "5 Negara dengan Penjualan Paling Sedikit")
+
+
+# ======================= TREN BULANAN =======================
+
+def _monthly_line(monthly, title, forecast=None):
+    fig = px.line(
+        monthly,
+        x="InvoiceYearMonth",
+        y="TotalAmount",
+        markers=True,
+        title=title,
+    )
+
+    fig.update_traces(
+        line=dict(width=3, color="#FF8C00"),
+        marker=dict(size=8),
+        hovertemplate=
+            "<b>%{x}</b><br>" +
+            "Total Amount: £%{y:,.0f}<br>" +
+            "Orders: %{customdata[0]:,}<br>" +
+            "Active Customers: %{customdata[1]:,}<br>" +
+            "AOV: £%{customdata[2]:,.2f}<extra></extra>",
+        customdata=monthly[['Orders', 'Active_Customers', 'AOV']].values
+    )
+
+    fig.update_layout(
+        xaxis_title="Month",
+        yaxis_title="Total Amount (£)",
+        xaxis_tickangle=-45,
+        plot_bgcolor="white",
+        height=450,
+    )
+    if forecast is not None:
+        _add_forecast(fig, forecast)
+    return fig
+
+
+def _add_forecast(fig, forecast):
+    # Forecast (garis putus-putus) + pita interval di atas data historis
+    months = forecast["InvoiceYearMonth"].tolist()
+    fig.add_trace(go.Scatter(
+        x=months + months[::-1],
+        y=forecast["Upper"].tolist() + forecast["Lower"].tolist()[::-1],
+        fill="toself",
+        fillcolor="rgba(255, 140, 0, 0.15)",
+        line=dict(width=0),
+        hoverinfo="skip",
+        name=f"Interval {config.FORECAST_CONFIDENCE:.0%}",
+    ))
+    fig.add_trace(go.Scatter(
+        x=months,
+        y=forecast["Forecast"],
+        mode="lines+markers",
+        line=dict(width=2, color="#FF8C00", dash="dash"),
+        marker=dict(size=6),
+        name="Forecast",
+        customdata=forecast[["Lower", "Upper"]].values,
+        hovertemplate=
+            "<b>%{x}</b><br>" +
+            "Forecast: £%{y:,.0f}<br>" +
+            "Interval: £%{customdata[0]:,.0f} – £%{customdata[1]:,.0f}<extra></extra>",
+    ))
+    fig.data[0].update(name="Aktual", showlegend=True)
+    fig.update_layout(legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
+
+
+def fig_monthly(snapshot):
+    return _monthly_line(
+        snapshot["aggregates"]["monthly"],
+        "Tren Pendapatan Bulanan Tahun 2010-2011",
+        snapshot["forecasts"].table("Total", "Total"),
+    )
+
+
+def fig_monthly_by_country(snapshot, country):
+    return _monthly_line(
+        snapshot["aggregates"]["monthly_by_country"][country],
+        f"Tren Pendapatan Bulanan – {country}",
+        snapshot["forecasts"].table("Country", country),
+    )
+
+
+def fig_monthly_by_segment(snapshot, segment):
+    return _monthly_line(
+        snapshot["aggregates"]["monthly_by_segment"][segment],
+        f"Tren Pendapatan Bulanan – {segment}",
+        snapshot["forecasts"].table("RFM_Segment", segment),
+    )
+
+
+# ======================= COHORT =======================
+
+def fig_cohort_heatmap(snapshot, metric_label):
+    cohorts = snapshot["cohorts"]
+    table = cohorts.matrix(COHORT_METRICS[metric_label])
+    text_format = ".0f" if COHORT_METRICS[metric_label] == "retention" else ",.0f"
+
+    fig = px.imshow(
+        table,
+        color_continuous_scale="Oranges",
+        aspect="auto",
+        text_auto=text_format,
+        labels=dict(x="Bulan Sejak Pembelian Pertama", y="Cohort (Bulan Pertama)", color=metric_label),
+        title=f"Cohort Customer: {metric_label}"
+    )
+
+    fig.update_traces(
+        hovertemplate=
+            "<b>Cohort %{y}</b><br>" +
+            "Bulan ke-%{x}<br>" +
+            f"{metric_label}: %{{z:{text_format}}}<extra></extra>"
+    )
+
+    fig.update_layout(
+        height=550,
+        xaxis=dict(dtick=1),
+        plot_bgcolor="white"
+    )
+    return fig
+
+
+# ======================= PRODUK =======================
+
+def fig_product_revenue(snapshot):
+    top_prod = snapshot["topn"].top("TotalRevenue", 10)
+
+    fig_prod = px.bar(
+        top_prod,
+        x="Description",
+        y="TotalRevenue",
+        text="TotalRevenue",
+        color="Description",
+        color_discrete_sequence=PALETTE,
+        title="Top 10 Produk dengan Revenue Tertinggi"
+    )
+
+    fig_prod.update_traces(
+        texttemplate='£%{y:,.0f}',
+        textposition='outside',
+        hovertemplate=
+            "<b>%{x}</b><br>" +
+            "Total Revenue: £%{y:,.0f}<br>" +
+            "Avg Price: £%{customdata[0]:.2f}<extra></extra>",
+        customdata=top_prod[['AvgPrice']].values
+    )
+
+    fig_prod.update_layout(
+        xaxis_title="Product",
+        yaxis_title="Total Revenue (£)",
+        xaxis_tickangle=-45,
+        showlegend=False
+    )
+    return fig_prod
+
+
+def fig_product_quantity(snapshot):
+    top_qty = (
+        snapshot["topn"].top("TotalQuantity", 10)
+        .rename(columns={"TotalQuantity": "Quantity"})
+    )
+
+    fig_qty = px.bar(
+        top_qty,
+        x="Description",
+        y="Quantity",
+        text="Quantity",
+        color="Description",
+        color_discrete_sequence=PALETTE,
+        title="Top 10 Produk Berdasarkan Jumlah Quantity Terjual"
+    )
+
+    fig_qty.update_traces(
+        texttemplate='%{y:,}',
+        textposition='outside',
+        hovertemplate=
+            "<b>%{x}</b><br>" +
+            "Quantity Terjual: %{y:,}<extra></extra>"
+    )
+
+    fig_qty.update_layout(
+        xaxis_title="Product",
+        yaxis_title="Quantity Sold",
+        xaxis_tickangle=-45,
+        showlegend=False
+    )
+    return fig_qty
+
+
+def fig_product_scatter(snapshot):
+    product_scatter = snapshot["topn"].products_table()
+    product_scatter = product_scatter[product_scatter["TotalRevenue"] > 0]
+
+    fig_scatter = px.scatter(
+        product_scatter,
+        x="TotalQuantity",
+        y="TotalRevenue",
+        hover_name="Description",
+        hover_data={
+            "TotalQuantity": True,
+            "TotalRevenue": ":,.0f",
+            "AvgPrice": ":,.2f"
+        },
+        title="Scatter Plot: Total Revenue vs Quantity per Product",
+    )
+
+    fig_scatter.update_layout(
+        xaxis_title="Total Quantity Sold",
+        yaxis_title="Total Revenue (£)",
+        height=600,
+        plot_bgcolor="white"
+    )
+
+    fig_scatter.update_traces(
+        marker=dict(opacity=0.7, line=dict(width=1, color="black"))
+    )
+    return fig_scatter
+
+
+# ======================= RFM SEGMENT =======================
+
+def fig_segment_distribution(snapshot):
+    segment_counts = snapshot["aggregates"]["segment_counts"]
+
+    fig_segment = px.bar(
+        segment_counts,
+        x="RFM_Segment",
+        y="Count",
+        text=segment_counts["Percentage"].apply(lambda x: f"{x:.1f}%"),
+        color="RFM_Segment",
+        color_discrete_sequence=px.colors.qualitative.Set3,
+        title="Distribusi Customer per RFM Segment (%)"
+    )
+
+    fig_segment.update_traces(
+        textposition="outside",
+        hovertemplate=
+            "<b>Segment: %{x}</b><br>" +
+            "Jumlah Customer: %{y}<br>" +
+            "Persentase: %{text}<extra></extra>"
+    )
+
+    fig_segment.update_layout(
+        xaxis_title="RFM Segment",
+        yaxis_title="Jumlah Customer",
+        xaxis_tickangle=45,
+        showlegend=False
+    )
+    return fig_segment
+
+
+def fig_segment_revenue(snapshot):
+    fig_pie = px.pie(
+        snapshot["aggregates"]["segment_revenue"],
+        names="RFM_Segment",
+        values="TotalRevenue",
+        hole=0.45,  # donut style
+        title="Proporsi Revenue Berdasarkan RFM Segment"
+    )
+
+    fig_pie.update_traces(
+        textinfo="percent+label",
+        hovertemplate=
+            "<b>%{label}</b><br>" +
+            "Revenue: £%{value:,.0f}<br>" +
+            "Persentase: %{percent}<extra></extra>"
+    )
+
+    fig_pie.update_layout(
+        height=500
+    )
+    return fig_pie
+
+
+def fig_segment_clv(snapshot):
+    segment_clv = snapshot["aggregates"]["segment_clv"]
+
+    fig_clv = px.bar(
+        segment_clv,
+        x="RFM_Segment",
+        y="AvgCLV",
+        text=segment_clv["AvgCLV"].apply(lambda x: f"£{x:,.0f}"),
+        color="RFM_Segment",
+        color_discrete_sequence=PALETTE,
+        custom_data=["TotalCLV", "AvgProbAlive", "Customer_Count"],
+        title="Rata-rata Customer Lifetime Value (CLV) per RFM Segment"
+    )
+
+    fig_clv.update_traces(
+        textposition="outside",
+        hovertemplate=
+            "<b>%{x}</b><br>" +
+            "Rata-rata CLV: £%{y:,.0f}<br>" +
+            "Total CLV: £%{customdata[0]:,.0f}<br>" +
+            "Rata-rata P(aktif): %{customdata[1]:.0%}<br>" +
+            "Jumlah Customer: %{customdata[2]:,}<extra></extra>"
+    )
+
+    fig_clv.update_layout(
+        xaxis_title="RFM Segment",
+        yaxis_title="Rata-rata CLV (£)",
+        showlegend=False,
+        height=450
+    )
+    return fig_clv
+
+
+def fig_segment_countries(snapshot, segment):
+    country_segment = snapshot["aggregates"]["top_countries_by_segment"][segment]
+
+    fig_country = px.bar(
+        country_segment,
+        x="Country",
+        y="Customer_Count",
+        text="Customer_Count",
+        color="Country",
+        color_discrete_sequence=px.colors.qualitative.Set3,
+        title=f"Top 5 Negara – Segment {segment}"
+    )
+
+    fig_country.update_traces(
+        textposition="outside",
+        hovertemplate=
+            "<b>%{x}</b><br>" +
+            "Jumlah Customer: %{y:,}<extra></extra>"
+    )
+
+    fig_country.update_layout(
+        xaxis_title="Negara",
+        yaxis_title="Jumlah Customer Unik",
+        showlegend=False,
+        height=450
+    )
+    return fig_country
+
+
+def fig_segment_products(snapshot, segment, metric_option):
+    if metric_option == "Revenue":
+        y_col = "TotalRevenue"
+        y_label = "Total Revenue (£)"
+        text_format = lambda x: f"£{x:,.0f}"
+    else:  # Quantity
+        y_col = "TotalQuantity"
+        y_label = "Total Quantity"
+        text_format = lambda x: f"{int(x):,}"
+    product_segment = snapshot["topn"].top(y_col, 5, segment=segment)
+
+    fig_product = px.bar(
+        product_segment,
+        x="Description",
+        y=y_col,
+        text=product_segment[y_col].apply(text_format),
+        color="Description",
+        color_discrete_sequence=px.colors.qualitative.Set3,
+        title=f"Top 5 Produk – Segment {segment} (by {metric_option})"
+    )
+
+    fig_product.update_traces(
+        textposition="outside",
+        hovertemplate=
+            "<b>%{x}</b><br>" +
+            f"{y_label}: %{{y:,}}<extra></extra>"
+    )
+
+    fig_product.update_layout(
+        xaxis_title="Produk",
+        yaxis_title=y_label,
+        showlegend=False,
+        height=500,
+        xaxis_tickangle=-45
+    )
+    return fig_product
+
+
+# ======================= CLUSTER =======================
+
+def fig_cluster_distribution(snapshot):
+    cluster_dist = snapshot["aggregates"]["cluster_distribution"]
+    cluster_labels = snapshot["cluster_labels"]
+
+    fig_cluster = px.bar(
+        cluster_dist.assign(ClusterName=cluster_labels.titles(cluster_dist["Cluster"])),
+        x="Cluster",
+        y="Customer_Count",
+        text="Customer_Count",
+        color="ClusterName",
+        color_discrete_map=cluster_labels.color_map(),
+        title="Distribusi Customer Berdasarkan Cluster"
+    )
+
+    fig_cluster.update_traces(
+        textposition="outside",
+        hovertemplate=
+            "<b>%{fullData.name}</b><br>" +
+            "Jumlah Customer: %{y:,}<extra></extra>"
+    )
+
+    fig_cluster.update_layout(
+        xaxis_title="Cluster",
+        yaxis_title="Jumlah Customer Unik",
+        showlegend=False,
+        height=450
+    )
+    return fig_cluster
+
+
+def fig_cluster_revenue(snapshot):
+    cluster_revenue = snapshot["aggregates"]["cluster_revenue"]
+    cluster_labels = snapshot["cluster_labels"]
+
+    fig_pie = px.pie(
+        cluster_revenue.assign(ClusterName=cluster_labels.titles(cluster_revenue["Cluster"])),
+        names="ClusterName",
+        values="TotalRevenue",
+        color="ClusterName",
+        color_discrete_map=cluster_labels.color_map(),
+        hole=0.45,  # donut style
+        title="Proporsi Revenue Berdasarkan Cluster"
+    )
+
+    fig_pie.update_traces(
+        textinfo="percent+label",
+        hovertemplate=
+            "<b>%{label}</b><br>" +
+            "Revenue: £%{value:,.0f}<br>" +
+            "Persentase: %{percent}<extra></extra>"
+    )
+
+    fig_pie.update_layout(
+        height=500
+    )
+    return fig_pie
+
+
+def fig_cluster_quantity(snapshot):
+    cluster_quantity = snapshot["aggregates"]["cluster_quantity"]
+    cluster_labels = snapshot["cluster_labels"]
+
+    fig_qty = px.bar(
+        cluster_quantity,
+        x="Cluster",
+        y="TotalQuantity",
+        text=cluster_quantity["TotalQuantity"].apply(lambda x: f"{int(x):,}"),
+        title="Total Quantity Berdasarkan Cluster",
+        color=cluster_labels.titles(cluster_quantity["Cluster"]),
+        color_discrete_map=cluster_labels.color_map()
+    )
+
+    fig_qty.update_traces(
+        textposition="outside",
+        hovertemplate=
+            "<b>%{fullData.name}</b><br>" +
+            "Total Quantity: %{y:,}<extra></extra>"
+    )
+
+    fig_qty.update_layout(
+        xaxis_title="Cluster",
+        yaxis_title="Total Quantity",
+        plot_bgcolor="white",
+        height=450,
+        showlegend=False
+    )
+    return fig_qty
+
+
+def fig_cluster_clv(snapshot):
+    cluster_clv = snapshot["aggregates"]["cluster_clv"]
+    cluster_labels = snapshot["cluster_labels"]
+
+    fig_clv = px.bar(
+        cluster_clv,
+        x="Cluster",
+        y="AvgCLV",
+        text=cluster_clv["AvgCLV"].apply(lambda x: f"£{x:,.0f}"),
+        color=cluster_labels.titles(cluster_clv["Cluster"]),
+        color_discrete_map=cluster_labels.color_map(),
+        custom_data=["TotalCLV", "AvgProbAlive", "Customer_Count"],
+        title="Rata-rata Customer Lifetime Value (CLV) per Cluster"
+    )
+
+    fig_clv.update_traces(
+        textposition="outside",
+        hovertemplate=
+            "<b>%{fullData.name}</b><br>" +
+            "Rata-rata CLV: £%{y:,.0f}<br>" +
+            "Total CLV: £%{customdata[0]:,.0f}<br>" +
+            "Rata-rata P(aktif): %{customdata[1]:.0%}<br>" +
+            "Jumlah Customer: %{customdata[2]:,}<extra></extra>"
+    )
+
+    fig_clv.update_layout(
+        xaxis_title="Cluster",
+        yaxis_title="Rata-rata CLV (£)",
+        plot_bgcolor="white",
+        height=450,
+        showlegend=False
+    )
+    return fig_clv
+
+
+def fig_cluster_scatter(snapshot, axis_option):
+    data = snapshot["data"]
+    cluster_labels = snapshot["cluster_labels"]
+    x_col, y_col = SCATTER_AXES[axis_option]
+
+    fig = px.scatter(
+        data.assign(ClusterName=cluster_labels.titles(data["Cluster"])),
+        x=x_col,
+        y=y_col,
+        color="ClusterName",
+        color_discrete_map=cluster_labels.color_map(),
+        category_orders={"ClusterName": list(cluster_labels.color_map())},
+        opacity=0.75,
+        title=f"Scatter Plot {y_col} vs {x_col}",
+        hover_data=["CustomerID", "Recency", "Frequency", "Monetary"]
+    )
+
+    # ===== LOG SCALE KHUSUS MONETARY =====
+    if x_col == "Monetary":
+        fig.update_xaxes(type="log", title="Monetary (log scale)")
+    if y_col == "Monetary":
+        fig.update_yaxes(type="log", title="Monetary (log scale)")
+
+    fig.update_layout(
+        plot_bgcolor="white",
+        height=550,
+        legend_title_text="Cluster"
+    )
+
+    fig.update_traces(
+        marker=dict(size=7),
+        hovertemplate=
+            "<b>CustomerID:</b> %{customdata[0]}<br>" +
+            f"<b>{x_col}:</b> %{{x:,.0f}}<br>" +
+            f"<b>{y_col}:</b> %{{y:,.0f}}<br>" +
+            "<b>Cluster:</b> %{fullData.name}<extra></extra>"
+    )
+    return fig
+
+
+def fig_cluster_breakdown(snapshot, dimension):
+    breakdown = snapshot["aggregates"]["cluster_breakdowns"][dimension]
+    cluster_labels = snapshot["cluster_labels"]
+    column = CLUSTER_BREAKDOWNS[dimension]
+    frame = breakdown.assign(ClusterName=cluster_labels.titles(breakdown["Cluster"]))
+    category_orders = {"ClusterName": list(cluster_labels.color_map())}
+
+    if dimension == "Bulan":
+        frame = frame.sort_values(column)
+        plot = px.line
+    else:
+        # 10 teratas berdasarkan total revenue semua cluster
+        top = breakdown.groupby(column, observed=True)["TotalRevenue"].sum().nlargest(10).index
+        frame = frame[frame[column].isin(top)]
+        category_orders[column] = list(top)
+        plot = px.bar
+
+    fig = plot(
+        frame,
+        x=column,
+        y="TotalRevenue",
+        color="ClusterName",
+        color_discrete_map=cluster_labels.color_map(),
+        category_orders=category_orders,
+        custom_data=["ClusterName", "TotalQuantity", "Invoices"],
+        title=f"Revenue per {dimension} Berdasarkan Cluster"
+    )
+
+    fig.update_traces(
+        hovertemplate=
+            "<b>%{customdata[0]}</b><br>" +
+            f"{dimension}: %{{x}}<br>" +
+            "Revenue: £%{y:,.0f}<br>" +
+            "Quantity: %{customdata[1]:,}<br>" +
+            "Invoice: %{customdata[2]:,}<extra></extra>"
+    )
+    fig.update_layout(
+        xaxis_title=dimension,
+        yaxis_title="Total Revenue (£)",
+        plot_bgcolor="white",
+        height=500,
+        legend_title_text="Cluster"
+    )
+    return fig
+
+
+# ======================= PRE-RENDER =======================
+
+# nama -> (fungsi figure, fungsi parameter default dari snapshot)
+FIGURES = {
+    "atlas": (fig_atlas, lambda s: ()),
+    "country_top": (fig_country_top, lambda s: ()),
+    "country_top_excl_uk": (fig_country_top_excl_uk, lambda s: ()),
+    "country_bottom": (fig_country_bottom, lambda s: ()),
+    "monthly": (fig_monthly, lambda s: ()),
+    "monthly_by_country": (
+        fig_monthly_by_country,
+        lambda s: tuple(sorted(s["aggregates"]["monthly_by_country"])[:1]),
+    ),
+    "monthly_by_segment": (
+        fig_monthly_by_segment,
+        lambda s: tuple(sorted(s["aggregates"]["monthly_by_segment"])[:1]),
+    ),
+    "cohort_heatmap": (fig_cohort_heatmap, lambda s: (next(iter(COHORT_METRICS)),)),
+    "product_revenue": (fig_product_revenue, lambda s: ()),
+    "product_quantity": (fig_product_quantity, lambda s: ()),
+    "product_scatter": (fig_product_scatter, lambda s: ()),
+    "segment_distribution": (fig_segment_distribution, lambda s: ()),
+    "segment_revenue": (fig_segment_revenue, lambda s: ()),
+    "segment_clv": (fig_segment_clv, lambda s: ()),
+    "segment_countries": (
+        fig_segment_countries,
+        lambda s: tuple(sorted(s["aggregates"]["segment_rows"])[:1]),
+    ),
+    "segment_products": (
+        fig_segment_products,
+        lambda s: tuple(sorted(s["aggregates"]["segment_rows"])[:1]) + ("Revenue",),
+    ),
+    "cluster_distribution": (fig_cluster_distribution, lambda s: ()),
+    "cluster_revenue": (fig_cluster_revenue, lambda s: ()),
+    "cluster_quantity": (fig_cluster_quantity, lambda s: ()),
+    "cluster_clv": (fig_cluster_clv, lambda s: ()),
+    "cluster_scatter": (fig_cluster_scatter, lambda s: (next(iter(SCATTER_AXES)),)),
+    "cluster_breakdown": (fig_cluster_breakdown, lambda s: (next(iter(CLUSTER_BREAKDOWNS)),)),
+}
+
+
+class PrerenderedFigures:
+    """Figure default yang sudah dibangun; pilihan lain dibangun saat diminta
+    lewat pool komputasi bersama (sekali per pilihan dan versi data)."""
+
+    def __init__(self, snapshot, rendered):
+        self.snapshot = snapshot
+        self.version = snapshot.get("version", "")
+        self.rendered = rendered  # nama -> (parameter, Figure)
+
+    def get(self, name, *params):
+        rendered = self.rendered.get(name)
+        if rendered is not None and rendered[0] == params:
+            return rendered[1]
+        return shared_pool().run(("figure", name, params, self.version), self._build, name, params)
+
+    def _build(self, name, params):
+        build, _ = FIGURES[name]
+        return encode_figure(build(self.snapshot, *params))
+
+
+def render_defaults(snapshot):
+    """Bangun semua figure default snapshot (dipakai panel lewat ``PrerenderedFigures.get``)."""
+    rendered = {}
+    for name, (build, defaults) in FIGURES.items():
+        params = defaults(snapshot)
+        rendered[name] = (params, encode_figure(build(snapshot, *params)))
+    return PrerenderedFigures(snapshot, rendered)
@@ -0,0 +1,193 @@
+"""Forecast tren pendapatan bulanan (total, per negara, per RFM segment).
+
+Setiap seri diambil dari tabel agregat bulanan (engine/aggregates.py),
+bukan dari tabel transaksi. Bulan terakhir yang belum lengkap (data
+berhenti di tengah bulan) tidak ikut di-fit; forecast dimulai dari bulan
+tersebut.
+
+Model per seri (``statsmodels.tsa`` ``ETSModel``, error aditif):
+
+- ETS(A,Ad,N): level + trend teredam, tanpa musiman
+- seri >= 2 musim (24 bulan): juga di-fit ETS(A,Ad,A) dengan komponen
+  musiman aditif 12 bulan; model dengan AIC terkecil dipakai
+- kurang dari 6 bulan: nilai terakhir (naive)
+
+Parameter di-fit dengan maximum likelihood statsmodels (phi dibatasi
+0.8-0.98) dan interval forecast memakai varians analitik model aditif.
+Seri di-fit paralel di process pool (``DASHBOARD_FORECAST_WORKERS``) dan
+hasilnya disimpan per seri di ``<CACHE_DIR>/forecast/`` dengan kunci hash
+isi seri + pengaturan + versi statsmodels, sehingga seri yang tidak berubah tidak di-fit ulang saat data di-refresh.
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+
+from engine import config
+
+SEASON = 12
+# dimensi -> tabel agregat bulanan (dict grup -> tabel, atau satu tabel untuk total)
+SERIES = {"Total": "monthly", "Country": "monthly_by_country", "RFM_Segment": "monthly_by_segment"}
+
+
+def last_complete_month(df):
+    """Bulan terakhir yang datanya lengkap (bulan transaksi terakhir jika data
+    berhenti di hari terakhir bulan tersebut)."""
+    last = df["InvoiceDate"].max()
+    return (last + pd.Timedelta(days=1)).to_period("M") - 1
+
+
+def monthly_series(monthly, last_month):
+    """TotalAmount per bulan dari bulan pertama seri s.d. ``last_month`` (bulan tanpa transaksi = 0)."""
+    periods = pd.PeriodIndex(monthly["InvoiceYearMonth"], freq="M")
+    values = pd.Series(monthly["TotalAmount"].to_numpy(dtype=np.float64), index=periods)
+    values = values[values.index <= last_month]
+    if values.empty:
+        return np.empty(0)
+    months = pd.period_range(values.index.min(), last_month, freq="M")
+    return values.reindex(months, fill_value=0.0).to_numpy()
+
+
+# ======================= MODEL =======================
+
+def _fit_ets(y, seasonal):
+    from statsmodels.tsa.exponential_smoothing.ets import ETSModel
+
+    model = ETSModel(
+        pd.Series(y), error="add", trend="add", damped_trend=True,
+        seasonal="add" if seasonal else None, seasonal_periods=SEASON if seasonal else None,
+    )
+    with warnings.catch_warnings():
+        # optimizer sering berhenti di batas phi/alpha; hasilnya tetap dipakai
+        warnings.simplefilter("ignore")
+        return model.fit(disp=False)
+
+
+def fit_series(values, horizon=None, confidence=None):
+    """Fit satu seri bulanan; hasil (dict siap JSON) berisi metode, parameter,
+    serta ``forecast``, ``lower``, ``upper`` untuk ``horizon`` bulan ke depan."""
+    horizon = config.FORECAST_HORIZON if horizon is None else horizon
+    confidence = config.FORECAST_CONFIDENCE if confidence is None else confidence
+    y = np.asarray(values, dtype=np.float64)
+
+    if len(y) < 6:
+        z = norm.ppf(0.5 + confidence / 2)
+        last = y[-1] if len(y) else 0.0
+        sigma = float(np.std(np.diff(y))) if len(y) > 1 else 0.0
+        forecast = np.full(horizon, last)
+        spread = z * sigma * np.sqrt(np.arange(1, horizon + 1))
+        return _result("Naive", {}, forecast, forecast - spread, forecast + spread, sigma)
+
+    # komponen musiman hanya dipakai jika AIC-nya lebih baik dari model tanpa musiman
+    candidates = [_fit_ets(y, seasonal=False)]
+    if len(y) >= 2 * SEASON:
+        candidates.append(_fit_ets(y, seasonal=True))
+    fit = min(candidates, key=lambda fit: fit.aic)
+
+    frame = fit.get_prediction(start=len(y), end=len(y) + horizon - 1).summary_frame(alpha=1 - confidence)
+    fitted = dict(zip(fit.model.param_names, np.asarray(fit.params)))
+    params = {"alpha": fitted["smoothing_level"], "beta": fitted["smoothing_trend"], "phi": fitted["damping_trend"]}
+    method = "ETS(A,Ad,A)" if fit.model.seasonal else "ETS(A,Ad,N)"
+    return _result(method, params, frame["mean"].to_numpy(), frame["pi_lower"].to_numpy(),
+                   frame["pi_upper"].to_numpy(), float(np.sqrt(fit.mse)))
+
+
+def _result(method, params, forecast, lower, upper, sigma):
+    return {
+        "method": method,
+        "params": {k: float(v) for k, v in params.items()},
+        "sigma": sigma,
+        "forecast": forecast.tolist(),
+        "lower": lower.tolist(),
+        "upper": upper.tolist(),
+    }
+
+
+def _fit_job(job):
+    values, horizon, confidence = job
+    return fit_series(values, horizon, confidence)
+
+
+# ======================= SEMUA SERI =======================
+
+class RevenueForecasts:
+    def __init__(self, forecasts, first_month):
+        self.forecasts = forecasts        # (dimensi, grup) -> hasil fit_series
+        self.first_month = first_month    # bulan pertama forecast (Period)
+
+    @classmethod
+    def open_or_fit(cls, tables, last_month, horizon=None, confidence=None, workers=None):
+        """Forecast semua seri di ``SERIES``; seri yang isinya sama dengan cache tidak di-fit ulang."""
+        horizon = config.FORECAST_HORIZON if horizon is None else horizon
+        confidence = config.FORECAST_CONFIDENCE if confidence is None else confidence
+        workers = workers or config.FORECAST_WORKERS
+
+        series = {}
+        for dimension, name in SERIES.items():
+            groups = {dimension: tables[name]} if dimension == "Total" else tables.get(name, {})
+            for group, monthly in groups.items():
+                values = monthly_series(monthly, last_month)
+                if len(values):
+                    series[(dimension, group)] = values
+        import statsmodels
+
+        keys = {
+            item: hashlib.sha1(
+                f"{item[0]}|{item[1]}|{last_month}|{horizon}|{confidence}|statsmodels={statsmodels.__version__}".encode()
+                + values.tobytes()
+            ).hexdigest()
+            for item, values in series.items()
+        }
+
+        directory = os.path.join(config.CACHE_DIR, "forecast")
+        path = os.path.join(directory, "forecasts.json")
+        cached = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                cached = json.load(f)
+
+        missing = [item for item in series if keys[item] not in cached]
+        jobs = [(series[item], horizon, confidence) for item in missing]
+        if len(jobs) > 1 and workers > 1:
+            # spawn, bukan fork: pool dibuat dari thread warmer, dan fork dari proses
+            # multi-thread bisa mewarisi lock yang sedang dipegang thread lain (deadlock)
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), mp_context=context) as pool:
+                fitted = list(pool.map(_fit_job, jobs, chunksize=max(1, len(jobs) // (4 * workers))))
+        else:
+            fitted = [_fit_job(job) for job in jobs]
+        cached.update(zip((keys[item] for item in missing), fitted))
+
+        results = {item: cached[keys[item]] for item in series}
+        if missing or len(cached) != len(results):
+            os.makedirs(directory, exist_ok=True)
+            tmp = f"{path}.tmp-{os.getpid()}"
+            with open(tmp, "w") as f:
+                json.dump({keys[item]: result for item, result in results.items()}, f)
+            os.replace(tmp, path)
+        return cls(results, last_month + 1)
+
+    def get(self, dimension, group):
+        """Hasil fit seri (metode, parameter, forecast) atau None."""
+        return self.forecasts.get((dimension, group))
+
+    def table(self, dimension, group):
+        """Forecast seri sebagai tabel: InvoiceYearMonth, Forecast, Lower, Upper
+        (batas bawah minimal 0); None jika seri tidak ada."""
+        result = self.get(dimension, group)
+        if result is None:
+            return None
+        months = pd.period_range(self.first_month, periods=len(result["forecast"]), freq="M")
+        return pd.DataFrame({
+            "InvoiceYearMonth": months.astype(str),
+            "Forecast": result["forecast"],
+            "Lower": np.maximum(result["lower"], 0.0),
+            "Upper": result["upper"],
+        })
@@ -0,0 +1,67 @@
+"""Label cluster dan segment customer di level baris transaksi tanpa join.
+
+CustomerID tabel transaksi di-encode sekali menjadi kode integer padat
+(0..jumlah customer - 1). Label dari tabel customer disimpan sebagai array
+lookup yang diindeks kode tersebut, sehingga label tiap baris cukup diambil
+dengan ``lookup[kode]`` (gather O(1) per baris), bukan merge/map berbasis
+string sepanjang tabel transaksi.
+
+``build`` meng-encode kode baris lalu membentuk array lookup lewat ``relabel``
+(sebanding jumlah customer). Cache warmer saat ini membangun ulang seluruh
+snapshot, termasuk kode baris, setiap kali data berubah.
+"""
+
+import numpy as np
+import pandas as pd
+
+MISSING = -1  # customer tidak ada di tabel customer / label kosong
+
+
+class CustomerLabels:
+    def __init__(self, row_codes, customers, clusters=None, segments=None, segment_names=()):
+        self.row_codes = row_codes            # kode customer per baris tabel transaksi (posisi)
+        self.customers = customers            # pd.Index CustomerID; posisi = kode
+        self.clusters = clusters              # id cluster per kode customer (MISSING = tidak ada)
+        self.segments = segments              # kode segment per kode customer (MISSING = tidak ada)
+        self.segment_names = list(segment_names)
+
+    @classmethod
+    def build(cls, df, data):
+        codes, customers = pd.factorize(df["CustomerID"])
+        return cls(codes.astype(np.int32), pd.Index(customers)).relabel(data)
+
+    def relabel(self, data):
+        """Array lookup label dari tabel customer ``data`` untuk kode baris yang sama."""
+        table = data.drop_duplicates("CustomerID")
+        position = self.customers.get_indexer(table["CustomerID"])
+        found = position >= 0
+
+        cluster_values = table["Cluster"].to_numpy(dtype=np.float64, na_value=np.nan)
+        clusters = np.full(len(self.customers), MISSING, dtype=np.int16)
+        clusters[position[found]] = np.nan_to_num(cluster_values[found], nan=MISSING).astype(np.int16)
+
+        segment_codes, segment_names = pd.factorize(table["RFM_Segment"].astype(object), sort=True)
+        segments = np.full(len(self.customers), MISSING, dtype=np.int16)
+        segments[position[found]] = segment_codes[found]
+
+        return CustomerLabels(self.row_codes, self.customers, clusters, segments, segment_names)
+
+    def _codes(self, rows=None):
+        return self.row_codes if rows is None else self.row_codes[rows]
+
+    def cluster_of_rows(self, rows=None):
+        """Id cluster per baris transaksi (Int64, <NA> jika customer tidak punya cluster)."""
+        values = self.clusters[self._codes(rows)]
+        return pd.arrays.IntegerArray(values.astype(np.int64), values == MISSING)
+
+    def segment_of_rows(self, rows=None):
+        """RFM_Segment tabel customer per baris transaksi (category)."""
+        return pd.Categorical.from_codes(self.segments[self._codes(rows)], categories=self.segment_names)
+
+    def tag(self, frame, rows=None):
+        """``frame`` (baris ``rows`` tabel transaksi, atau seluruhnya) ditambah kolom
+        ``Cluster`` dan ``CustomerSegment``."""
+        return frame.assign(
+            Cluster=self.cluster_of_rows(rows),
+            CustomerSegment=self.segment_of_rows(rows),
+        )
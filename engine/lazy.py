@@ -0,0 +1,26 @@
+"""Import modul secara malas (saat atribut pertama kali dipakai)."""
+
+import importlib
+import threading
+import types
+
+
+class LazyModule(types.ModuleType):
+    def __init__(self, name):
+        super().__init__(name)
+        self._lock = threading.Lock()
+        self._module = None
+
+    def _load(self):
+        with self._lock:
+            if self._module is None:
+                self._module = importlib.import_module(self.__name__)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+
+def lazy_import(name):
+    """Modul proxy; import sebenarnya terjadi di panel pertama yang memakainya."""
+    return LazyModule(name)
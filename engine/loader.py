@@ -0,0 +1,322 @@
+"""Pemuatan data dashboard dan tahap-tahap pembentukan tabel turunannya.
+
+Tahap-tahap ini dijalankan oleh cache warmer (engine/warmer.py). Modul ini
+sengaja tidak meng-import pandas di level modul, supaya streamlit_app.py
+bisa menampilkan kerangka UI sebelum import berat selesai.
+"""
+
+import glob
+import hashlib
+import os
+
+from engine import config
+
+
+# ======================= LOAD DATA UTAMA =======================
+
+def load_transactions(path=None, optimize=None, return_quarantine=False):
+    """Transaksi bersih; dengan ``return_quarantine`` juga ``Quarantine`` (baris yang
+    dikeluarkan rule cleaning beserta jumlah per rule)."""
+    import pandas as pd
+
+    from engine.cleaning import clean_transactions
+    from engine.sources import CSVSource, get_source
+
+    source = CSVSource(path) if path else get_source("transactions")
+    df = source.read(
+        dtype={
+            "InvoiceNo": "string",
+            "StockCode": "string",
+            "Description": "string",
+            "CustomerID": "string",
+            "Country": "category",
+            "R_Score": "int8",
+            "F_Score": "int8",
+            "M_Score": "int8",
+            "RFM_Score": "int16",
+        },
+        parse_dates=["InvoiceDate"],
+        # baris tanpa ID/nilai tidak dipakai; difilter di sumber (SQL: WHERE)
+        where=[(col, "notnull", None) for col in ("CustomerID", "InvoiceNo", "TotalAmount")],
+    )
+
+    # ===== Pastikan numerik =====
+    num_cols = [
+        "Quantity", "UnitPrice", "TotalAmount",
+        "Recency", "Frequency", "Monetary",
+        "Total_transaction"
+    ]
+
+    for col in num_cols:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+
+    # ===== Drop baris invalid =====
+    df = df.loc[
+        df["CustomerID"].notna() &
+        df["InvoiceNo"].notna() &
+        df["TotalAmount"].notna()
+    ]
+
+    # ===== Rule cleaning (pembatalan, retur, harga 0, outlier) -> karantina =====
+    df, quarantine = clean_transactions(df)
+
+    # ===== Feature waktu (kalau belum ada) =====
+    df["InvoiceYearMonth"] = df["InvoiceDate"].dt.to_period("M")
+    df["InvoiceDate_only"] = df["InvoiceDate"].dt.date
+    df["DayName"] = df["InvoiceDate"].dt.day_name().astype("category")
+    df["Hour"] = df["InvoiceDate"].dt.hour
+    df["InvoiceMonthName"] = df["InvoiceDate"].dt.month_name().astype("category")
+    df = _optimize(df, "transactions", optimize)
+    return (df, quarantine) if return_quarantine else df
+
+
+def load_segmentation(path=None, optimize=None):
+    import pandas as pd
+
+    from engine.sources import CSVSource, get_source
+
+    source = CSVSource(path) if path else get_source("segmentation")
+    data = source.read(
+        dtype={
+            "CustomerID": "string",
+            "RFM_Segment": "category",
+            "Cluster": "int8",
+            "R_Score": "int8",
+            "F_Score": "int8",
+            "M_Score": "int8",
+        }
+    )
+    num_cols = [
+        "Recency", "Frequency", "Monetary", "Quantity_total", "UnitPrice_avg",
+        "TotalAmount_total", "Total_transaction_total", "InvoiceYearMonth_num", "RFM_Score"
+    ]
+    for col in num_cols:
+        data[col] = pd.to_numeric(data[col], errors="coerce")
+    return _optimize(data, "segmentation", optimize)
+
+
+def data_version(name="transactions"):
+    """Versi tabel ``"transactions"`` / ``"segmentation"`` dari sumber data aktif."""
+    from engine.sources import get_source
+    return get_source(name).version()
+
+
+def snapshot_source_version(results, name="transactions"):
+    """Versi tabel ``name`` yang dibaca snapshot ini, diambil dari ``results["version"]``
+    (format ``CacheWarmer.version``: transaksi|segmentasi|bundle|label), bukan stat ulang."""
+    transactions, segmentation = results["version"].split("|")[:2]
+    return {"transactions": transactions, "segmentation": segmentation}[name]
+
+
+def _optimize(frame, name, optimize):
+    """Tipe kolom terkecil yang lossless (engine/schema.py), jika diaktifkan."""
+    if not (config.SCHEMA_OPTIMIZE if optimize is None else optimize):
+        return frame
+    from engine.schema import optimize_frame
+    return optimize_frame(frame, name)
+
+
+# ======================= COLUMNAR CACHE =======================
+
+def _columnar_key(version):
+    # schema kolom dan rule cleaning ikut menentukan isi cache
+    return hashlib.sha1(
+        f"{version}|schema={int(config.SCHEMA_OPTIMIZE)}"
+        f"|clean={','.join(config.CLEAN_RULES)}:{config.CLEAN_OUTLIER_Z}".encode()
+    ).hexdigest()[:16]
+
+
+def cleaned_version(results):
+    """Versi tabel transaksi bersih snapshot ini: versi sumber yang dibaca tahap ``df``
+    + schema + rule cleaning. Dipakai sebagai kunci semua cache yang dibangun dari ``df``."""
+    return _columnar_key(snapshot_source_version(results))
+
+
+def columnar_path(version):
+    """Path cache Parquet transaksi bersih untuk versi data."""
+    return os.path.join(config.CACHE_DIR, "columnar", f"transactions-{_columnar_key(version)}.parquet")
+
+
+def load_transactions_cached(version):
+    """Transaksi bersih dari cache Parquet per versi data.csv; CSV hanya
+    di-parse (dan dibersihkan) jika cache untuk versi tersebut belum ada."""
+    import pandas as pd
+
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return load_transactions()
+
+    cache_dir = os.path.join(config.CACHE_DIR, "columnar")
+    key = _columnar_key(version)
+    path = columnar_path(version)
+    quarantine_path = os.path.join(cache_dir, f"quarantine-{key}")
+    if os.path.exists(path) and os.path.exists(f"{quarantine_path}.json"):
+        return pd.read_parquet(path)
+
+    df, quarantine = load_transactions(return_quarantine=True)
+    df = df.reset_index(drop=True)
+    os.makedirs(cache_dir, exist_ok=True)
+    quarantine.save(quarantine_path)
+    tmp = f"{path}.tmp-{os.getpid()}"
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+    for old in glob.glob(os.path.join(cache_dir, "transactions-*.parquet")) + \
+            glob.glob(os.path.join(cache_dir, "quarantine-*")):
+        if not os.path.basename(old).split(".")[0].endswith(key):
+            os.remove(old)
+    return df
+
+
+def load_quarantine_cached(version):
+    """Baris karantina + jumlah per rule untuk versi data.csv (dibuat bersama cache transaksi)."""
+    from engine.cleaning import Quarantine
+
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return load_transactions(return_quarantine=True)[1]
+
+    path = os.path.join(config.CACHE_DIR, "columnar", f"quarantine-{_columnar_key(version)}")
+    if not os.path.exists(f"{path}.json"):
+        load_transactions_cached(version)
+    return Quarantine.load(path)
+
+
+# ======================= TAHAP PRECOMPUTE =======================
+
+def _build_cluster_labels(results):
+    from engine.cluster_labels import reconcile_with_bundle
+    return reconcile_with_bundle()
+
+
+def _build_labels(results):
+    from engine.labels import CustomerLabels
+    return CustomerLabels.build(results["df"], results["data"])
+
+
+def _build_clv(results):
+    from engine.clv import CLVModel
+    return CLVModel.open_or_fit(results["df"], results["labels"], cleaned_version(results))
+
+
+def _build_cohorts(results):
+    from engine.cohorts import CohortEngine
+    return CohortEngine.open_or_build(results["df"], results["labels"], cleaned_version(results))
+
+
+def _build_topn(results):
+    from engine.topn import TopNEngine
+    return TopNEngine.from_transactions(results["df"])
+
+
+def _build_aov(results):
+    from engine.aov import AOVEngine
+    return AOVEngine.from_transactions(results["df"])
+
+
+def _build_customer_store(results):
+    from engine.feature_store import FeatureStore
+    path = os.path.join(config.CACHE_DIR, "customer_store")
+    # kolom CLV ikut disimpan, jadi versi store juga mengikuti data transaksi;
+    # id cluster stabil mengikuti pemetaan di cluster_labels.json
+    version = (
+        f"{snapshot_source_version(results, 'segmentation')}|clv:{cleaned_version(results)}"
+        f"|labels:{results['cluster_labels'].version}"
+    )
+    return FeatureStore.open_or_build(path, results["clv"].join(results["data"]), version)
+
+
+def _build_queries(results):
+    from engine.aggregation import get_backend
+    from engine.query_plans import open_queries
+    return open_queries(
+        results["df"], results["data"], get_backend(), results["labels"],
+        columnar_path(snapshot_source_version(results))
+    )
+
+
+def _build_aggregates(results):
+    from engine.aggregates import build_aggregates
+    from engine.aggregation import get_backend
+    return build_aggregates(
+        results["df"], results["data"], get_backend(), results["labels"], results["clv"], results["queries"]
+    )
+
+
+def _build_forecasts(results):
+    from engine.forecast import RevenueForecasts, last_complete_month
+    return RevenueForecasts.open_or_fit(results["aggregates"], last_complete_month(results["df"]))
+
+
+def _build_sample(results):
+    from engine.sampling import StratifiedSample
+    return StratifiedSample.build(results["df"], seed=config.SAMPLE_SEED)
+
+
+def _build_promotion(results):
+    from engine.promotion import PromotionSimulator
+    return PromotionSimulator.build(results["data"])
+
+
+def _build_drift(results):
+    from engine.drift import DriftMonitor
+    version = f"{snapshot_source_version(results, 'segmentation')}|labels:{results['cluster_labels'].version}"
+    return DriftMonitor().record(results["data"], version)
+
+
+def _build_neighbors(results):
+    from engine.bundle import ClusteringModel
+    from engine.neighbors import SimilarCustomers
+    if not os.path.exists(config.BUNDLE_PATH):
+        return None
+    return SimilarCustomers.build(ClusteringModel.load(config.BUNDLE_PATH), results["data"])
+
+
+def _build_purchases(results):
+    from engine.purchase_matrix import PurchaseMatrix
+    path = os.path.join(config.CACHE_DIR, "purchase_matrix")
+    return PurchaseMatrix.open_or_update(path, results["df"], cleaned_version(results))
+
+
+def _build_basket(results):
+    from engine.basket import BasketEngine
+    return BasketEngine.from_transactions(
+        results["df"], results["data"], purchases=results["purchases"], labels=results["labels"]
+    )
+
+
+def _build_figures(results):
+    from engine.figures import render_defaults
+    return render_defaults(results)
+
+
+def dashboard_stages():
+    """(label, key, fungsi) untuk setiap tahap; fungsi menerima hasil tahap sebelumnya
+    (termasuk ``results["version"]``). Semua versi sumber di tahap diambil dari
+    ``results["version"]``, tidak ada tahap yang men-stat ulang file data."""
+    return [
+        ("Membaca data transaksi", "df",
+         lambda results: load_transactions_cached(snapshot_source_version(results))),
+        ("Membaca baris karantina cleaning", "quarantine",
+         lambda results: load_quarantine_cached(snapshot_source_version(results))),
+        ("Menyelaraskan label cluster", "cluster_labels", _build_cluster_labels),
+        ("Membaca data segmentasi customer", "data",
+         lambda results: results["cluster_labels"].apply(load_segmentation())),
+        ("Memetakan cluster & segment ke transaksi", "labels", _build_labels),
+        ("Menghitung customer lifetime value", "clv", _build_clv),
+        ("Membangun matriks cohort", "cohorts", _build_cohorts),
+        ("Menyiapkan top-N produk", "topn", _build_topn),
+        ("Menghitung AOV per segment", "aov", _build_aov),
+        ("Menyiapkan feature store customer", "customer_store", _build_customer_store),
+        ("Menyiapkan engine query agregasi", "queries", _build_queries),
+        ("Menghitung tabel agregat", "aggregates", _build_aggregates),
+        ("Forecast tren pendapatan bulanan", "forecasts", _build_forecasts),
+        ("Mengambil sampel terstratifikasi", "sample", _build_sample),
+        ("Menyiapkan simulasi promosi", "promotion", _build_promotion),
+        ("Menyiapkan matriks pembelian customer x produk", "purchases", _build_purchases),
+        ("Mining association rule produk", "basket", _build_basket),
+        ("Membangun index customer serupa", "neighbors", _build_neighbors),
+        ("Membandingkan snapshot segmentasi", "drift", _build_drift),
+        ("Merender figure default", "figures", _build_figures),
+    ]
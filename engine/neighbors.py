@@ -0,0 +1,121 @@
+"""Pencarian customer serupa (lookalike) di ruang fitur model clustering.
+
+Fitur customer ditransformasi dengan bundle model (``ClusteringModel``),
+lalu diindeks dengan KD-tree (``scipy.spatial.cKDTree``). Jarak dihitung
+di ruang yang sama dengan yang dipakai KMeans untuk menentukan cluster.
+
+Untuk jumlah customer besar, query memakai mode approximate: KD-tree boleh
+mengembalikan tetangga yang jaraknya paling jauh ``(1 + eps)`` kali jarak
+tetangga sebenarnya, dengan imbalan pencarian yang jauh lebih sedikit
+memeriksa node. Index dibangun ulang oleh cache warmer setiap kali file
+bundle (atau data customer) berubah.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+from engine import config
+from engine.feature_store import canonical_keys
+
+
+class SimilarCustomers:
+    def __init__(self, customers, features, feature_names, eps=0.0):
+        self.customers = customers            # DataFrame CustomerID + RFM_Segment + Cluster
+        self.features = features
+        self.feature_names = feature_names
+        self.eps = eps
+        self.tree = cKDTree(features)
+        self._keys, self._key_kind = canonical_keys(customers["CustomerID"])
+        self._order = np.argsort(self._keys, kind="stable")
+        self._outside = {}                    # (kolom, nilai) -> (posisi non-anggota, KD-tree)
+
+    @classmethod
+    def build(cls, model, data, eps=None, approx_min_rows=None):
+        """Index dari tabel customer; customer dengan fitur kosong dilewati."""
+        features = model.transform(data)
+        valid = np.isfinite(features).all(axis=1)
+        customers = data.loc[valid, ["CustomerID", "RFM_Segment", "Cluster"]].reset_index(drop=True)
+
+        approx_min_rows = config.NEIGHBORS_APPROX_MIN_ROWS if approx_min_rows is None else approx_min_rows
+        if eps is None:
+            eps = config.NEIGHBORS_EPS if len(customers) >= approx_min_rows else 0.0
+        return cls(customers, features[valid], model.model_features, eps=eps)
+
+    def __len__(self):
+        return len(self.customers)
+
+    @property
+    def approximate(self):
+        return self.eps > 0
+
+    def positions(self, customer_ids):
+        """Posisi baris index untuk setiap CustomerID (-1 jika tidak ada)."""
+        queries, _ = canonical_keys(customer_ids, kind=self._key_kind)
+        sorted_keys = self._keys[self._order]
+        pos = np.searchsorted(sorted_keys, queries).clip(max=max(len(sorted_keys) - 1, 0))
+        found = sorted_keys[pos] == queries if len(sorted_keys) else np.zeros(len(queries), bool)
+        return np.where(found, self._order[pos], -1)
+
+    def query_points(self, points, k):
+        """Batch query: (jarak, posisi) k tetangga terdekat untuk setiap titik."""
+        k = min(k, len(self))
+        distances, positions = self.tree.query(
+            np.atleast_2d(points), k=k, eps=self.eps, workers=config.NEIGHBORS_WORKERS
+        )
+        return distances.reshape(len(points), k), positions.reshape(len(points), k)
+
+    def similar_to_customers(self, customer_ids, k=10):
+        """K customer paling mirip untuk setiap seed (seed sendiri tidak ikut)."""
+        seeds = self.positions(customer_ids)
+        seeds = seeds[seeds >= 0]
+        if len(seeds) == 0:
+            return self._result([], [], [])
+
+        distances, positions = self.query_points(self.features[seeds], k + 1)
+        seed_col = np.repeat(seeds, positions.shape[1])
+        distances, positions = distances.ravel(), positions.ravel()
+        keep = positions != seed_col
+        frame = self._result(positions[keep], distances[keep], seed_col[keep])
+        frame["Rank"] = frame.groupby("SeedCustomerID", sort=False).cumcount() + 1
+        return frame[frame["Rank"] <= k].reset_index(drop=True)
+
+    def _outside_tree(self, column, value):
+        """KD-tree customer di luar grup, dibangun sekali per (kolom, nilai)."""
+        cached = self._outside.get((column, value))
+        if cached is None:
+            outside = np.flatnonzero((self.customers[column] != value).to_numpy())
+            cached = self._outside[(column, value)] = (outside, cKDTree(self.features[outside]))
+        return cached
+
+    def similar_to_group(self, column, value, k=10):
+        """K customer di luar grup (mis. RFM_Segment / Cluster) yang paling dekat
+        dengan anggota grup tersebut (jarak ke anggota terdekat)."""
+        members = np.flatnonzero((self.customers[column] == value).to_numpy())
+        outside, tree = self._outside_tree(column, value)
+        if len(members) == 0 or len(outside) == 0:
+            return self._result([], [], [])
+
+        # cukup k tetangga non-anggota per anggota: customer di top-k pasti termasuk
+        # k non-anggota terdekat dari anggota terdekatnya
+        k_query = min(k, len(outside))
+        distances, positions = tree.query(
+            self.features[members], k=k_query, eps=self.eps, workers=config.NEIGHBORS_WORKERS
+        )
+        candidates = pd.DataFrame({
+            "position": outside[positions.reshape(len(members), k_query).ravel()],
+            "seed": np.repeat(members, k_query),
+            "Distance": distances.reshape(len(members), k_query).ravel(),
+        }).sort_values("Distance", kind="stable").drop_duplicates("position").head(k)
+
+        frame = self._result(candidates["position"], candidates["Distance"], candidates["seed"])
+        frame["Rank"] = np.arange(1, len(frame) + 1)
+        return frame
+
+    def _result(self, positions, distances, seeds):
+        positions = np.asarray(positions, dtype=np.int64)
+        seeds = np.asarray(seeds, dtype=np.int64)
+        frame = self.customers.iloc[positions].reset_index(drop=True)
+        frame.insert(0, "SeedCustomerID", self.customers["CustomerID"].to_numpy()[seeds])
+        frame["Distance"] = np.asarray(distances, dtype=np.float64)
+        return frame
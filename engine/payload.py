@@ -0,0 +1,100 @@
+"""Encoding array figure menjadi typed array plotly.js sebelum dikirim ke browser.
+
+Setiap array numerik di trace (x, y, customdata, marker.size, dst.) diganti
+spesifikasi typed array ``{"dtype": ..., "bdata": <base64>}`` dengan tipe
+terkecil yang aman: integer dipersempit sesuai rentang nilainya, float64
+menjadi float32 jika selisihnya tidak melebihi ``DASHBOARD_PAYLOAD_FLOAT_TOLERANCE``,
+dan array object yang isinya angka (mis. customdata gabungan kolom) ikut
+dikonversi. Encoding dilakukan sekali saat figure dibangun, sehingga setiap
+rerun/sesi hanya menyalin string base64 yang sudah jadi.
+"""
+
+import base64
+
+import numpy as np
+
+from engine import config
+
+_INT_TYPES = [
+    (np.uint8, "u1"), (np.int8, "i1"), (np.uint16, "u2"),
+    (np.int16, "i2"), (np.uint32, "u4"), (np.int32, "i4"),
+]
+# properti yang bukan array data (lihat plotly _plotly_utils.utils.is_skipped_key)
+_SKIPPED_KEYS = {"geojson", "layer", "layers", "range"}
+
+
+def _spec(values, dtype):
+    spec = {"dtype": dtype, "bdata": base64.b64encode(np.ascontiguousarray(values)).decode("ascii")}
+    if values.ndim > 1:
+        spec["shape"] = ", ".join(str(n) for n in values.shape)
+    return spec
+
+
+def _numeric(values):
+    """Array object berisi angka (tanpa NaN) -> array float; selain itu None."""
+    flat = values.ravel()
+    if not all(isinstance(v, (int, float, np.integer, np.floating)) and not isinstance(v, bool) for v in flat):
+        return None
+    values = values.astype(np.float64)
+    # NaN di array object dikirim plotly sebagai null; biarkan apa adanya
+    return values if np.isfinite(values).all() else None
+
+
+def encode_array(values, float_tolerance=None):
+    """Typed array spec untuk ``values``, atau None jika tidak bisa di-encode."""
+    tolerance = config.PAYLOAD_FLOAT_TOLERANCE if float_tolerance is None else float_tolerance
+    values = np.asarray(values)
+    if values.size == 0:
+        return None
+    if values.dtype.kind == "O":
+        values = _numeric(values)
+        if values is None:
+            return None
+
+    if values.dtype.kind == "f" and np.isfinite(values).all() and (values == np.round(values)).all():
+        values = values.astype(np.int64) if np.abs(values).max() < 2 ** 53 else values
+
+    if values.dtype.kind in "iu":
+        low, high = values.min(), values.max()
+        for dtype, name in _INT_TYPES:
+            info = np.iinfo(dtype)
+            if info.min <= low and high <= info.max:
+                return _spec(values.astype(dtype), name)
+        return None
+
+    if values.dtype.kind == "f":
+        values = values.astype(np.float64)
+        narrow = values.astype(np.float32)
+        with np.errstate(invalid="ignore"):
+            error = np.abs(narrow.astype(np.float64) - values)
+        finite = np.isfinite(values)
+        if (np.isfinite(narrow) == finite).all() and (error[finite] <= tolerance).all():
+            return _spec(narrow, "f4")
+        return _spec(values, "f8")
+    return None
+
+
+def _encode_props(props, float_tolerance):
+    changes = {}
+    for key, value in props.items():
+        if key in _SKIPPED_KEYS:
+            continue
+        if isinstance(value, dict):
+            nested = _encode_props(value, float_tolerance)
+            if nested:
+                changes[key] = nested
+        elif isinstance(value, np.ndarray):
+            spec = encode_array(value, float_tolerance)
+            if spec is not None:
+                changes[key] = spec
+    return changes
+
+
+def encode_figure(fig, float_tolerance=None):
+    """Ganti array numerik setiap trace ``fig`` dengan typed array (in-place)."""
+    for trace in fig.data:
+        changes = _encode_props(trace.to_plotly_json(), float_tolerance)
+        if changes:
+            trace.update(changes)
+    return fig
+
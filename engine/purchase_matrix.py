@@ -0,0 +1,221 @@
+"""Matriks pembelian customer x produk (CSR sparse) dengan ID yang di-encode.
+
+CustomerID dan StockCode di-encode menjadi kode integer lewat
+``Vocabulary`` (kode lama tidak pernah berubah, ID baru ditambahkan di
+akhir). Nilai per sel adalah total Quantity dan TotalAmount (net, termasuk
+pembatalan). Matriks disimpan di disk dan diperbarui secara inkremental:
+jika data.csv hanya bertambah baris di akhir, hanya baris baru yang diproses.
+
+Dipakai bersama oleh analisis preferensi produk per segment, market basket
+(vocabulary produk yang sama), dan pencarian customer serupa.
+"""
+
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+VALUE_COLUMNS = {"quantity": "Quantity", "revenue": "TotalAmount"}
+_FINGERPRINT_COLUMNS = ["InvoiceNo", "CustomerID", "StockCode", "Quantity", "TotalAmount"]
+
+
+# ======================= DICTIONARY ENCODING =======================
+
+class Vocabulary:
+    """ID (string) -> kode integer yang stabil."""
+
+    def __init__(self, keys=()):
+        self.keys = np.asarray(keys, dtype=object)
+        self._index = pd.Index(self.keys)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def encode(self, values, grow=True):
+        """Kode untuk setiap nilai; ID baru ditambahkan jika ``grow`` (selain itu -1)."""
+        values = pd.Series(values, dtype="string").reset_index(drop=True)
+        codes = self._index.get_indexer(values)
+        unseen = (codes < 0) & values.notna().to_numpy()
+        if grow and unseen.any():
+            new_keys = pd.unique(values[unseen].to_numpy(dtype=object))
+            self.keys = np.concatenate([self.keys, new_keys])
+            self._index = pd.Index(self.keys)
+            codes = self._index.get_indexer(values)
+        return codes.astype(np.int64)
+
+    def decode(self, codes):
+        return self.keys[np.asarray(codes, dtype=np.int64)]
+
+
+def _fingerprint(df):
+    """Hash baris transaksi yang bisa dijumlahkan (hash(a + b) = hash(a) + hash(b))."""
+    if df.empty:
+        return 0
+    hashed = pd.util.hash_pandas_object(df[_FINGERPRINT_COLUMNS], index=False).to_numpy()
+    return int(hashed.sum(dtype=np.uint64))
+
+
+def _combine(*fingerprints):
+    return int(sum(fingerprints) % 2 ** 64)
+
+
+# ======================= MATRIKS PEMBELIAN =======================
+
+class PurchaseMatrix:
+    def __init__(self, customers, products, descriptions, matrices, rows=0, fingerprint=0, source_version=""):
+        self.customers = customers        # Vocabulary CustomerID
+        self.products = products          # Vocabulary StockCode
+        self.descriptions = descriptions  # deskripsi per kode produk
+        self.matrices = matrices          # {"quantity"/"revenue": csr_matrix}
+        self.rows = rows                  # jumlah baris transaksi yang sudah diproses
+        self.fingerprint = fingerprint
+        self.source_version = source_version
+
+    @classmethod
+    def empty(cls):
+        return cls(
+            Vocabulary(), Vocabulary(), np.array([], dtype=object),
+            {name: sparse.csr_matrix((0, 0)) for name in VALUE_COLUMNS},
+        )
+
+    @classmethod
+    def from_transactions(cls, df, source_version=""):
+        matrix = cls.empty()
+        matrix.update(df)
+        matrix.source_version = source_version
+        return matrix
+
+    @property
+    def shape(self):
+        return len(self.customers), len(self.products)
+
+    def __getitem__(self, name):
+        return self.matrices[name]
+
+    def update(self, new_rows):
+        """Tambahkan transaksi baru ke matriks (in-place)."""
+        valid = (new_rows["CustomerID"].notna() & new_rows["StockCode"].notna()).to_numpy()
+        rows = new_rows.loc[valid]
+
+        cust = self.customers.encode(rows["CustomerID"])
+        n_products = len(self.products)
+        prod = self.products.encode(rows["StockCode"])
+
+        # deskripsi produk baru = deskripsi pertama yang muncul
+        if len(self.products) > n_products:
+            new = prod >= n_products
+            codes, first = np.unique(prod[new], return_index=True)
+            desc = np.full(len(self.products) - n_products, "", dtype=object)
+            desc[codes - n_products] = (
+                rows["Description"].astype("string").fillna("").to_numpy(dtype=object)[np.flatnonzero(new)[first]]
+            )
+            self.descriptions = np.concatenate([self.descriptions, desc])
+
+        shape = self.shape
+        for name, column in VALUE_COLUMNS.items():
+            values = pd.to_numeric(rows[column], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+            delta = sparse.csr_matrix((np.nan_to_num(values), (cust, prod)), shape=shape)
+            delta.sum_duplicates()
+            current = self.matrices[name].copy()
+            current.resize(shape)
+            self.matrices[name] = (current + delta).tocsr()
+
+        self.rows += len(new_rows)
+        self.fingerprint = _combine(self.fingerprint, _fingerprint(new_rows))
+        return self
+
+    # ======================= PENYIMPANAN =======================
+
+    def save(self, path):
+        """Simpan ke ``path`` (diganti secara atomik, tanpa pickle)."""
+        tmp = f"{path}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        np.save(os.path.join(tmp, "customers.npy"), self.customers.keys.astype(str))
+        np.save(os.path.join(tmp, "products.npy"), self.products.keys.astype(str))
+        np.save(os.path.join(tmp, "descriptions.npy"), self.descriptions.astype(str))
+        for name, matrix in self.matrices.items():
+            sparse.save_npz(os.path.join(tmp, f"{name}.npz"), matrix)
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump({
+                "rows": self.rows,
+                "fingerprint": str(self.fingerprint),
+                "source_version": self.source_version,
+            }, f)
+
+        old = f"{path}.old-{os.getpid()}"
+        if os.path.exists(path):
+            os.replace(path, old)
+        os.replace(tmp, path)
+        shutil.rmtree(old, ignore_errors=True)
+
+    @classmethod
+    def load(cls, path):
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        return cls(
+            Vocabulary(np.load(os.path.join(path, "customers.npy")).astype(object)),
+            Vocabulary(np.load(os.path.join(path, "products.npy")).astype(object)),
+            np.load(os.path.join(path, "descriptions.npy")).astype(object),
+            {name: sparse.load_npz(os.path.join(path, f"{name}.npz")).tocsr() for name in VALUE_COLUMNS},
+            rows=meta["rows"],
+            fingerprint=int(meta["fingerprint"]),
+            source_version=meta["source_version"],
+        )
+
+    @classmethod
+    def open_or_update(cls, path, df, source_version):
+        """Buka matriks tersimpan; jika data hanya bertambah di akhir, proses baris
+        baru saja; selain itu bangun ulang dari ``df``."""
+        try:
+            matrix = cls.load(path)
+        except (FileNotFoundError, KeyError, ValueError):
+            matrix = None
+
+        if matrix is not None and matrix.source_version == source_version:
+            return matrix
+        if (
+            matrix is not None
+            and matrix.rows <= len(df)
+            and _fingerprint(df.iloc[:matrix.rows]) == matrix.fingerprint
+        ):
+            matrix.update(df.iloc[matrix.rows:])
+        else:
+            matrix = cls.from_transactions(df)
+        matrix.source_version = source_version
+        matrix.save(path)
+        return matrix
+
+    # ======================= QUERY =======================
+
+    def customer_products(self, customer_id, value="revenue", n=10):
+        """Produk teratas satu customer berdasarkan ``value``."""
+        code = self.customers.encode([customer_id], grow=False)[0]
+        if code < 0:
+            return pd.DataFrame(columns=["StockCode", "Description", value])
+        row = self.matrices[value].getrow(code)
+        order = np.argsort(-row.data, kind="stable")[:n]
+        cols = row.indices[order]
+        return pd.DataFrame({
+            "StockCode": self.products.decode(cols),
+            "Description": self.descriptions[cols],
+            value: row.data[order],
+        })
+
+    def group_totals(self, customer_labels, value="revenue"):
+        """Total per (grup customer x produk), mis. preferensi produk per segment.
+
+        ``customer_labels`` adalah Series label grup dengan index CustomerID.
+        Mengembalikan (label grup, csr_matrix grup x produk).
+        """
+        codes = self.customers.encode(customer_labels.index, grow=False)
+        group_codes, groups = pd.factorize(customer_labels, sort=True)
+        keep = (codes >= 0) & (group_codes >= 0)
+        indicator = sparse.csr_matrix(
+            (np.ones(keep.sum()), (group_codes[keep], codes[keep])),
+            shape=(len(groups), len(self.customers)),
+        )
+        return np.asarray(groups), (indicator @ self.matrices[value]).tocsr()
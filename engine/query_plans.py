@@ -0,0 +1,195 @@
+"""Query plan agregasi panel dan engine yang menjalankannya.
+
+Setiap agregasi transaksi yang dipakai panel (revenue per negara, tren
+bulanan, aktivitas per hari/jam/bulan, metrik per segment dan per cluster)
+didefinisikan sekali sebagai ``QueryPlan``: kolom group-by dan agregasi
+bernama, sama seperti argumen ``groupby().agg()``. Plan yang sama bisa
+dijalankan oleh dua engine dengan hasil yang sama:
+
+- ``PandasQueries``: groupby di memori lewat backend agregasi
+  (engine/aggregation.py), perilaku default
+- ``DuckDBQueries``: plan diterjemahkan menjadi SQL dan dijalankan DuckDB
+  (in-process, scan kolumnar multithread) langsung di atas cache Parquet
+  transaksi bersih. Hanya kolom yang dipakai plan yang dibaca, filter
+  ``where`` di-push ke scan Parquet, dan hanya hasil agregat yang kembali
+  ke pandas
+
+Engine dipilih lewat ``DASHBOARD_QUERY_ENGINE``; jika DuckDB tidak
+terpasang atau cache Parquet tidak ada, dipakai engine pandas.
+"""
+
+import os
+import threading
+
+from engine import config
+from engine.sources import apply_where, where_sql
+
+_SQL_FUNCS = {"sum": "SUM({})", "count": "COUNT({})", "nunique": "COUNT(DISTINCT {})",
+              "mean": "AVG({})", "min": "MIN({})", "max": "MAX({})"}
+
+# kolom turunan: ekspresi SQL (t = transaksi, c = tabel customer) dan fungsi pandas
+# (frame, labels); kolom lain dibaca langsung dari tabel transaksi
+SQL_DERIVED = {
+    "InvoiceYearMonth": "strftime(t.\"InvoiceDate\", '%Y-%m')",
+    "LineAmount": 't."Quantity" * t."UnitPrice"',
+    "Cluster": 'c."Cluster"',
+}
+PANDAS_DERIVED = {
+    "LineAmount": lambda df, labels: df["Quantity"] * df["UnitPrice"],
+    "Cluster": lambda df, labels: labels.cluster_of_rows(),
+}
+
+
+class QueryPlan:
+    def __init__(self, by, **aggs):
+        self.by = [by] if isinstance(by, str) else list(by)
+        self.aggs = aggs  # nama output -> (kolom, fungsi)
+
+    @property
+    def columns(self):
+        return list(dict.fromkeys(self.by + [col for col, _ in self.aggs.values()]))
+
+    def sql(self, relation, where=(), integer_columns=()):
+        """(SQL, parameter) untuk DuckDB; ``relation`` = sumber tabel transaksi."""
+        def ref(col):
+            return SQL_DERIVED.get(col, f't."{col}"')
+
+        select = [f'{ref(col)} AS "{col}"' for col in self.by]
+        for name, (col, func) in self.aggs.items():
+            expr = _SQL_FUNCS[func].format(ref(col))
+            # SUM kolom integer dikembalikan sebagai BIGINT (bukan HUGEINT/float)
+            if func == "sum" and col in integer_columns:
+                expr = f"CAST({expr} AS BIGINT)"
+            select.append(f'{expr} AS "{name}"')
+
+        # seperti groupby pandas: grup dengan kunci kosong tidak ikut
+        clauses, params = where_sql([(col, "notnull", None) for col in self.by] + list(where), ref)
+
+        join = ' LEFT JOIN customers c ON t."CustomerID" = c."CustomerID"' if "Cluster" in self.columns else ""
+        # kunci dirujuk per posisi: alias bisa sama dengan nama kolom tabel (InvoiceYearMonth)
+        keys = ", ".join(str(i) for i in range(1, len(self.by) + 1))
+        return (
+            f"SELECT {', '.join(select)} FROM {relation} t{join} "
+            f"WHERE {' AND '.join(clauses)} GROUP BY {keys} ORDER BY {keys}",
+            params,
+        )
+
+
+_MONTHLY = dict(
+    TotalAmount=("TotalAmount", "sum"),
+    Orders=("InvoiceNo", "nunique"),
+    Active_Customers=("CustomerID", "nunique"),
+)
+_LINE_MONTHLY = dict(_MONTHLY, TotalAmount=("LineAmount", "sum"))
+_COUNTRY_SALES = dict(
+    TotalRevenue=("TotalAmount", "sum"),
+    TransactionCount=("TotalAmount", "count"),
+    TotalQuantity=("Quantity", "sum"),
+    UniqueInvoices=("InvoiceNo", "nunique"),
+)
+_CLUSTER_METRICS = dict(
+    TotalRevenue=("TotalAmount", "sum"),
+    TotalQuantity=("Quantity", "sum"),
+    Invoices=("InvoiceNo", "nunique"),
+)
+
+PLANS = {
+    "country_overview": QueryPlan(
+        "Country", TotalRevenue=("TotalAmount", "sum"), TransactionCount=("InvoiceNo", "nunique")
+    ),
+    "country_sales": QueryPlan("Country", **_COUNTRY_SALES),
+    # TotalAmount dihitung ulang dari Quantity x UnitPrice
+    "country_sales_lines": QueryPlan("Country", **dict(_COUNTRY_SALES, TotalRevenue=("LineAmount", "sum"))),
+    "monthly": QueryPlan("InvoiceYearMonth", **_MONTHLY),
+    "monthly_by_country": QueryPlan(["Country", "InvoiceYearMonth"], **_LINE_MONTHLY),
+    "monthly_by_segment": QueryPlan(["RFM_Segment", "InvoiceYearMonth"], **_MONTHLY),
+    "day_sales": QueryPlan("DayName", TransactionCount=("InvoiceNo", "nunique")),
+    "hourly_by_day": QueryPlan(["DayName", "Hour"], TransactionCount=("InvoiceNo", "nunique")),
+    "month_sales": QueryPlan("InvoiceMonthName", TransactionCount=("InvoiceNo", "nunique")),
+    "segment_customers": QueryPlan("RFM_Segment", Count=("CustomerID", "nunique")),
+    "segment_revenue": QueryPlan("RFM_Segment", TotalRevenue=("TotalAmount", "sum")),
+    "segment_countries": QueryPlan(["RFM_Segment", "Country"], Customer_Count=("CustomerID", "nunique")),
+    "cluster_by_product": QueryPlan(["Cluster", "Description"], **_CLUSTER_METRICS),
+    "cluster_by_country": QueryPlan(["Cluster", "Country"], **_CLUSTER_METRICS),
+    "cluster_by_month": QueryPlan(["Cluster", "InvoiceYearMonth"], **_CLUSTER_METRICS),
+}
+
+
+# ======================= ENGINE =======================
+
+def _finish(grouped, plan):
+    """Kunci bulan (Period di pandas) menjadi string 'YYYY-MM' seperti hasil SQL."""
+    if "InvoiceYearMonth" in plan.by:
+        grouped["InvoiceYearMonth"] = grouped["InvoiceYearMonth"].astype(str)
+    return grouped
+
+
+class PandasQueries:
+    engine = "pandas"
+
+    def __init__(self, df, agg, labels=None):
+        self.df = df
+        self.agg = agg
+        self.labels = labels  # dibutuhkan plan per cluster
+
+    def run(self, name, where=()):
+        """Hasil plan ``name``: kolom group-by + agregasi, urut berdasarkan kunci."""
+        plan = PLANS[name]
+        columns = list(dict.fromkeys(plan.columns + [col for col, _, _ in where]))
+        frame = self.df[[col for col in columns if col not in PANDAS_DERIVED]]
+        derived = {col: PANDAS_DERIVED[col](self.df, self.labels) for col in columns if col in PANDAS_DERIVED}
+        if derived:
+            frame = frame.assign(**derived)
+        if where:
+            frame = apply_where(frame, where)
+        by = plan.by[0] if len(plan.by) == 1 else plan.by
+        grouped = self.agg.groupby_agg(frame, by, observed=True, **plan.aggs).reset_index()
+        return _finish(grouped, plan)
+
+
+class DuckDBQueries:
+    engine = "duckdb"
+
+    def __init__(self, path, data, threads=None):
+        import duckdb
+
+        self.path = path
+        self.conn = duckdb.connect()
+        self.conn.execute(f"SET threads = {int(threads or config.QUERY_THREADS)}")
+        # tabel customer kecil untuk label cluster (tabel, agar terlihat dari semua cursor)
+        self.conn.register("customer_labels", data[["CustomerID", "Cluster"]])
+        self.conn.execute("CREATE TABLE customers AS SELECT * FROM customer_labels")
+        self.conn.unregister("customer_labels")
+        schema = self.conn.execute(f"DESCRIBE SELECT * FROM {self.relation}").fetchall()
+        self.integer_columns = {
+            name for name, dtype, *_ in schema if dtype in ("TINYINT", "SMALLINT", "INTEGER", "BIGINT")
+        }
+        self._local = threading.local()
+
+    @property
+    def relation(self):
+        path = self.path.replace("'", "''")
+        return f"read_parquet('{path}')"
+
+    def _cursor(self):
+        # koneksi DuckDB tidak thread-safe; setiap thread memakai cursor sendiri
+        cursor = getattr(self._local, "cursor", None)
+        if cursor is None:
+            cursor = self._local.cursor = self.conn.cursor()
+        return cursor
+
+    def run(self, name, where=()):
+        sql, params = PLANS[name].sql(self.relation, where, self.integer_columns)
+        return self._cursor().execute(sql, params).df()
+
+
+def open_queries(df, data, agg, labels=None, parquet_path=None):
+    """Engine sesuai ``DASHBOARD_QUERY_ENGINE`` (fallback ke pandas)."""
+    if config.QUERY_ENGINE == "duckdb" and parquet_path and os.path.exists(parquet_path):
+        try:
+            return DuckDBQueries(parquet_path, data)
+        except ImportError:
+            pass
+    elif config.QUERY_ENGINE not in ("pandas", "duckdb"):
+        raise ValueError(f"Engine query tidak dikenal: {config.QUERY_ENGINE!r}")
+    return PandasQueries(df, agg, labels)
@@ -0,0 +1,161 @@
+"""Sampel terstratifikasi untuk eksplorasi cepat (mode approximate).
+
+Invoice dibagi ke strata (Country, InvoiceYearMonth, RFM_Segment) berdasarkan
+baris pertamanya, lalu dari setiap stratum diambil acak sebagian invoice
+(``DASHBOARD_SAMPLE_FRACTION``, minimal ``DASHBOARD_SAMPLE_MIN_PER_STRATUM``).
+Semua baris invoice terpilih disimpan, sehingga filter apa pun (negara,
+segment, teks produk) bisa dijalankan pada sampel.
+
+Estimasi per grup memakai bobot N_h / n_h (Horvitz-Thompson) dan varians
+sampel terstratifikasi dengan koreksi populasi hingga:
+
+- Revenue  : total TotalAmount
+- Invoices : jumlah invoice yang memiliki baris sesuai filter
+- AOV      : Revenue / Invoices (ratio estimator, varians dilinearisasi)
+
+Hasil exact dihitung dengan ``exact_estimate`` pada tabel transaksi penuh.
+"""
+
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from engine import config
+
+STRATA = ["Country", "InvoiceYearMonth", "RFM_Segment"]
+RESULT_COLUMNS = [
+    "Revenue", "Revenue_low", "Revenue_high",
+    "Invoices", "Invoices_low", "Invoices_high",
+    "AOV", "AOV_low", "AOV_high", "Sampled",
+]
+_ROW_COLUMNS = STRATA + ["Description", "TotalAmount"]
+
+
+def _z(confidence):
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+def _filter_mask(frame, countries=None, segments=None, description=None):
+    mask = np.ones(len(frame), dtype=bool)
+    if countries:
+        mask &= frame["Country"].isin(countries).to_numpy()
+    if segments:
+        mask &= frame["RFM_Segment"].isin(segments).to_numpy()
+    if description:
+        mask &= frame["Description"].str.contains(description, case=False, regex=False).fillna(False).to_numpy(dtype=bool)
+    return mask
+
+
+def _group_labels(values):
+    """Label grup untuk tampilan (Period -> '2011-01')."""
+    return values.astype(str) if isinstance(values.dtype, pd.PeriodDtype) else values
+
+
+class StratifiedSample:
+    def __init__(self, rows, invoice_stratum, population, sample_sizes, fraction):
+        self.rows = rows                        # baris invoice terpilih + kolom "_invoice" (posisi invoice sampel)
+        self.invoice_stratum = invoice_stratum  # stratum setiap invoice sampel
+        self.population = population            # N_h: jumlah invoice per stratum
+        self.sample_sizes = sample_sizes        # n_h: jumlah invoice sampel per stratum
+        self.fraction = fraction
+
+    @classmethod
+    def build(cls, df, fraction=None, min_per_stratum=None, seed=0):
+        fraction = config.SAMPLE_FRACTION if fraction is None else fraction
+        min_per_stratum = config.SAMPLE_MIN_PER_STRATUM if min_per_stratum is None else min_per_stratum
+
+        inv_codes, _ = pd.factorize(df["InvoiceNo"])
+        first = np.unique(inv_codes, return_index=True)[1]
+        stratum = df[STRATA].iloc[first].groupby(STRATA, observed=True, sort=False, dropna=False).ngroup().to_numpy()
+
+        population = np.bincount(stratum)
+        sample_sizes = np.minimum(
+            np.maximum(np.ceil(population * fraction).astype(np.int64), min_per_stratum), population
+        )
+
+        # urutan acak di dalam stratum; ambil n_h invoice pertama
+        rng = np.random.default_rng(seed)
+        order = np.lexsort((rng.random(len(stratum)), stratum))
+        starts = np.concatenate([[0], np.cumsum(population)[:-1]])
+        rank = np.empty(len(stratum), dtype=np.int64)
+        rank[order] = np.arange(len(stratum)) - starts[stratum[order]]
+        chosen = rank < sample_sizes[stratum]
+
+        local = np.full(len(stratum), -1, dtype=np.int64)
+        local[chosen] = np.arange(chosen.sum())
+        row_mask = chosen[inv_codes]
+        rows = df.loc[row_mask, _ROW_COLUMNS].reset_index(drop=True)
+        rows["_invoice"] = local[inv_codes[row_mask]]
+        return cls(rows, stratum[chosen], population, sample_sizes, fraction)
+
+    def __len__(self):
+        return len(self.invoice_stratum)
+
+    def estimate(self, by, countries=None, segments=None, description=None, confidence=None):
+        """Estimasi + interval kepercayaan per nilai kolom ``by`` untuk baris sesuai filter.
+
+        ``Sampled`` = jumlah invoice sampel di grup; grup dengan sampel kecil
+        intervalnya kurang akurat (aproksimasi normal)."""
+        z = _z(config.SAMPLE_CONFIDENCE if confidence is None else confidence)
+        rows = self.rows[_filter_mask(self.rows, countries, segments, description)]
+        if rows.empty:
+            return pd.DataFrame(columns=[by] + RESULT_COLUMNS)
+
+        group_codes, groups = pd.factorize(rows[by], sort=True)
+        n_groups = len(groups)
+        n_strata = len(self.population)
+
+        # nilai per (invoice sampel, grup): z = revenue, c = 1 (invoice punya baris di grup)
+        pair, pair_index = np.unique(rows["_invoice"].to_numpy() * n_groups + group_codes, return_inverse=True)
+        z_pair = np.bincount(pair_index, weights=rows["TotalAmount"].to_numpy(dtype=np.float64))
+        cell = self.invoice_stratum[pair // n_groups] * n_groups + pair % n_groups
+
+        def per_cell(weights=None):
+            return np.bincount(cell, weights=weights, minlength=n_strata * n_groups).reshape(n_strata, n_groups)
+
+        s_z, s_zz, s_c = per_cell(z_pair), per_cell(z_pair ** 2), per_cell()
+
+        N = self.population.astype(np.float64)[:, None]
+        n = self.sample_sizes.astype(np.float64)[:, None]
+        factor = np.where(n > 1, N ** 2 * (1 - n / N) / n / np.maximum(n - 1, 1), 0.0)
+
+        def variance(s_sum, s_sq):
+            return (factor * np.maximum(s_sq - s_sum ** 2 / n, 0.0)).sum(axis=0)
+
+        revenue = (N / n * s_z).sum(axis=0)
+        invoices = (N / n * s_c).sum(axis=0)
+        aov = np.divide(revenue, invoices, out=np.zeros_like(revenue), where=invoices > 0)
+        # u = z - AOV * c (linearisasi ratio estimator)
+        s_u = s_z - aov * s_c
+        s_uu = s_zz - 2 * aov * s_z + aov ** 2 * s_c
+
+        rev_se = np.sqrt(variance(s_z, s_zz))
+        inv_se = np.sqrt(variance(s_c, s_c))
+        aov_se = np.divide(np.sqrt(variance(s_u, s_uu)), invoices, out=np.zeros_like(revenue), where=invoices > 0)
+
+        result = pd.DataFrame({
+            by: _group_labels(pd.Series(groups)),
+            "Revenue": revenue, "Revenue_low": revenue - z * rev_se, "Revenue_high": revenue + z * rev_se,
+            "Invoices": invoices, "Invoices_low": invoices - z * inv_se, "Invoices_high": invoices + z * inv_se,
+            "AOV": aov, "AOV_low": aov - z * aov_se, "AOV_high": aov + z * aov_se,
+            "Sampled": s_c.sum(axis=0).astype(np.int64),
+        })
+        return result
+
+
+def exact_estimate(df, by, countries=None, segments=None, description=None):
+    """Nilai exact dari tabel transaksi penuh (kolom sama dengan ``estimate``)."""
+    rows = df.loc[_filter_mask(df, countries, segments, description), [by, "InvoiceNo", "TotalAmount"]]
+    grouped = rows.groupby(by, observed=True).agg(
+        Revenue=("TotalAmount", "sum"), Invoices=("InvoiceNo", "nunique")
+    )
+    grouped["AOV"] = grouped["Revenue"] / grouped["Invoices"]
+    for col in ("Revenue", "Invoices", "AOV"):
+        grouped[f"{col}_low"] = grouped[col]
+        grouped[f"{col}_high"] = grouped[col]
+    grouped["Sampled"] = grouped["Invoices"]
+
+    result = grouped[RESULT_COLUMNS].reset_index()
+    result[by] = _group_labels(result[by])
+    return result
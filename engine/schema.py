@@ -0,0 +1,177 @@
+"""Optimasi tipe kolom tabel transaksi dan tabel customer tanpa mengubah nilai.
+
+Setiap kolom diprofil sekali dan diberi tipe terkecil yang lossless:
+
+- integer, atau float yang semua nilainya bulat tanpa NaN -> int8/int16/int32
+- float -> float32 jika setiap nilai (termasuk NaN) sama persis setelah
+  dikonversi; selain itu tetap float64
+- string dengan nilai unik <= ``DASHBOARD_SCHEMA_MAX_CATEGORIES`` -> category
+
+Keputusan disimpan di ``<CACHE_DIR>/schema/<nama>.json`` beserta laporan
+memori sebelum/sesudah, lalu dipakai ulang pada load berikutnya. Kolom hanya
+diprofil ulang jika nilainya tidak lagi muat di tipe yang tersimpan. Laporan
+memori kedua tabel::
+
+    python -m engine.schema
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from engine import config
+
+_INT_DTYPES = ["int8", "int16", "int32"]
+
+
+# ======================= PROFIL KOLOM =======================
+
+def _is_text(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return False
+    return pd.api.types.is_string_dtype(series.dtype) and pd.api.types.infer_dtype(series, skipna=True) == "string"
+
+
+def _int_dtype(values):
+    """Tipe integer terkecil untuk ``values`` (numpy, tanpa NaN), atau None."""
+    if len(values) == 0:
+        return None
+    low, high = values.min(), values.max()
+    for dtype in _INT_DTYPES:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return dtype
+    return None
+
+
+def _fits(series, dtype):
+    """Apakah ``series`` bisa dikonversi ke ``dtype`` tanpa mengubah nilai."""
+    if dtype == str(series.dtype):
+        return True
+    if dtype == "category":
+        return isinstance(series.dtype, pd.CategoricalDtype) or (
+            _is_text(series) and series.nunique(dropna=True) <= config.SCHEMA_MAX_CATEGORIES
+        )
+    if not pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+        return False
+
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    if dtype in _INT_DTYPES:
+        if not np.isfinite(values).all() or (values != np.round(values)).any():
+            return False
+        info = np.iinfo(dtype)
+        return len(values) == 0 or (info.min <= values.min() and values.max() <= info.max)
+    if dtype == "float32":
+        narrow = values.astype(np.float32).astype(np.float64)
+        return bool(((narrow == values) | (np.isnan(narrow) & np.isnan(values))).all())
+    return False
+
+
+def profile_column(series):
+    """Tipe terkecil yang lossless untuk satu kolom (None = biarkan apa adanya)."""
+    if _is_text(series):
+        n_unique = series.nunique(dropna=True)
+        if n_unique <= config.SCHEMA_MAX_CATEGORIES and n_unique < max(len(series), 1):
+            return "category"
+        return None
+
+    if not pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+        return None
+    if isinstance(series.dtype, pd.CategoricalDtype) or not isinstance(series.dtype, np.dtype):
+        return None
+
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    if np.isfinite(values).all() and (values == np.round(values)).all():
+        dtype = _int_dtype(values)
+        if dtype is not None:
+            return dtype
+    if series.dtype.kind == "f" and _fits(series, "float32"):
+        return "float32"
+    return None
+
+
+def _convert(series, dtype):
+    if dtype == "category":
+        # kategori bertipe object (sama dengan kolom category hasil read_csv)
+        return series.astype(object).where(series.notna(), np.nan).astype("category")
+    return series.astype(dtype)
+
+
+# ======================= LAPORAN MEMORI =======================
+
+def memory_report(before, after):
+    """Memori per kolom (byte) sebelum dan sesudah optimasi."""
+    report = pd.DataFrame({
+        "DtypeBefore": before.dtypes.astype(str),
+        "DtypeAfter": after.dtypes.astype(str),
+        "BytesBefore": before.memory_usage(index=False, deep=True),
+        "BytesAfter": after.memory_usage(index=False, deep=True),
+    })
+    report.index.name = "Column"
+    return report.reset_index()
+
+
+# ======================= SCHEMA TERSIMPAN =======================
+
+def schema_path(name):
+    return os.path.join(config.CACHE_DIR, "schema", f"{name}.json")
+
+
+def load_schema(name):
+    try:
+        with open(schema_path(name)) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _save_schema(name, doc):
+    path = schema_path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with open(tmp, "w") as f:
+        json.dump(doc, f, indent=2)
+    os.replace(tmp, path)
+
+
+def optimize_frame(frame, name):
+    """``frame`` dengan tipe kolom hasil optimasi (schema ``name`` dipakai ulang
+    jika masih cocok, selain itu diprofil ulang lalu disimpan)."""
+    stored = load_schema(name) or {}
+    stored_columns = stored.get("columns", {})
+
+    columns, converted = {}, {}
+    for col in frame.columns:
+        series = frame[col]
+        dtype = stored_columns.get(col, "")
+        if col not in stored_columns or (dtype and not _fits(series, dtype)):
+            dtype = profile_column(series) or ""
+        columns[col] = dtype
+        if dtype and dtype != str(series.dtype):
+            converted[col] = _convert(series, dtype)
+
+    optimized = frame.assign(**converted) if converted else frame
+    if columns != stored_columns:
+        report = memory_report(frame, optimized)
+        _save_schema(name, {
+            "columns": columns,
+            "bytes_before": int(report["BytesBefore"].sum()),
+            "bytes_after": int(report["BytesAfter"].sum()),
+            "report": report.to_dict(orient="records"),
+        })
+    return optimized
+
+
+if __name__ == "__main__":
+    from engine.loader import load_segmentation, load_transactions
+
+    for name, frame in (
+        ("transactions", load_transactions(optimize=False)),
+        ("segmentation", load_segmentation(optimize=False)),
+    ):
+        report = memory_report(frame, optimize_frame(frame, name))
+        before, after = report["BytesBefore"].sum(), report["BytesAfter"].sum()
+        print(f"\n== {name}: {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB ==")
+        print(report[report["DtypeBefore"] != report["DtypeAfter"]].to_string(index=False))
@@ -0,0 +1,234 @@
+"""Sumber data tabel transaksi dan segmentasi: file CSV (default) atau database SQL.
+
+Setiap sumber menyediakan dua operasi yang dipakai engine/loader.py dan
+engine/warmer.py:
+
+- ``version()``: penanda versi data untuk kunci cache dan deteksi perubahan
+- ``read(columns, dtype, parse_dates, where)``: tabel dengan kolom tertentu
+  saja (proyeksi) dan filter ``where`` berupa daftar ``(kolom, operator, nilai)``
+
+``CSVSource`` membaca file lokal seperti sebelumnya (filter diterapkan
+setelah parse). ``SQLSource`` (SQLite, mis. ``sqlite:///dashboard.db``)
+menerjemahkan proyeksi dan filter menjadi SELECT sehingga hanya baris dan
+kolom yang diminta yang dikirim database. Tabel dibaca per rentang rowid
+secara paralel di beberapa thread, masing-masing dengan koneksi dari pool.
+
+Untuk mencoba backend SQL secara lokal, salin kedua CSV ke SQLite::
+
+    python -m engine.sources dashboard.db
+"""
+
+import queue
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from engine import config
+from engine.versioning import file_version
+
+# operator filter -> (template SQL, fungsi mask pandas)
+OPERATORS = {
+    "notnull": ("{col} IS NOT NULL", lambda s, v: s.notna()),
+    "==": ("{col} = ?", lambda s, v: s == v),
+    "!=": ("{col} <> ?", lambda s, v: s != v),
+    ">": ("{col} > ?", lambda s, v: s > v),
+    ">=": ("{col} >= ?", lambda s, v: s >= v),
+    "<": ("{col} < ?", lambda s, v: s < v),
+    "<=": ("{col} <= ?", lambda s, v: s <= v),
+    "in": ("{col} IN ({marks})", lambda s, v: s.isin(v)),
+}
+
+
+def _check_where(where):
+    for column, op, _ in where:
+        if op not in OPERATORS:
+            raise ValueError(f"Operator filter tidak dikenal untuk {column!r}: {op!r}")
+
+
+def where_sql(where, ref=lambda col: f'"{col}"'):
+    """(klausa SQL, parameter ``?``) untuk filter ``where``; ``ref`` memberi ekspresi kolom."""
+    _check_where(where)
+    clauses, params = [], []
+    for column, op, value in where:
+        template = OPERATORS[op][0]
+        if op == "in":
+            value = list(value)
+            clauses.append(template.format(col=ref(column), marks=", ".join("?" * len(value))))
+            params.extend(value)
+        else:
+            clauses.append(template.format(col=ref(column)))
+            if op != "notnull":
+                params.append(value)
+    return clauses, params
+
+
+def apply_where(frame, where):
+    """Filter ``where`` diterapkan di pandas (sumber tanpa pushdown)."""
+    _check_where(where)
+    mask = np.ones(len(frame), dtype=bool)
+    for column, op, value in where:
+        mask &= OPERATORS[op][1](frame[column], value).fillna(False).to_numpy(dtype=bool)
+    return frame.loc[mask]
+
+
+# ======================= CSV =======================
+
+class CSVSource:
+    def __init__(self, path):
+        self.path = path
+
+    def __repr__(self):
+        return f"CSVSource({self.path!r})"
+
+    def __str__(self):
+        return self.path
+
+    def version(self):
+        return file_version(self.path)
+
+    def read(self, columns=None, dtype=None, parse_dates=(), where=()):
+        # kolom filter ikut di-parse walau tidak diminta
+        usecols = None if columns is None else list(dict.fromkeys([*columns, *(col for col, _, _ in where)]))
+        dtype = {col: dt for col, dt in (dtype or {}).items() if usecols is None or col in usecols}
+        frame = pd.read_csv(
+            self.path,
+            encoding="latin1",
+            low_memory=False,
+            usecols=usecols,
+            dtype=dtype,
+            parse_dates=list(parse_dates) or False,
+        )
+        if where:
+            frame = apply_where(frame, where)
+        return frame if columns is None else frame[list(columns)]
+
+
+# ======================= SQL =======================
+
+class ConnectionPool:
+    """Pool koneksi sederhana: koneksi dibuat saat dibutuhkan (maksimal ``size``)
+    dan dikembalikan ke antrean setelah dipakai."""
+
+    def __init__(self, connect, size):
+        self._connect = connect
+        self._idle = queue.LifoQueue()
+        self._slots = queue.Queue()
+        for _ in range(size):
+            self._slots.put(None)
+
+    @contextmanager
+    def connection(self):
+        self._slots.get()
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+            self._slots.put(None)
+
+
+def _sqlite_path(url):
+    return url[len("sqlite:///"):] if url.startswith("sqlite:///") else url
+
+
+class SQLSource:
+    def __init__(self, url, table, pool_size=None, chunk_rows=None):
+        self.path = _sqlite_path(url)
+        self.table = table
+        self.chunk_rows = chunk_rows or config.SQL_CHUNK_ROWS
+        self.workers = pool_size or config.SQL_POOL_SIZE
+        self.pool = ConnectionPool(self._connect, self.workers)
+
+    def __repr__(self):
+        return f"SQLSource({self.path!r}, {self.table!r})"
+
+    def __str__(self):
+        return f"{self.path}:{self.table}"
+
+    def _connect(self):
+        # read-only; satu koneksi dipakai bergantian oleh thread pembaca
+        return sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+
+    def version(self):
+        # file database berubah (mtime/ukuran) setiap ada commit
+        return file_version(self.path)
+
+    def _execute(self, sql, params=()):
+        with self.pool.connection() as conn:
+            cursor = conn.execute(sql, params)
+            names = [d[0] for d in cursor.description]
+            rows = cursor.fetchall()
+        return names, rows
+
+    def read(self, columns=None, dtype=None, parse_dates=(), where=()):
+        projection = "*" if columns is None else ", ".join(f'"{col}"' for col in columns)
+        clauses, params = where_sql(where)
+
+        # rentang rowid dibagi per chunk, dibaca paralel lewat pool koneksi
+        _, ((low, high),) = self._execute(f'SELECT MIN(rowid), MAX(rowid) FROM "{self.table}"')
+        starts = range(low, high + 1, self.chunk_rows) if low is not None else [0]
+        sql = (
+            f'SELECT {projection} FROM "{self.table}" WHERE '
+            + " AND ".join(["rowid BETWEEN ? AND ?"] + clauses)
+        )
+
+        def fetch(start):
+            return self._execute(sql, [start, start + self.chunk_rows - 1] + params)
+
+        if len(starts) > 1:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="sql") as pool:
+                parts = list(pool.map(fetch, starts))
+        else:
+            parts = [fetch(start) for start in starts]
+
+        names = parts[0][0]
+        frame = pd.DataFrame.from_records([row for _, rows in parts for row in rows], columns=names)
+        for col in parse_dates:
+            frame[col] = pd.to_datetime(frame[col])
+        for col, dt in (dtype or {}).items():
+            if col in frame:
+                frame[col] = frame[col].astype(dt)
+        return frame
+
+
+# ======================= SUMBER AKTIF =======================
+
+@lru_cache(maxsize=None)
+def get_source(name):
+    """Sumber tabel ``"transactions"`` atau ``"segmentation"`` sesuai DASHBOARD_DATA_SOURCE."""
+    if config.DATA_SOURCE == "csv":
+        return CSVSource({"transactions": config.DATA_PATH, "segmentation": config.SEGMENTATION_PATH}[name])
+    if config.DATA_SOURCE == "sql":
+        table = {"transactions": config.SQL_TRANSACTIONS_TABLE, "segmentation": config.SQL_SEGMENTATION_TABLE}[name]
+        return SQLSource(config.SQL_URL, table)
+    raise ValueError(f"Sumber data tidak dikenal: {config.DATA_SOURCE!r}")
+
+
+def export_sqlite(db_path, chunksize=50_000):
+    """Salin DASHBOARD_DATA_PATH dan DASHBOARD_SEGMENTATION_PATH ke tabel SQLite."""
+    tables = {
+        config.SQL_TRANSACTIONS_TABLE: config.DATA_PATH,
+        config.SQL_SEGMENTATION_TABLE: config.SEGMENTATION_PATH,
+    }
+    # kolom ID tetap teks; kolom lain mengikuti tipe hasil parse CSV
+    text = {col: "string" for col in ("InvoiceNo", "StockCode", "Description", "CustomerID")}
+    with sqlite3.connect(db_path) as conn:
+        for table, path in tables.items():
+            conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+            for chunk in pd.read_csv(path, encoding="latin1", dtype=text, chunksize=chunksize):
+                chunk.to_sql(table, conn, if_exists="append", index=False)
+
+
+if __name__ == "__main__":
+    import sys
+
+    target = sys.argv[1] if len(sys.argv) > 1 else _sqlite_path(config.SQL_URL)
+    export_sqlite(target)
+    print(f"Tabel {config.SQL_TRANSACTIONS_TABLE!r} dan {config.SQL_SEGMENTATION_TABLE!r} ditulis ke {target}")
@@ -0,0 +1,73 @@
+"""Laporan waktu startup dashboard.
+
+Mengukur waktu import modul (via ``python -X importtime``) untuk jalur
+first paint (kerangka UI) dan untuk modul berat yang dimuat belakangan,
+lalu menjalankan tahap-tahap loader dan mencatat durasinya::
+
+    python -m engine.startup_profile
+"""
+
+import subprocess
+import sys
+import time
+
+# Modul yang di-import streamlit_app.py sebelum kerangka UI tampil
+FIRST_PAINT_MODULES = ["streamlit", "engine.config", "engine.lazy", "engine.warmer", "engine.versioning"]
+# Modul berat yang dimuat di background / saat panel pertama dirender
+DEFERRED_MODULES = ["pandas", "numpy", "plotly.express", "plotly.graph_objects", "engine.aggregation", "engine.aggregates"]
+FIRST_PAINT_BUDGET = 1.0  # detik
+
+
+def import_times(modules):
+    """Waktu import kumulatif (detik) per modul (urut dari yang terlama) dan totalnya."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import " + ", ".join(modules)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times, total = {}, 0.0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        seconds = int(cumulative) / 1e6
+        # baris tanpa indentasi = import level teratas, jumlahnya = total waktu import
+        if not name[1:].startswith(" "):
+            total += seconds
+        times[name.strip()] = seconds
+    return sorted(times.items(), key=lambda item: item[1], reverse=True), total
+
+
+def _print_imports(title, modules, top=15):
+    times, total = import_times(modules)
+    print(f"\n== {title} ==")
+    for name, seconds in times[:top]:
+        print(f"{seconds * 1000:9.1f} ms  {name}")
+    print(f"{'':9}     total top-level: {total * 1000:.1f} ms")
+    return total
+
+
+def main():
+    first_paint = _print_imports("Import sebelum first paint", FIRST_PAINT_MODULES)
+    _print_imports("Import yang ditunda", DEFERRED_MODULES)
+
+    from engine.warmer import CacheWarmer
+
+    print("\n== Tahap cache warmer ==")
+    started = time.perf_counter()
+    warmer = CacheWarmer()
+    snapshot = warmer.build(warmer.version())
+    if warmer.error is not None:
+        print(f"Warmer gagal: {warmer.error!r}")
+    timings = snapshot.timings if snapshot is not None else {}
+    for label, seconds in timings.items():
+        print(f"{seconds * 1000:9.1f} ms  {label}")
+    print(f"{(time.perf_counter() - started) * 1000:9.1f} ms  total")
+
+    status = "OK" if first_paint <= FIRST_PAINT_BUDGET else "MELEBIHI BUDGET"
+    print(f"\nImport first paint: {first_paint:.2f} s (budget {FIRST_PAINT_BUDGET:.1f} s) -> {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Top-N produk per RFM segment.
+
+Total per produk dihitung sekali untuk semua transaksi dan untuk setiap
+segment, lalu disimpan sebagai tabel ringkas (blok per segment). Setiap
+permintaan (segment, metric, N) cukup memakai argpartition pada satu blok,
+tanpa groupby atau sort penuh.
+"""
+
+import numpy as np
+import pandas as pd
+
+# nama metric -> kolom sumber di df
+METRICS = {
+    "TotalRevenue": "TotalAmount",
+    "TotalQuantity": "Quantity",
+}
+
+
+def _weights(series):
+    """Nilai numerik float64 dengan NaN = 0 (sama seperti sum pandas)."""
+    values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.nan_to_num(values, nan=0.0)
+
+
+class TopNEngine:
+    def __init__(self, products, segments, offsets, product_codes, totals, avg_price):
+        self.products = products            # nama produk per kode
+        self.segments = list(segments)      # nama segment, blok ke-(i + 1)
+        self._block = {seg: i + 1 for i, seg in enumerate(self.segments)}
+        self.offsets = offsets              # batas blok; blok 0 = semua transaksi
+        self.product_codes = product_codes  # kode produk per baris tabel
+        self.totals = totals                # metric -> total per baris tabel
+        self.avg_price = avg_price          # rata-rata UnitPrice per produk
+
+    @classmethod
+    def from_transactions(cls, df):
+        prod_codes, products = pd.factorize(df["Description"])
+        seg_codes, segments = pd.factorize(df["RFM_Segment"])
+        n_prod = max(len(products), 1)
+
+        # ===== Kunci blok: 0 = overall, s + 1 = segment s =====
+        valid = prod_codes >= 0
+        in_segment = valid & (seg_codes >= 0)
+        keys = np.concatenate([
+            prod_codes[valid].astype(np.int64),
+            (seg_codes[in_segment].astype(np.int64) + 1) * n_prod + prod_codes[in_segment],
+        ])
+        table_keys, inverse = np.unique(keys, return_inverse=True)
+
+        totals = {}
+        for metric, col in METRICS.items():
+            w = _weights(df[col])
+            summed = np.bincount(
+                inverse,
+                weights=np.concatenate([w[valid], w[in_segment]]),
+                minlength=len(table_keys),
+            )
+            if pd.api.types.is_integer_dtype(df[col].dtype):
+                summed = np.rint(summed).astype(np.int64)
+            totals[metric] = summed
+
+        # ===== Rata-rata harga per produk (overall) =====
+        price = pd.to_numeric(df["UnitPrice"], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+        has_price = valid & ~np.isnan(price)
+        price_sum = np.bincount(prod_codes[has_price], weights=price[has_price], minlength=len(products))
+        price_cnt = np.bincount(prod_codes[has_price], minlength=len(products))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            avg_price = price_sum / price_cnt
+
+        blocks = table_keys // n_prod
+        offsets = np.searchsorted(blocks, np.arange(len(segments) + 2))
+
+        return cls(
+            products=np.asarray(products, dtype=object),
+            segments=segments,
+            offsets=offsets,
+            product_codes=(table_keys % n_prod).astype(np.int32),
+            totals=totals,
+            avg_price=avg_price,
+        )
+
+    def _bounds(self, segment):
+        block = 0 if segment is None else self._block.get(segment)
+        if block is None:
+            return 0, 0
+        return self.offsets[block], self.offsets[block + 1]
+
+    def top(self, metric="TotalRevenue", n=10, segment=None):
+        """Top-N produk berdasarkan metric; segment=None berarti semua transaksi."""
+        lo, hi = self._bounds(segment)
+        values = self.totals[metric][lo:hi]
+        n = min(n, len(values))
+
+        if n < len(values):
+            picked = np.argpartition(-values, n - 1)[:n]
+        else:
+            picked = np.arange(len(values))
+        picked = picked[np.argsort(-values[picked], kind="stable")]
+
+        codes = self.product_codes[lo:hi][picked]
+        return pd.DataFrame({
+            "Description": self.products[codes],
+            metric: values[picked],
+            "AvgPrice": self.avg_price[codes],
+        })
+
+    def products_table(self, segment=None):
+        """Semua produk beserta seluruh metric (untuk scatter plot)."""
+        lo, hi = self._bounds(segment)
+        codes = self.product_codes[lo:hi]
+        table = pd.DataFrame({"Description": self.products[codes]})
+        for metric, values in self.totals.items():
+            table[metric] = values[lo:hi]
+        table["AvgPrice"] = self.avg_price[codes]
+        return table
@@ -0,0 +1,15 @@
+"""Penanda versi file data untuk kunci cache."""
+
+import os
+
+
+def file_version(*paths):
+    """Gabungan mtime + ukuran file; berubah setiap kali salah satu file diganti."""
+    parts = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            parts.append(f"{stat.st_mtime_ns}-{stat.st_size}")
+        except FileNotFoundError:
+            parts.append("missing")
+    return "|".join(parts)
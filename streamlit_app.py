@@ -1,60 +1,15 @@
+import time
+
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import numpy as np
-from plotly.subplots import make_subplots
-
-
-# ======================= LOAD DATA UTAMA =======================
-
-df = pd.read_csv(
-    "data.csv",
-    encoding="latin1",
-    low_memory=False,
-    dtype={
-        "InvoiceNo": "string",
-        "StockCode": "string",
-        "Description": "string",
-        "CustomerID": "string",
-        "Country": "category",
-        "R_Score": "int8",
-        "F_Score": "int8",
-        "M_Score": "int8",
-        "RFM_Score": "int16",
-    },
-    parse_dates=["InvoiceDate"]
-)
-
-# ===== Pastikan numerik =====
-num_cols = [
-    "Quantity", "UnitPrice", "TotalAmount",
-    "Recency", "Frequency", "Monetary",
-    "Total_transaction"
-]
-
-for col in num_cols:
-    df[col] = pd.to_numeric(df[col], errors="coerce")
-
-# ===== Drop baris invalid =====
-df = df.loc[
-    df["CustomerID"].notna() &
-    df["InvoiceNo"].notna() &
-    df["TotalAmount"].notna()
-]
-
-# ===== Feature waktu (kalau belum ada) =====
-df["InvoiceYearMonth"] = df["InvoiceDate"].dt.to_period("M")
-df["InvoiceDate_only"] = df["InvoiceDate"].dt.date
-df["DayName"] = df["InvoiceDate"].dt.day_name().astype("category")
-df["Hour"] = df["InvoiceDate"].dt.hour
-df["InvoiceMonthName"] = df["InvoiceDate"].dt.month_name().astype("category")
-
-data = pd.read_csv( "customer_segmentation.csv", encoding="latin1", low_memory=False, dtype={ "CustomerID": "string", "RFM_Segment": "category", "Cluster": "int8", "R_Score": "int8", "F_Score": "int8", "M_Score": "int8" } ) 
-num_cols = [ "Recency", "Frequency", "Monetary", "Quantity_total", "UnitPrice_avg", "TotalAmount_total", "Total_transaction_total", "InvoiceYearMonth_num", "RFM_Score" ] 
-for col in num_cols: data[col] = pd.to_numeric(data[col], errors="coerce")
+from streamlit.errors import StreamlitAPIException
 
-# ============================================================================================
+from engine import config
+from engine.lazy import lazy_import
+from engine.warmer import CacheWarmer
+
+# Modul plotting di-import saat panel pertama memakainya
+px = lazy_import("plotly.express")
+go = lazy_import("plotly.graph_objects")
 
 # PAGE CONFIG
 st.set_page_config(page_title="A25-CS313", layout="wide")
@@ -67,120 +22,98 @@ tab_visualization, tab_rfm, tab_clustering, tab_insight = st.tabs(["VISUALISASI
                                                                    "CLUSTERING ANALYSIS",
                                                                    "INTERPRETASI"])
 
-with tab_visualization:
-#============ VISUALISASI PEMBELI BERDASARKAN NEGARA (ATLAS WORLD MAP) =============
-    st.subheader("ANALISIS PENJUALAN DAN PENDAPATAN BERDASARKAN NEGARA")
+# ======================= SNAPSHOT DATA (CACHE WARMER) =======================
 
-    # --- Hitung revenue, transaksi, dll ---
-    country_info = (
-        df.groupby("Country")
-        .agg(
-            TotalRevenue=("TotalAmount", "sum"),
-            TransactionCount=("InvoiceNo", "nunique")
-        )
-        .reset_index()
-    )
+# Satu warmer per proses server: membangun snapshot di background dan
+# membangun ulang setiap kali file data berubah
+@st.cache_resource(show_spinner=False)
+def get_warmer():
+    return CacheWarmer().start()
 
-    country_info["Purchased"] = 1  # indikator negara pembeli
-
-    # --- ALL COUNTRY LIST dari Plotly (gapminder) ---
-    world = px.data.gapminder()[["country"]].drop_duplicates()
-    world.columns = ["Country"]
-
-    # --- Merge: negara pembeli + negara yang tidak beli ---
-    world_map = world.merge(country_info, on="Country", how="left")
-    world_map["Purchased"] = world_map["Purchased"].fillna(0)
-
-    # --- warna: negara beli = warna atlas, negara lain = abu muda ---
-    world_map["ColorValue"] = world_map["Purchased"].astype(int)
-
-    # --- CHOROPLETH ATLAS MAP ---
-    fig_atlas = px.choropleth(
-        world_map,
-        locations="Country",
-        locationmode="country names",
-        color="ColorValue",
-        hover_name="Country",
-        hover_data={
-            "TotalRevenue": ":,.0f",
-            "TransactionCount": ":,",
-            "Purchased": False,
-            "ColorValue": False
-        },
-        color_continuous_scale=["#d3d3d3", "#ff9933"],  # abu → oranye atlas
-    )
+warmer = get_warmer()
 
-    # --- STYLE SEPERTI ATLAS ---
-    fig_atlas.update_geos(
-        showcountries=True,
-        showcoastlines=True,
-        showland=True,
-        landcolor="white",
-        oceancolor="#f8f8f8",
-        lakecolor="#f8f8f8",
-        projection_type="natural earth"
-    )
+if not config.BACKGROUND_LOAD:
+    with st.spinner("Memuat data..."):
+        warmer.wait_ready()
+
+snapshot = warmer.current()
+
+if snapshot is None and warmer.error is None:
+    # ===== Kerangka UI selama snapshot pertama dibangun =====
+    with tab_visualization:
+        st.progress(warmer.progress, text=f"Memuat data: {warmer.status}...")
+    for tab in (tab_rfm, tab_clustering, tab_insight):
+        with tab:
+            st.info("Data sedang dimuat...")
+    time.sleep(0.3)
+    st.rerun()
+
+if snapshot is None:
+    st.error(f"Gagal memuat data: {warmer.error}")
+    st.stop()
 
-    fig_atlas.update_layout(
-        height=700,
-        width=1500,
-        coloraxis_showscale=False,   # sembunyikan legend warna
-        title="Peta Persebaran Pelanggan Secara Global",
-        margin=dict(l=20, r=20, t=60, b=20)
+# ===== Import berat (setelah kerangka UI tampil) =====
+import pandas as pd
+
+from engine.cohorts import METRICS as COHORT_METRICS
+from engine.compute import shared_pool
+from engine.figures import SCATTER_AXES
+from engine.promotion import DIMENSIONS as PROMO_DIMENSIONS, SCENARIO_COLUMNS
+from engine.sampling import exact_estimate
+from engine.sources import get_source
+
+df = snapshot["df"]
+data = snapshot["data"]
+topn = snapshot["topn"]
+aov_engine = snapshot["aov"]
+customer_store = snapshot["customer_store"]
+tables = snapshot["aggregates"]
+cluster_labels = snapshot["cluster_labels"]
+figures = snapshot["figures"]
+forecasts = snapshot["forecasts"]
+
+# Komputasi per pilihan dijalankan di pool bersama: sesi lain dengan pilihan
+# yang sama (dan versi data yang sama) menunggu / memakai hasil yang sama
+compute_pool = shared_pool()
+
+def shared(panel, fn, *params):
+    return compute_pool.run((panel, params, snapshot.version), fn, *params)
+
+def forecast_insight(dimension, group):
+    # Ringkasan forecast seri bulanan (engine/forecast.py) untuk teks insight
+    projected = forecasts.table(dimension, group)
+    if projected is None:
+        return "- **Forecast:** seri terlalu pendek untuk diproyeksikan"
+    method = forecasts.get(dimension, group)["method"]
+    return (
+        f"- **Proyeksi {len(projected)} bulan ({projected['InvoiceYearMonth'].iloc[0]} s.d. "
+        f"{projected['InvoiceYearMonth'].iloc[-1]}, {method}):** "
+        f"£{projected['Forecast'].sum():,.0f} "
+        f"(interval {config.FORECAST_CONFIDENCE:.0%} per bulan: "
+        f"£{projected['Lower'].min():,.0f} – £{projected['Upper'].max():,.0f})"
     )
 
-    st.plotly_chart(fig_atlas, use_container_width=True)
+# ============================================================================================
+
+with tab_visualization:
+#============ VISUALISASI PEMBELI BERDASARKAN NEGARA (ATLAS WORLD MAP) =============
+    st.subheader("ANALISIS PENJUALAN DAN PENDAPATAN BERDASARKAN NEGARA")
+
+    # --- Figure default sudah di-render oleh cache warmer ---
+    st.plotly_chart(figures.get("atlas"), use_container_width=True)
 
 
 
 #======== TOTAL PEMASUKAN PER NEGARA ============
     with st.expander("Penjualan Berdasarkan Negara"):
-        # Grouping
-        country = (
-            df.groupby('Country')
-            .agg(TotalRevenue=('TotalAmount', 'sum'),
-                TransactionCount=('TotalAmount', 'count'),
-                TotalQuantity=('Quantity', 'sum'),
-                UniqueInvoices=('InvoiceNo', 'nunique'))
-            .sort_values('TotalRevenue', ascending=False)
-        )
-
-        # Persentase pemasukan
-        country['RevenuePercentage'] = (
-            country['TotalRevenue'] / country['TotalRevenue'].sum() * 100
-        ).round(2)
+        # Revenue per negara + persentase (tabel agregat snapshot)
+        country = tables["country_sales"]
 
         # Ambil 5 besar
         top = country.head(5).reset_index()   # <--- PENTING: Country tetap "Country"
 
-        # Palet warna
-        PALETTE = [
-            "#FF8C00", "#FFA733", "#FFA726", "#FFB74D", "#FFBE66",
-            "#FFCC80", "#FFD599", "#FFECCC", "#FFF5E6", "#FFE0B2"
-        ]
-
-        # Barchart
-        fig = px.bar(
-            top,
-            x="Country",
-            y="TotalRevenue",
-            text="TotalRevenue",
-            color="Country",
-            color_discrete_sequence=PALETTE,
-            title="5 Negara dengan Penjualan Terbesar"
-        )
-
-        # Format Hover + Teks (HASIL PERSENTASE BELUMMM JELAS DAN JELEK MAKANYA DIHAPUS)
-        fig.update_traces(
-            texttemplate='£%{y:,.0f}',
-            textposition='outside',
-            hovertemplate=
-                "<b>%{x}</b><br>" +
-                "Revenue: £%{y:,.0f}<br>" 
-        )
-
-        # Tampilkan chart
-        st.plotly_chart(fig, use_container_width=True)
+        # Barchart (pre-render)
+        st.plotly_chart(figures.get("country_top"), use_container_width=True)
 
         # Info Negara Terbesar
         top_country = top.iloc[0]["Country"]
@@ -195,62 +128,14 @@ with tab_visualization:
 
     #======== TOTAL PEMASUKAN PER NEGARA (EXCLUDE UK) ============
     with st.expander("Penjualan Berdasarkan Negara (Tanpa UK)"):
-        # Filter negara
-        df_filtered = df[df['Country'] != 'United Kingdom'].copy()
-
-        # Hitung total amount
-        df_filtered['TotalAmount'] = df_filtered['Quantity'] * df_filtered['UnitPrice']
-
-        # Grouping per negara
-        country = (
-            df_filtered.groupby('Country')
-                .agg(
-                    TotalRevenue=('TotalAmount', 'sum'),
-                    TransactionCount=('TotalAmount', 'count'),
-                    TotalQuantity=('Quantity', 'sum'),
-                    UniqueInvoices=('InvoiceNo', 'nunique')
-                )
-                .sort_values('TotalRevenue', ascending=False)
-        )
-
-        # Persentase revenue
-        country['RevenuePercentage'] = (
-            country['TotalRevenue'] / country['TotalRevenue'].sum() * 100
-        ).round(2)
+        # Revenue per negara selain UK + persentase (tabel agregat snapshot)
+        country = tables["country_sales_excl_uk"]
 
         # Ambil 10 teratas
         top = country.head(10).reset_index()
 
-        # Palet warna
-        PALETTE = [
-            "#FF8C00", "#FFA733", "#FFA726", "#FFB74D", "#FFBE66",
-            "#FFCC80", "#FFD599", "#FFECCC", "#FFF5E6", "#FFE0B2"
-        ]
-
-        # Barchart
-        fig = px.bar(
-            top,
-            x="Country",
-            y="TotalRevenue",
-            text="TotalRevenue",
-            color="Country",
-            color_discrete_sequence=PALETTE,
-            title="Top 10 Negara (Tanpa UK)"
-        )
-
-        fig.update_traces(
-            texttemplate='£%{y:,.0f}',
-            textposition='outside',
-            hovertemplate=
-                "<b>%{x}</b><br>" +
-                "Revenue: £%{y:,.0f}<br>"
-        )
-
-        fig.update_layout(
-            xaxis_tickangle=-45
-        )
-
-        st.plotly_chart(fig, use_container_width=True)
+        # Barchart (pre-render)
+        st.plotly_chart(figures.get("country_top_excl_uk"), use_container_width=True)
 
         # Insight negara teratas
         top_country = top.iloc[0]["Country"]
@@ -272,26 +157,8 @@ with tab_visualization:
             .reset_index()
         )
 
-        # Barchart
-        fig_bottom = px.bar(
-            bottom,
-            x="Country",
-            y="TotalRevenue",
-            text="TotalRevenue",
-            color="Country",
-            color_discrete_sequence=PALETTE,  # boleh pakai palet warna yang sama
-            title="5 Negara dengan Penjualan Paling Sedikit"
-        )
-
-        fig_bottom.update_traces(
-            texttemplate='£%{y:,.0f}',
-            textposition='outside',
-            hovertemplate=
-                "<b>%{x}</b><br>" +
-                "Revenue: £%{y:,.0f}<br>"
-        )
-
-        st.plotly_chart(fig_bottom, use_container_width=True)
+        # Barchart (pre-render)
+        st.plotly_chart(figures.get("country_bottom"), use_container_width=True)
 
         # Insight negara dengan penjualan paling sedikit
         low_country = bottom.iloc[0]["Country"]
@@ -306,56 +173,11 @@ with tab_visualization:
 
 # ==================== Tren Pendapatan Bulanan =======================
     with st.expander("Tren Pendapatan Bulanan Tahun 2010-2011"):
-        monthly = (
-            df.groupby('InvoiceYearMonth')
-            .agg(
-                TotalAmount=('TotalAmount', 'sum'),
-                Orders=('InvoiceNo', 'nunique'),
-                Active_Customers=('CustomerID', 'nunique')
-            )
-            .reset_index()
-        )
-
-        # Konversi ke string agar tampil rapi di plot
-        monthly['InvoiceYearMonth'] = monthly['InvoiceYearMonth'].astype(str)
-
-        # Hitung Average Order Value (AOV)
-        monthly['AOV'] = monthly['TotalAmount'] / monthly['Orders']
-
-        # Warna garis
-        LINE_COLOR = "#FF8C00"
-
-        # Plotly line chart
-        fig_monthly = px.line(
-            monthly,
-            x="InvoiceYearMonth",
-            y="TotalAmount",
-            markers=True,
-            title="Tren Pendapatan Bulanan Tahun 2010-2011",
-        )
-
-        fig_monthly.update_traces(
-            line=dict(width=3, color=LINE_COLOR),
-            marker=dict(size=8),
-            hovertemplate=
-                "<b>%{x}</b><br>" +
-                "Total Amount: £%{y:,.0f}<br>" +
-                "Orders: %{customdata[0]:,}<br>" +
-                "Active Customers: %{customdata[1]:,}<br>" +
-                "AOV: £%{customdata[2]:,.2f}<extra></extra>",
-            customdata=monthly[['Orders', 'Active_Customers', 'AOV']].values
-        )
+        # Agregasi bulanan + AOV (tabel agregat snapshot)
+        monthly = tables["monthly"]
 
-        fig_monthly.update_layout(
-            xaxis_title="Month",
-            yaxis_title="Total Amount (£)",
-            xaxis_tickangle=-45,
-            plot_bgcolor="white",
-            height=450,
-        )
-
-        # Tampilkan chart di Streamlit
-        st.plotly_chart(fig_monthly, use_container_width=True)
+        # Line chart (pre-render)
+        st.plotly_chart(figures.get("monthly"), use_container_width=True)
 
         # ============ Insight otomatis ============
         best_month = monthly.loc[monthly['TotalAmount'].idxmax()]
@@ -369,6 +191,8 @@ with tab_visualization:
         Total: **£{worst_month['TotalAmount']:,.0f}**
 
         - **Rata-rata AOV keseluruhan:** £{monthly['AOV'].mean():,.2f}
+
+        {forecast_insight("Total", "Total")}
         """
 
         st.info(insight)
@@ -379,64 +203,15 @@ with tab_visualization:
         # Dropdown negara
         selected_country = st.selectbox(
             "Pilih Negara:",
-            sorted(df['Country'].unique()),
+            sorted(tables["monthly_by_country"]),
             key="selected_country_monthly"
         )
 
-        # Filter data untuk negara terpilih
-        df_country = df[df['Country'] == selected_country].copy()
+        # Agregasi bulanan negara terpilih (tabel agregat snapshot)
+        monthly_cty = tables["monthly_by_country"][selected_country]
 
-        # Pastikan TotalAmount sudah ada (jaga-jaga)
-        df_country['TotalAmount'] = df_country['Quantity'] * df_country['UnitPrice']
-
-        # Aggregasi bulanan
-        monthly_cty = (
-            df_country.groupby('InvoiceYearMonth')
-            .agg(
-                TotalAmount=('TotalAmount', 'sum'),
-                Orders=('InvoiceNo', 'nunique'),
-                Active_Customers=('CustomerID', 'nunique')
-            )
-            .reset_index()
-            .sort_values('InvoiceYearMonth')
-        )
-
-        # Ubah ke string agar tampil rapi
-        monthly_cty['InvoiceYearMonth'] = monthly_cty['InvoiceYearMonth'].astype(str)
-
-        # Hitung AOV
-        monthly_cty['AOV'] = monthly_cty['TotalAmount'] / monthly_cty['Orders']
-
-        # Plot
-        fig_cty = px.line(
-            monthly_cty,
-            x="InvoiceYearMonth",
-            y="TotalAmount",
-            markers=True,
-            title=f"Tren Pendapatan Bulanan – {selected_country}",
-        )
-
-        fig_cty.update_traces(
-            line=dict(width=3, color="#FF8C00"),
-            marker=dict(size=8),
-            hovertemplate=
-                "<b>%{x}</b><br>" +
-                "Total Amount: £%{y:,.0f}<br>" +
-                "Orders: %{customdata[0]:,}<br>" +
-                "Active Customers: %{customdata[1]:,}<br>" +
-                "AOV: £%{customdata[2]:,.2f}<extra></extra>",
-            customdata=monthly_cty[['Orders', 'Active_Customers', 'AOV']].values
-        )
-
-        fig_cty.update_layout(
-            xaxis_title="Month",
-            yaxis_title="Total Amount (£)",
-            xaxis_tickangle=-45,
-            plot_bgcolor="white",
-            height=450,
-        )
-
-        st.plotly_chart(fig_cty, use_container_width=True)
+        # Plot (negara default sudah di-render oleh cache warmer)
+        st.plotly_chart(figures.get("monthly_by_country", selected_country), use_container_width=True)
 
         #============= INSIGHT OTOMATIS =============
         if len(monthly_cty) > 0:
@@ -451,68 +226,45 @@ with tab_visualization:
             Total: **£{worst_m['TotalAmount']:,.0f}**
 
             - **Rata-rata AOV negara `{selected_country}`:** £{monthly_cty['AOV'].mean():,.2f}
+
+            {forecast_insight("Country", selected_country)}
             """
 
             st.info(insight_cty)
         else:
             st.warning("Tidak ada data untuk negara ini.")
 
-
-#======== PENJUALAN PRODUK BERDASARKAN REVENUE ============
-    st.subheader("ANALISIS PENJUALAN DAN PENDAPATAN BERDASARKAN PRODUK")
-    with st.expander("Penjualan Produk Berdasarkan Revenue"):
-    # --- Agregasi revenue per produk ---
-        product = (
-            df.groupby('Description')
-            .agg(
-                TotalRevenue=('TotalAmount', 'sum'),
-                UniqueInvoices=('InvoiceNo', 'nunique'),
-                AvgPrice=('UnitPrice', 'mean')
-            )
-            .reset_index()
+#======== MONTHLY TREND BY RFM SEGMENT ============
+    with st.expander("Tren Pendapatan Bulanan Berdasarkan RFM Segment"):
+        selected_segment_monthly = st.selectbox(
+            "Pilih RFM Segment:",
+            sorted(tables["monthly_by_segment"]),
+            key="selected_segment_monthly"
         )
+        monthly_seg = tables["monthly_by_segment"][selected_segment_monthly]
 
-        # Sort berdasarkan revenue terbesar
-        product = product.sort_values('TotalRevenue', ascending=False)
+        # Plot (segment default sudah di-render oleh cache warmer)
+        st.plotly_chart(figures.get("monthly_by_segment", selected_segment_monthly), use_container_width=True)
 
-        # Ambil top 10
-        top_prod = product.head(10)
-
-        # Warna palet
-        PALETTE = [
-            "#FF8C00", "#FFA733", "#FFA726", "#FFB74D", "#FFBE66",
-            "#FFCC80", "#FFD599", "#FFECCC", "#FFF5E6", "#FFE0B2"
-        ]
-
-        # --- Barchart Total Revenue ---
-        fig_prod = px.bar(
-            top_prod,
-            x="Description",
-            y="TotalRevenue",
-            text="TotalRevenue",
-            color="Description",
-            color_discrete_sequence=PALETTE,
-            title="Top 10 Produk dengan Revenue Tertinggi"
-        )
+        if len(monthly_seg) > 0:
+            best_s = monthly_seg.loc[monthly_seg['TotalAmount'].idxmax()]
+            st.info(
+                f"- **Bulan dengan pendapatan tertinggi:** `{best_s['InvoiceYearMonth']}` "
+                f"(£{best_s['TotalAmount']:,.0f})\n"
+                f"{forecast_insight('RFM_Segment', selected_segment_monthly)}"
+            )
+        else:
+            st.warning("Tidak ada data untuk segment ini.")
 
-        fig_prod.update_traces(
-            texttemplate='£%{y:,.0f}',
-            textposition='outside',
-            hovertemplate=
-                "<b>%{x}</b><br>" +
-                "Total Revenue: £%{y:,.0f}<br>" +
-                "Avg Price: £%{customdata[0]:.2f}<extra></extra>",
-            customdata=top_prod[['AvgPrice']].values
-        )
 
-        fig_prod.update_layout(
-            xaxis_title="Product",
-            yaxis_title="Total Revenue (£)",
-            xaxis_tickangle=-45,
-            showlegend=False
-        )
+#======== PENJUALAN PRODUK BERDASARKAN REVENUE ============
+    st.subheader("ANALISIS PENJUALAN DAN PENDAPATAN BERDASARKAN PRODUK")
+    with st.expander("Penjualan Produk Berdasarkan Revenue"):
+    # --- Top 10 revenue per produk (dari tabel top-N) ---
+        top_prod = topn.top("TotalRevenue", 10)
 
-        st.plotly_chart(fig_prod, use_container_width=True)
+        # --- Barchart Total Revenue (pre-render) ---
+        st.plotly_chart(figures.get("product_revenue"), use_container_width=True)
 
         # --- Insight ---
         top_name = top_prod.iloc[0]['Description']
@@ -527,50 +279,14 @@ with tab_visualization:
 
 #======== PENJUALAN PRODUK BERDASARKAN QUANTITY ============
     with st.expander("Penjualan Produk Berdasarkan Jumlah Produk Terjual"):
-        # --- Hitung total quantity per produk ---
-        product_qty = (
-            df.groupby('Description')['Quantity']
-            .sum()
-            .reset_index()
-            .sort_values('Quantity', ascending=False)
+        # --- Top 10 quantity per produk (dari tabel top-N) ---
+        top_qty = (
+            topn.top("TotalQuantity", 10)
+            .rename(columns={"TotalQuantity": "Quantity"})
         )
 
-        # Ambil top 10
-        top_qty = product_qty.head(10)
-
-        # Warna palet
-        PALETTE = [
-            "#FF8C00", "#FFA733", "#FFA726", "#FFB74D", "#FFBE66",
-            "#FFCC80", "#FFD599", "#FFECCC", "#FFF5E6", "#FFE0B2"
-        ]
-
-        # --- Barchart Quantity Terjual ---
-        fig_qty = px.bar(
-            top_qty,
-            x="Description",
-            y="Quantity",
-            text="Quantity",
-            color="Description",
-            color_discrete_sequence=PALETTE,
-            title="Top 10 Produk Berdasarkan Jumlah Quantity Terjual"
-        )
-
-        fig_qty.update_traces(
-            texttemplate='%{y:,}',
-            textposition='outside',
-            hovertemplate=
-                "<b>%{x}</b><br>" +
-                "Quantity Terjual: %{y:,}<extra></extra>"
-        )
-
-        fig_qty.update_layout(
-            xaxis_title="Product",
-            yaxis_title="Quantity Sold",
-            xaxis_tickangle=-45,
-            showlegend=False
-        )
-
-        st.plotly_chart(fig_qty, use_container_width=True)
+        # --- Barchart Quantity Terjual (pre-render) ---
+        st.plotly_chart(figures.get("product_quantity"), use_container_width=True)
 
         # --- Insight ---
         top_name = top_qty.iloc[0]['Description']
@@ -585,62 +301,16 @@ with tab_visualization:
 
 #======== SCATTER PLOT: REVENUE vs QUANTITY (ALL PRODUCTS) ============
     with st.expander("Persebaran Penjualan Produk Berdasarkan Pendapatan dan Jumlah Produk Terjual"):
-        # --- Buat agregasi revenue & quantity per produk ---
-        product_scatter = (
-            df.groupby('Description')
-            .agg(
-                TotalRevenue=('TotalAmount', 'sum'),
-                TotalQuantity=('Quantity', 'sum'),
-                AvgPrice=('UnitPrice', 'mean')
-            )
-            .reset_index()
-        )
-        
-        product_scatter = product_scatter[product_scatter["TotalRevenue"] > 0]
-
-        # --- Scatter Plot ---
-        fig_scatter = px.scatter(
-            product_scatter,
-            x="TotalQuantity",
-            y="TotalRevenue",
-            hover_name="Description",
-            hover_data={
-                "TotalQuantity": True,
-                "TotalRevenue": ":,.0f",
-                "AvgPrice": ":,.2f"
-            },
-            title="Scatter Plot: Total Revenue vs Quantity per Product",
-        )
-
-        fig_scatter.update_layout(
-            xaxis_title="Total Quantity Sold",
-            yaxis_title="Total Revenue (£)",
-            height=600,
-            plot_bgcolor="white"
-        )
-
-        fig_scatter.update_traces(
-            marker=dict(opacity=0.7, line=dict(width=1, color="black"))
-        )
-
-        # --- Tampilkan chart ---
-        st.plotly_chart(fig_scatter, use_container_width=True)
+        # --- Scatter Plot revenue & quantity per produk (pre-render) ---
+        st.plotly_chart(figures.get("product_scatter"), use_container_width=True)
 
 #======== ANALISIS AKTIVITAS PELANGGAN ============
     st.subheader("ANALISIS AKTIVITAS PELANGGAN")
 
 #======== ANALISIS AKTIVITAS PELANGGAN PER HARI ============   
     with st.expander("Keaktifan Pelanggan Berdasarkan Hari"):
-        # Urutan hari (biar tidak acak)
-        order_days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-
-        # Grouping count transaksi per hari
-        day_sales = (
-            df.groupby('DayName')
-            .agg(TransactionCount=('InvoiceNo', 'nunique'))
-            .reindex(order_days)   # pastikan urut
-            .reset_index()
-        )
+        # Transaksi per hari, urut Senin–Minggu (tabel agregat snapshot)
+        day_sales = tables["day_sales"]
         # Palet warna
         PALETTE = [
             "#FF8C00", "#FFA733", "#FFA726", "#FFB74D",
@@ -704,19 +374,8 @@ with tab_visualization:
             "Minggu": "Sunday"
         }
 
-        # Filter sesuai hari (SETELAH mapping)
-        df_day = df[df['DayName'] == day_map[selected_day]]
-
-        # Group per jam
-        hourly_sales = (
-            df_day.groupby("Hour")
-            .agg(TransactionCount=('InvoiceNo', 'nunique'))
-            .reset_index()
-        )
-
-        # Pastikan jam 0–23 muncul semua
-        all_hours = pd.DataFrame({"Hour": range(24)})
-        hourly_sales = all_hours.merge(hourly_sales, on="Hour", how="left").fillna(0)
+        # Transaksi per jam 0–23 untuk hari terpilih (tabel agregat snapshot)
+        hourly_sales = tables["hourly_by_day"][day_map[selected_day]]
 
         # Line chart
         fig_hour = px.line(
@@ -756,19 +415,8 @@ with tab_visualization:
 #======== ANALISIS AKTIVITAS PELANGGAN PER BULAN ============   
     with st.expander("Keaktifan Pelanggan Berdasarkan Bulan"):
 
-        # Urutan bulan agar rapi
-        order_months = [
-            "January", "February", "March", "April", "May", "June",
-            "July", "August", "September", "October", "November", "December"
-        ]
-
-        # Grouping count transaksi per bulan
-        month_sales = (
-            df.groupby('InvoiceMonthName')
-            .agg(TransactionCount=('InvoiceNo', 'nunique'))
-            .reindex(order_months)     # agar urut
-            .reset_index()
-        )
+        # Transaksi per bulan, urut Januari–Desember (tabel agregat snapshot)
+        month_sales = tables["month_sales"]
 
         # Warna
         PALETTE = [
@@ -813,55 +461,146 @@ with tab_visualization:
             f"- Jumlah Transaksi: **{top_month['TransactionCount']:,}**"
         )
 
-#======== TAB RFM ANALYSIS ============ 
-with tab_rfm:
-    st.subheader("ANALISIS PELANGGAN BERDASARKAN RFM SEGMENTATION")
-    #======== Pelanggan Berdasarkan RFM Segmentation ============   
-    with st.expander("Distribusi Pelanggan Berdasarkan RFM Segmentation"):
+#======== COHORT RETENSI & REVENUE ============
+    with st.expander("Retensi dan Revenue Cohort Berdasarkan Bulan Pembelian Pertama"):
+        cohorts = snapshot["cohorts"]
 
-        # Hitung jumlah customer per segmen
-        segment_counts = (
-            df.dropna(subset=["RFM_Segment"])
-            .groupby("RFM_Segment")["CustomerID"]
-            .nunique()
-            .reset_index(name="Count")
+        cohort_metric = st.radio(
+            "Tampilkan:",
+            list(COHORT_METRICS),
+            horizontal=True,
+            key="cohort_metric"
         )
-        segment_counts.columns = ["RFM_Segment", "Count"]
 
-        # Urutkan berdasarkan jumlah terbanyak
-        segment_counts = segment_counts.sort_values("Count", ascending=False)
-        total_customers = len(data)
+        # Heatmap (metric default sudah di-render oleh cache warmer)
+        st.plotly_chart(figures.get("cohort_heatmap", cohort_metric), use_container_width=True)
 
-        # Hitung persentase
-        segment_counts["Percentage"] = (segment_counts["Count"] / total_customers) * 100
+        # ===== Insight otomatis =====
+        retention = cohorts.matrix("retention")
+        if retention.shape[1] > 1 and retention[1].notna().any():
+            month1 = retention[1].dropna()
+            st.info(
+                f"- Rata-rata retensi bulan ke-1: **{month1.mean():.1f}%**\n"
+                f"- Cohort dengan retensi bulan ke-1 tertinggi: **{month1.idxmax()}** ({month1.max():.1f}%)\n"
+                f"- Cohort terbesar: **{cohorts.cohort_sizes().idxmax()}** "
+                f"({cohorts.cohort_sizes().max():,} customer baru)"
+            )
 
-        # Barchart dengan Plotly
-        fig_segment = px.bar(
-            segment_counts,
-            x="RFM_Segment",
-            y="Count",
-            text=segment_counts["Percentage"].apply(lambda x: f"{x:.1f}%"),
-            color="RFM_Segment",
-            color_discrete_sequence=px.colors.qualitative.Set3,
-            title="Distribusi Customer per RFM Segment (%)"
-        )
+#======== EKSPLORASI CEPAT (SAMPEL TERSTRATIFIKASI) ============
+    st.subheader("EKSPLORASI CEPAT")
+
+    # Estimasi dari sampel langsung tampil; hasil exact dihitung di pool bersama
+    # dan menggantikan estimasi begitu selesai (hanya fragment ini yang di-rerun)
+    @st.fragment
+    def explore_panel():
+        sample = snapshot["sample"]
+        group_columns = {"Negara": "Country", "Bulan": "InvoiceYearMonth", "RFM Segment": "RFM_Segment"}
+        metrics = {"Revenue": "Revenue (£)", "Invoices": "Jumlah Invoice", "AOV": "AOV (£)"}
+
+        col_filter, col_option = st.columns(2)
+        with col_filter:
+            explore_countries = st.multiselect("Filter Negara:", sorted(df["Country"].unique()), key="explore_countries")
+            explore_segments = st.multiselect("Filter RFM Segment:", sorted(df["RFM_Segment"].dropna().unique()), key="explore_segments")
+            explore_product = st.text_input("Nama produk mengandung:", key="explore_product").strip()
+        with col_option:
+            group_label = st.selectbox("Kelompokkan berdasarkan:", list(group_columns), key="explore_group")
+            metric = st.selectbox("Metrik:", list(metrics), format_func=metrics.get, key="explore_metric")
+            want_exact = st.toggle("Hitung hasil exact", key="explore_exact")
+
+        by = group_columns[group_label]
+        params = (by, tuple(explore_countries), tuple(explore_segments), explore_product)
+        result = shared("explore_sample", sample.estimate, *params)
+
+        exact = None
+        if want_exact:
+            # Future disimpan di session: rerun fragment hanya mem-poll job yang sama,
+            # tidak submit ulang (hasil yang sudah selesai tidak bergantung pada LRU pool)
+            job_key = (params, snapshot.version)
+            job = st.session_state.get("explore_exact_job")
+            if job is None or job[0] != job_key:
+                future = compute_pool.submit(("explore_exact", *job_key), exact_estimate, df, *params)
+                st.session_state["explore_exact_job"] = job = (job_key, future)
+            if job[1].done():
+                exact = job[1].result()
+
+        shown = exact if exact is not None else result
+        if shown.empty:
+            st.warning("Tidak ada transaksi yang sesuai filter.")
+        else:
+            fig_explore = px.bar(
+                shown,
+                x=by,
+                y=metric,
+                error_y=None if exact is not None else shown[f"{metric}_high"] - shown[metric],
+                error_y_minus=None if exact is not None else shown[metric] - shown[f"{metric}_low"],
+                color_discrete_sequence=["#FF8C00"],
+                title=f"{metrics[metric]} per {group_label}" + ("" if exact is not None else " (estimasi)")
+            )
+            fig_explore.update_layout(xaxis_title=group_label, yaxis_title=metrics[metric])
+            st.plotly_chart(fig_explore, use_container_width=True)
 
-        fig_segment.update_traces(
-            textposition="outside",
-            hovertemplate=
-                "<b>Segment: %{x}</b><br>" +
-                "Jumlah Customer: %{y}<br>" +
-                "Persentase: %{text}<extra></extra>"
-        )
+        if exact is not None:
+            st.caption(f"Hasil exact dari {len(df):,} baris transaksi.")
+        else:
+            st.caption(
+                f"Estimasi dari sampel {len(sample):,} invoice ({sample.fraction:.0%} per stratum negara x bulan x segment), "
+                f"interval kepercayaan {config.SAMPLE_CONFIDENCE:.0%}."
+                + (" Menghitung hasil exact..." if want_exact else "")
+            )
+            if want_exact:
+                time.sleep(0.3)
+                try:
+                    st.rerun(scope="fragment")
+                except StreamlitAPIException:
+                    # bukan rerun fragment (mis. run penuh setelah widget lain berubah)
+                    st.rerun()
+
+    with st.expander("Eksplorasi Cepat (Sampel Terstratifikasi)"):
+        explore_panel()
+
+#======== KUALITAS DATA (KARANTINA CLEANING) ============
+    with st.expander("Kualitas Data: Baris Transaksi yang Dikarantina"):
+        quarantine = snapshot["quarantine"]
+        removed = int(quarantine.summary["Quarantined"].sum())
+
+        st.dataframe(
+            quarantine.summary.rename(columns={
+                "Matched": "Baris Cocok",
+                "Quarantined": "Baris Dikarantina",
+                "TotalAmount": "Total Amount (£)",
+            }).round(2),
+            hide_index=True,
+            use_container_width=True,
+        )
+        if len(quarantine.rows) > 0:
+            quarantine_rule = st.selectbox(
+                "Lihat contoh baris untuk rule:",
+                sorted(quarantine.rows["QuarantineRule"].unique()),
+                key="quarantine_rule"
+            )
+            st.dataframe(
+                quarantine.rows[quarantine.rows["QuarantineRule"] == quarantine_rule].head(100),
+                hide_index=True,
+                use_container_width=True,
+            )
 
-        fig_segment.update_layout(
-            xaxis_title="RFM Segment",
-            yaxis_title="Jumlah Customer",
-            xaxis_tickangle=45,
-            showlegend=False
+        st.info(
+            f"- **{removed:,} dari {quarantine.total_rows:,} baris** ({removed / max(quarantine.total_rows, 1):.1%}) "
+            f"dikeluarkan sebelum analisis; baris cocok dengan beberapa rule dihitung pada rule pertama.\n"
+            f"- **Ambang Quantity ekstrem:** {quarantine.max_quantity:,.0f} unit per baris"
         )
 
-        st.plotly_chart(fig_segment, use_container_width=True)
+#======== TAB RFM ANALYSIS ============ 
+with tab_rfm:
+    st.subheader("ANALISIS PELANGGAN BERDASARKAN RFM SEGMENTATION")
+    #======== Pelanggan Berdasarkan RFM Segmentation ============   
+    with st.expander("Distribusi Pelanggan Berdasarkan RFM Segmentation"):
+
+        # Jumlah customer + persentase per segmen, urut terbanyak (tabel agregat snapshot)
+        segment_counts = tables["segment_counts"]
+
+        # Barchart (pre-render)
+        st.plotly_chart(figures.get("segment_distribution"), use_container_width=True)
 
         # INSIGHT
         top_segment = segment_counts.iloc[0]
@@ -874,24 +613,16 @@ with tab_rfm:
     # ========== RADAR CHART RFM SCORE PER SEGMENT ==========
     with st.expander("Radar Chart RFM Score Berdasarkan Segmen Customer"):
 
-        # Pastikan kolom score numerik
-        for col in ["R_Score", "F_Score", "M_Score"]:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-
         # Dropdown segment
         selected_segment = st.selectbox(
             "Pilih Segment RFM:",
-            sorted(df["RFM_Segment"].dropna().unique()),
+            sorted(tables["segment_rows"]),
             key="selected_segment_radar"
         )
 
-        # Filter data sesuai segment
-        seg_data = df[df["RFM_Segment"] == selected_segment].copy()
-
-        # Hitung rata-rata score
-        avg_r = seg_data["R_Score"].mean()
-        avg_f = seg_data["F_Score"].mean()
-        avg_m = seg_data["M_Score"].mean()
+        # Rata-rata score segment terpilih (tabel agregat snapshot)
+        seg_scores = tables["segment_scores"][selected_segment]
+        avg_r, avg_f, avg_m = seg_scores["R"], seg_scores["F"], seg_scores["M"]
 
         # Data radar
         radar_df = pd.DataFrame({
@@ -970,46 +701,11 @@ with tab_rfm:
     #======== PIE CHART: PROPORSI REVENUE PER RFM SEGMENT ============
     with st.expander("Proporsi Revenue per RFM Segment"):
 
-        # Pastikan numerik
-        df["TotalAmount"] = pd.to_numeric(
-            df["TotalAmount"], errors="coerce"
-        )
+        # Revenue + persentase per segment (tabel agregat snapshot)
+        segment_revenue = tables["segment_revenue"]
 
-        # Agregasi revenue per segment
-        segment_revenue = (
-            df.groupby("RFM_Segment")
-            .agg(TotalRevenue=("TotalAmount", "sum"))
-            .reset_index()
-        )
-
-        # Hitung persentase
-        total_revenue = segment_revenue["TotalRevenue"].sum()
-        segment_revenue["Percentage"] = (
-            segment_revenue["TotalRevenue"] / total_revenue * 100
-        )
-
-        # Pie / Donut chart
-        fig_pie = px.pie(
-            segment_revenue,
-            names="RFM_Segment",
-            values="TotalRevenue",
-            hole=0.45,  # donut style
-            title="Proporsi Revenue Berdasarkan RFM Segment"
-        )
-
-        fig_pie.update_traces(
-            textinfo="percent+label",
-            hovertemplate=
-                "<b>%{label}</b><br>" +
-                "Revenue: £%{value:,.0f}<br>" +
-                "Persentase: %{percent}<extra></extra>"
-        )
-
-        fig_pie.update_layout(
-            height=500
-        )
-
-        st.plotly_chart(fig_pie, use_container_width=True)
+        # Pie / Donut chart (pre-render)
+        st.plotly_chart(figures.get("segment_revenue"), use_container_width=True)
 
         # ===== INSIGHT OTOMATIS =====
         top_segment = segment_revenue.loc[
@@ -1025,38 +721,8 @@ with tab_rfm:
     #======== AOV PER RFM SEGMENT ============
     with st.expander("Average Order Value (AOV) per RFM Segment"):
 
-        # ===== Pastikan tipe data =====
-        df["TotalAmount"] = pd.to_numeric(df["TotalAmount"], errors="coerce")
-        df["CustomerID"] = df["CustomerID"].astype(str)
-        df["InvoiceNo"] = df["InvoiceNo"].astype(str)
-
-        # ===== AOV per Customer =====
-        aov_customer = (
-            df
-            .dropna(subset=["RFM_Segment"])
-            .groupby(["CustomerID", "RFM_Segment"])
-            .agg(
-                TotalRevenue=("TotalAmount", "sum"),
-                TotalOrders=("InvoiceNo", "nunique")
-            )
-            .reset_index()
-        )
-
-        aov_customer["AOV"] = (
-            aov_customer["TotalRevenue"] / aov_customer["TotalOrders"]
-        )
-
-        # ===== AOV per Segment =====
-        aov_segment = (
-            aov_customer
-            .groupby("RFM_Segment")
-            .agg(
-                Avg_AOV=("AOV", "mean"),
-                Customer_Count=("CustomerID", "nunique")
-            )
-            .reset_index()
-            .sort_values("Avg_AOV", ascending=False)
-        )
+        # ===== AOV per Segment (avg, median, persentil; dari cache) =====
+        aov_segment = aov_engine.segment_summary()
 
         if aov_segment.empty:
             st.warning("Data AOV tidak tersedia.")
@@ -1067,7 +733,7 @@ with tab_rfm:
                 y="Avg_AOV",
                 color="RFM_Segment",
                 text=aov_segment["Avg_AOV"].apply(lambda x: f"£{x:,.2f}"),
-                custom_data=["Customer_Count"],
+                custom_data=["Customer_Count", "Median_AOV", "P25_AOV", "P75_AOV"],
                 color_discrete_sequence=px.colors.qualitative.Set3,
                 title="Average Order Value (AOV) per RFM Segment"
             )
@@ -1077,6 +743,8 @@ with tab_rfm:
                 hovertemplate=
                     "<b>%{x}</b><br>" +
                     "Average AOV: £%{y:,.2f}<br>" +
+                    "Median AOV: £%{customdata[1]:,.2f}<br>" +
+                    "P25–P75: £%{customdata[2]:,.2f} – £%{customdata[3]:,.2f}<br>" +
                     "Jumlah Customer: %{customdata[0]:,}<extra></extra>"
             )
 
@@ -1097,64 +765,47 @@ with tab_rfm:
                 f"""
                 **Insight AOV per Segment:**
                 - Segment dengan **AOV tertinggi**: `{top_seg['RFM_Segment']}`  
-                Rata-rata AOV: **£{top_seg['Avg_AOV']:,.2f}**
+                Rata-rata AOV: **£{top_seg['Avg_AOV']:,.2f}** (median £{top_seg['Median_AOV']:,.2f})
 
                 - Segment dengan **AOV terendah**: `{low_seg['RFM_Segment']}`  
-                Rata-rata AOV: **£{low_seg['Avg_AOV']:,.2f}**
+                Rata-rata AOV: **£{low_seg['Avg_AOV']:,.2f}** (median £{low_seg['Median_AOV']:,.2f})
                 """
             )
 
+    #======== CUSTOMER LIFETIME VALUE PER RFM SEGMENT ============
+    with st.expander("Customer Lifetime Value (CLV) per RFM Segment"):
+        # ===== CLV per segment (model BG/NBD + Gamma-Gamma, tabel agregat snapshot) =====
+        segment_clv = tables["segment_clv"]
+
+        if segment_clv.empty:
+            st.warning("CLV belum tersedia.")
+        else:
+            # ===== Bar chart (pre-render) =====
+            st.plotly_chart(figures.get("segment_clv"), use_container_width=True)
+
+            # ===== INSIGHT OTOMATIS =====
+            top_clv = segment_clv.iloc[0]
+            st.success(
+                f"**Segment dengan rata-rata CLV tertinggi: `{top_clv['RFM_Segment']}`**\n"
+                f"- Rata-rata CLV {config.CLV_HORIZON_MONTHS} bulan: **£{top_clv['AvgCLV']:,.0f}**\n"
+                f"- Rata-rata peluang masih aktif: **{top_clv['AvgProbAlive']:.0%}**"
+            )
+
     #======== TOP 5 NEGARA PER RFM SEGMENT ============
     with st.expander("Top 5 Negara Berdasarkan RFM Segment"):
 
         # Dropdown RFM Segment
         selected_segment = st.selectbox(
             "Pilih RFM Segment:",
-            sorted(df["RFM_Segment"].dropna().unique()),
+            sorted(tables["segment_rows"]),
             key="selected_rfm_segment_country"
         )
 
-        # Filter data sesuai segment
-        seg_country = df[df["RFM_Segment"] == selected_segment]
-
-        # ===== Agregasi: jumlah customer unik per negara =====
-        country_segment = (
-            seg_country
-            .groupby("Country")
-            .agg(
-                Customer_Count=("CustomerID", "nunique")
-            )
-            .reset_index()
-            .sort_values("Customer_Count", ascending=False)
-            .head(5)
-        )
-
-        # ===== Bar chart =====
-        fig_country = px.bar(
-            country_segment,
-            x="Country",
-            y="Customer_Count",
-            text="Customer_Count",
-            color="Country",
-            color_discrete_sequence=px.colors.qualitative.Set3,
-            title=f"Top 5 Negara – Segment {selected_segment}"
-        )
+        # ===== Top 5 negara (customer unik) segment terpilih (tabel agregat snapshot) =====
+        country_segment = tables["top_countries_by_segment"][selected_segment]
 
-        fig_country.update_traces(
-            textposition="outside",
-            hovertemplate=
-                "<b>%{x}</b><br>" +
-                "Jumlah Customer: %{y:,}<extra></extra>"
-        )
-
-        fig_country.update_layout(
-            xaxis_title="Negara",
-            yaxis_title="Jumlah Customer Unik",
-            showlegend=False,
-            height=450
-        )
-
-        st.plotly_chart(fig_country, use_container_width=True)
+        # ===== Bar chart (dibangun sekali untuk semua sesi) =====
+        st.plotly_chart(figures.get("segment_countries", selected_segment), use_container_width=True)
 
         # ===== INSIGHT OTOMATIS =====
         if not country_segment.empty:
@@ -1173,15 +824,10 @@ with tab_rfm:
     #======== TOP 5 PRODUK PER RFM SEGMENT ============
     with st.expander("Top 5 Produk Berdasarkan RFM Segment"):
 
-        # ===== Pastikan tipe data =====
-        df["CustomerID"] = df["CustomerID"].astype(str)
-        df["Quantity"] = pd.to_numeric(df["Quantity"], errors="coerce")
-        df["TotalAmount"] = pd.to_numeric(df["TotalAmount"], errors="coerce")
-
         # ===== Dropdown Segment =====
         selected_segment = st.selectbox(
             "Pilih RFM Segment:",
-            sorted(df["RFM_Segment"].dropna().unique()),
+            sorted(tables["segment_rows"]),
             key="selected_rfm_segment_product"
         )
 
@@ -1192,71 +838,12 @@ with tab_rfm:
             key="selected_product_metric"
         )
 
-        # ===== Filter data sesuai segment =====
-        seg_product = df[df["RFM_Segment"] == selected_segment]
-
-        # ===== Agregasi produk =====
-        if metric_option == "Revenue":
-            product_segment = (
-                seg_product
-                .groupby("Description")
-                .agg(
-                    TotalRevenue=("TotalAmount", "sum")
-                )
-                .reset_index()
-                .sort_values("TotalRevenue", ascending=False)
-                .head(5)
-            )
-
-            y_col = "TotalRevenue"
-            y_label = "Total Revenue (£)"
-            title = f"Top 5 Produk – Segment {selected_segment} (by Revenue)"
-            text_format = lambda x: f"£{x:,.0f}"
-
-        else:  # Quantity
-            product_segment = (
-                seg_product
-                .groupby("Description")
-                .agg(
-                    TotalQuantity=("Quantity", "sum")
-                )
-                .reset_index()
-                .sort_values("TotalQuantity", ascending=False)
-                .head(5)
-            )
+        # ===== Top 5 produk dari tabel top-N =====
+        y_col = "TotalRevenue" if metric_option == "Revenue" else "TotalQuantity"
+        product_segment = topn.top(y_col, 5, segment=selected_segment)
 
-            y_col = "TotalQuantity"
-            y_label = "Total Quantity"
-            title = f"Top 5 Produk – Segment {selected_segment} (by Quantity)"
-            text_format = lambda x: f"{int(x):,}"
-
-        # ===== Bar chart =====
-        fig_product = px.bar(
-            product_segment,
-            x="Description",
-            y=y_col,
-            text=product_segment[y_col].apply(text_format),
-            color="Description",
-            color_discrete_sequence=px.colors.qualitative.Set3,
-            title=title
-        )
-
-        fig_product.update_traces(
-            textposition="outside",
-            hovertemplate=
-                "<b>%{x}</b><br>" +
-                f"{y_label}: %{{y:,}}<extra></extra>"
-        )
-
-        fig_product.update_layout(
-            xaxis_title="Produk",
-            yaxis_title=y_label,
-            showlegend=False,
-            height=500,
-            xaxis_tickangle=-45
-        )
-
-        st.plotly_chart(fig_product, use_container_width=True)
+        # ===== Bar chart (dibangun sekali untuk semua sesi) =====
+        st.plotly_chart(figures.get("segment_products", selected_segment, metric_option), use_container_width=True)
 
         # ===== INSIGHT OTOMATIS =====
         if not product_segment.empty:
@@ -1272,46 +859,76 @@ with tab_rfm:
         else:
             st.warning("Tidak ada data produk untuk segment ini.")
 
-#======== TAB CLUSTERING ANALYSIS ============ 
-with tab_clustering:
-    st.subheader("ANALISIS PELANGGAN BERDASARKAN CLUSTERING SEGMENTATION")
-    #======== DISTRIBUSI CUSTOMER PER CLUSTER ============
-    with st.expander("Distribusi Pelanggan Berdasarkan Cluster"):
-        # ===== Hitung jumlah customer unik per cluster =====
-        cluster_dist = (
-            data
-            .groupby("Cluster")["CustomerID"]
-            .nunique()
-            .reset_index(name="Customer_Count")
-            .sort_values("Customer_Count", ascending=False)
-        )
+    #======== CARI PELANGGAN (FEATURE STORE) ============
+    with st.expander("Cari Pelanggan"):
 
-        # ===== Bar Chart =====
-        fig_cluster = px.bar(
-            cluster_dist,
-            x="Cluster",
-            y="Customer_Count",
-            text="Customer_Count",
-            color="Cluster",
-            color_discrete_sequence=px.colors.qualitative.Set2,
-            title="Distribusi Customer Berdasarkan Cluster"
+        # ===== Lookup berdasarkan CustomerID (bisa lebih dari satu) =====
+        customer_query = st.text_input(
+            "Masukkan CustomerID (pisahkan dengan koma):",
+            key="customer_lookup_ids"
         )
 
-        fig_cluster.update_traces(
-            textposition="outside",
-            hovertemplate=
-                "<b>Cluster %{x}</b><br>" +
-                "Jumlah Customer: %{y:,}<extra></extra>"
-        )
+        query_ids = [cid.strip() for cid in customer_query.split(",") if cid.strip()]
+        if query_ids:
+            found = customer_store.get_many(query_ids)
+            missing = len(query_ids) - len(found)
 
-        fig_cluster.update_layout(
-            xaxis_title="Cluster",
-            yaxis_title="Jumlah Customer Unik",
-            showlegend=False,
-            height=450
+            if found.empty:
+                st.warning("CustomerID tidak ditemukan.")
+            else:
+                st.dataframe(found, use_container_width=True, hide_index=True)
+                if missing:
+                    st.info(f"{missing} CustomerID tidak ditemukan.")
+
+                # ===== Produk teratas customer (matriks pembelian customer x produk) =====
+                if len(found) == 1:
+                    customer_id = found["CustomerID"].iloc[0]
+                    st.caption(f"Produk dengan revenue terbesar untuk customer {customer_id}:")
+                    st.dataframe(
+                        snapshot["purchases"].customer_products(customer_id, "revenue", n=10),
+                        use_container_width=True,
+                        hide_index=True
+                    )
+
+        # ===== Range scan berdasarkan score =====
+        score_col = st.selectbox(
+            "Cari Berdasarkan:",
+            customer_store.score_columns,
+            key="customer_scan_column"
         )
 
-        st.plotly_chart(fig_cluster, use_container_width=True)
+        bounds = customer_store.score_bounds(score_col)
+
+        if bounds is None:
+            st.warning(f"Belum ada pelanggan dengan nilai {score_col}.")
+        else:
+            score_min, score_max = map(float, bounds)
+            if score_min < score_max:
+                score_range = st.slider(
+                    f"Rentang {score_col}:",
+                    min_value=score_min,
+                    max_value=score_max,
+                    value=(score_min, score_max),
+                    key="customer_scan_range"
+                )
+            else:
+                # semua customer bernilai sama: slider tidak bisa dibuat
+                score_range = (score_min, score_max)
+
+            scanned = shared("customer_scan", customer_store.scan, score_col, score_range[0], score_range[1], 100)
+            st.caption(f"Menampilkan maksimal 100 pelanggan dengan {score_col} tertinggi pada rentang ini.")
+            st.dataframe(scanned, use_container_width=True, hide_index=True)
+
+#======== TAB CLUSTERING ANALYSIS ============ 
+with tab_clustering:
+    st.subheader("ANALISIS PELANGGAN BERDASARKAN CLUSTERING SEGMENTATION")
+    #======== DISTRIBUSI CUSTOMER PER CLUSTER ============
+    with st.expander("Distribusi Pelanggan Berdasarkan Cluster"):
+        # ===== Jumlah customer unik per cluster (tabel agregat snapshot) =====
+        cluster_dist = tables["cluster_distribution"]
+
+        # ===== Bar Chart (pre-render) =====
+        st.plotly_chart(figures.get("cluster_distribution"), use_container_width=True)
 
         # ===== INSIGHT OTOMATIS =====
         top_cluster = cluster_dist.iloc[0]
@@ -1319,7 +936,7 @@ with tab_clustering:
         st.success(
             f"""
             **Insight Distribusi Cluster**
-            - Cluster dengan jumlah customer terbanyak: **Cluster {top_cluster['Cluster']}**
+            - Cluster dengan jumlah customer terbanyak: **{cluster_labels.title(top_cluster['Cluster'])}**
             - Total customer: **{int(top_cluster['Customer_Count']):,}**
             """
         )
@@ -1327,57 +944,16 @@ with tab_clustering:
     #======== GROUPED BAR CHART NILAI RFM ASLI PER SCORE ============
     with st.expander("Distribusi Nilai RFM Asli Berdasarkan Score per Cluster"):
 
-        # ===== Pastikan numerik =====
-        for col in ["Recency", "Frequency", "Monetary", "R_Score", "F_Score", "M_Score"]:
-            data[col] = pd.to_numeric(data[col], errors="coerce")
-
         # ===== Dropdown Cluster =====
         selected_cluster = st.selectbox(
             "Pilih Cluster:",
-            sorted(data["Cluster"].dropna().unique()),
+            sorted(tables["cluster_scores"]),
+            format_func=cluster_labels.title,
             key="cluster_rfm_raw_score"
         )
 
-        # ===== Filter cluster =====
-        df_cluster = data[data["Cluster"] == selected_cluster].copy()
-
-        plot_rows = []
-
-        # ===== Loop score 1–5 =====
-        for score in range(1, 6):
-
-            r_val = df_cluster[df_cluster["R_Score"] == score]["Recency"].count()
-            f_val = df_cluster[df_cluster["F_Score"] == score]["Frequency"].count()
-            m_val = df_cluster[df_cluster["M_Score"] == score]["Monetary"].count()
-
-            plot_rows.extend([
-                {
-                    "Score": f"Score {score}",
-                    "Metric": "Recency",
-                    "Value": r_val,
-                    "Total_R": r_val,
-                    "Total_F": f_val,
-                    "Total_M": m_val
-                },
-                {
-                    "Score": f"Score {score}",
-                    "Metric": "Frequency",
-                    "Value": f_val,
-                    "Total_R": r_val,
-                    "Total_F": f_val,
-                    "Total_M": m_val
-                },
-                {
-                    "Score": f"Score {score}",
-                    "Metric": "Monetary",
-                    "Value": m_val,
-                    "Total_R": r_val,
-                    "Total_F": f_val,
-                    "Total_M": m_val
-                },
-            ])
-
-        plot_df = pd.DataFrame(plot_rows)
+        # ===== Jumlah customer per score 1–5 (tabel agregat snapshot) =====
+        plot_df = tables["cluster_scores"][selected_cluster]
 
         # ===== BAR CHART =====
         fig = px.bar(
@@ -1387,7 +963,7 @@ with tab_clustering:
             color="Metric",
             barmode="group",
             custom_data=["Total_R", "Total_F", "Total_M"],
-            title=f"Distribusi Nilai RFM Asli per Score – Cluster {selected_cluster}",
+            title=f"Distribusi Nilai RFM Asli per Score – {cluster_labels.title(selected_cluster)}",
             color_discrete_map={
                 "Recency": "#1f77b4",
                 "Frequency": "#ff7f0e",
@@ -1426,43 +1002,11 @@ with tab_clustering:
 
     #======== PIE CHART: PROPORSI REVENUE PER CLUSTER ============
     with st.expander("Proporsi Revenue per Cluster"):
-        # ===== Agregasi revenue per cluster =====
-        cluster_revenue = (
-            data
-            .dropna(subset=["Cluster"])
-            .groupby("Cluster")
-            .agg(TotalRevenue=("TotalAmount_total", "sum"))
-            .reset_index()
-        )
+        # ===== Revenue + persentase per cluster (tabel agregat snapshot) =====
+        cluster_revenue = tables["cluster_revenue"]
 
-        # ===== Hitung persentase =====
-        total_revenue = cluster_revenue["TotalRevenue"].sum()
-        cluster_revenue["Percentage"] = (
-            cluster_revenue["TotalRevenue"] / total_revenue * 100
-        )
-
-        # ===== Pie / Donut chart =====
-        fig_pie = px.pie(
-            cluster_revenue,
-            names="Cluster",
-            values="TotalRevenue",
-            hole=0.45,  # donut style
-            title="Proporsi Revenue Berdasarkan Cluster"
-        )
-
-        fig_pie.update_traces(
-            textinfo="percent+label",
-            hovertemplate=
-                "<b>Cluster %{label}</b><br>" +
-                "Revenue: £%{value:,.0f}<br>" +
-                "Persentase: %{percent}<extra></extra>"
-        )
-
-        fig_pie.update_layout(
-            height=500
-        )
-
-        st.plotly_chart(fig_pie, use_container_width=True)
+        # ===== Pie / Donut chart (pre-render) =====
+        st.plotly_chart(figures.get("cluster_revenue"), use_container_width=True)
 
         # ===== INSIGHT OTOMATIS =====
         top_cluster = cluster_revenue.loc[
@@ -1471,7 +1015,7 @@ with tab_clustering:
 
         st.success(
             f"""
-            **Cluster dengan kontribusi revenue terbesar: Cluster {int(top_cluster['Cluster'])}**
+            **Cluster dengan kontribusi revenue terbesar: {cluster_labels.title(top_cluster['Cluster'])}**
             - Total Revenue: **£{top_cluster['TotalRevenue']:,.0f}**
             - Kontribusi: **{top_cluster['Percentage']:.1f}%**
             """
@@ -1479,56 +1023,43 @@ with tab_clustering:
 
     #======== BAR CHART: TOTAL QUANTITY PER CLUSTER ============
     with st.expander("Total Quantity per Cluster"):
-        # ===== Agregasi total quantity per cluster =====
-        cluster_quantity = (
-            data
-            .dropna(subset=["Cluster"])
-            .groupby("Cluster")
-            .agg(
-                TotalQuantity=("Quantity_total", "sum")
-            )
-            .reset_index()
-            .sort_values("TotalQuantity", ascending=False)
-        )
+        # ===== Total quantity per cluster (tabel agregat snapshot) =====
+        cluster_quantity = tables["cluster_quantity"]
 
         if cluster_quantity.empty:
             st.warning("Data quantity tidak tersedia.")
         else:
-            # ===== BAR CHART =====
-            fig_qty = px.bar(
-                cluster_quantity,
-                x="Cluster",
-                y="TotalQuantity",
-                text=cluster_quantity["TotalQuantity"].apply(lambda x: f"{int(x):,}"),
-                title="Total Quantity Berdasarkan Cluster",
-                color="Cluster",
-                color_discrete_sequence=px.colors.qualitative.Set3
-            )
+            # ===== BAR CHART (pre-render) =====
+            st.plotly_chart(figures.get("cluster_quantity"), use_container_width=True)
 
-            fig_qty.update_traces(
-                textposition="outside",
-                hovertemplate=
-                    "<b>Cluster %{x}</b><br>" +
-                    "Total Quantity: %{y:,}<extra></extra>"
-            )
+            # ===== INSIGHT OTOMATIS =====
+            top_cluster = cluster_quantity.iloc[0]
 
-            fig_qty.update_layout(
-                xaxis_title="Cluster",
-                yaxis_title="Total Quantity",
-                plot_bgcolor="white",
-                height=450,
-                showlegend=False
+            st.success(
+                f"""
+                **Cluster dengan total quantity tertinggi: {cluster_labels.title(top_cluster['Cluster'])}**
+                - Total Quantity: **{int(top_cluster['TotalQuantity']):,}**
+                """
             )
 
-            st.plotly_chart(fig_qty, use_container_width=True)
+    # ================= CUSTOMER LIFETIME VALUE PER CLUSTER =================
+    with st.expander("Customer Lifetime Value (CLV) per Cluster"):
+        # ===== CLV per cluster (tabel agregat snapshot) =====
+        cluster_clv = tables["cluster_clv"]
 
-            # ===== INSIGHT OTOMATIS =====
-            top_cluster = cluster_quantity.iloc[0]
+        if cluster_clv.empty:
+            st.warning("CLV belum tersedia.")
+        else:
+            # ===== BAR CHART (pre-render) =====
+            st.plotly_chart(figures.get("cluster_clv"), use_container_width=True)
 
+            # ===== INSIGHT OTOMATIS =====
+            top_cluster = cluster_clv.iloc[0]
             st.success(
                 f"""
-                **Cluster dengan total quantity tertinggi: Cluster {int(top_cluster['Cluster'])}**
-                - Total Quantity: **{int(top_cluster['TotalQuantity']):,}**
+                **Cluster dengan rata-rata CLV tertinggi: {cluster_labels.title(top_cluster['Cluster'])}**
+                - Rata-rata CLV {config.CLV_HORIZON_MONTHS} bulan: **£{top_cluster['AvgCLV']:,.0f}**
+                - Total CLV: **£{top_cluster['TotalCLV']:,.0f}**
                 """
             )
 
@@ -1537,62 +1068,12 @@ with tab_clustering:
 
         axis_option = st.selectbox(
             "Pilih Kombinasi Sumbu:",
-            [
-                "Monetary vs Recency",
-                "Monetary vs Frequency",
-                "Frequency vs Recency"
-            ],
+            list(SCATTER_AXES),
             key="axis_option_cluster_scatter"  # 🔑 WAJIB UNIK
         )
 
-        if axis_option == "Monetary vs Recency":
-            x_col, y_col = "Recency", "Monetary"
-        elif axis_option == "Monetary vs Frequency":
-            x_col, y_col = "Frequency", "Monetary"
-        else:
-            x_col, y_col = "Recency", "Frequency"
-
-        # ===== WARNA CLUSTER (FIXED) =====
-        cluster_colors = {
-            0: "#D61355",  # merah
-            1: "#F94A29",  # oranye / kuning
-            2: "#3EC70B",  # hijau
-            3: "#1F6AE1"   # biru
-        }
-
-        fig = px.scatter(
-            data,
-            x=x_col,
-            y=y_col,
-            color="Cluster",
-            color_discrete_map=cluster_colors,
-            opacity=0.75,
-            title=f"Scatter Plot {y_col} vs {x_col}",
-            hover_data=["CustomerID", "Recency", "Frequency", "Monetary"]
-        )
-
-        # ===== LOG SCALE KHUSUS MONETARY =====
-        if x_col == "Monetary":
-            fig.update_xaxes(type="log", title="Monetary (log scale)")
-        if y_col == "Monetary":
-            fig.update_yaxes(type="log", title="Monetary (log scale)")
-
-        fig.update_layout(
-            plot_bgcolor="white",
-            height=550,
-            legend_title_text="Cluster"
-        )
-
-        fig.update_traces(
-            marker=dict(size=7),
-            hovertemplate=
-                "<b>CustomerID:</b> %{customdata[0]}<br>" +
-                f"<b>{x_col}:</b> %{{x:,.0f}}<br>" +
-                f"<b>{y_col}:</b> %{{y:,.0f}}<br>" +
-                "<b>Cluster:</b> %{marker.color}<extra></extra>"
-        )
-
-        st.plotly_chart(fig, use_container_width=True)
+        # ===== Warna cluster dari label cluster stabil (cluster_labels.json) =====
+        st.plotly_chart(figures.get("cluster_scatter", axis_option), use_container_width=True)
 
     # ========== STACKED BAR: RFM SEGMENT vs CLUSTER ==========
     with st.expander("Distribusi RFM Segment dalam Cluster"):
@@ -1600,24 +1081,12 @@ with tab_clustering:
         # ===== Dropdown Cluster =====
         selected_cluster = st.selectbox(
             "Pilih Cluster:",
-            sorted(data["Cluster"].dropna().unique())
+            sorted(tables["cluster_segments"]),
+            format_func=cluster_labels.title
         )
 
-        # ===== Filter cluster =====
-        cluster_data = (
-            data[data["Cluster"] == selected_cluster]
-            .dropna(subset=["RFM_Segment"])
-            .groupby("RFM_Segment")
-            .agg(Customer_Count=("CustomerID", "nunique"))
-            .reset_index()
-            .sort_values("Customer_Count", ascending=False)
-        )
-
-        # ===== Hitung persentase =====
-        total_customer = cluster_data["Customer_Count"].sum()
-        cluster_data["Percentage"] = (
-            cluster_data["Customer_Count"] / total_customer * 100
-        )
+        # ===== Komposisi segment dalam cluster (tabel agregat snapshot) =====
+        cluster_data = tables["cluster_segments"][selected_cluster]
 
         # ===== Stacked Bar (single cluster → segment composition) =====
         fig_stack = px.bar(
@@ -1626,7 +1095,7 @@ with tab_clustering:
             y="Customer_Count",
             text=cluster_data["Percentage"].apply(lambda x: f"{x:.1f}%"),
             color="RFM_Segment",
-            title=f"Komposisi RFM Segment pada Cluster {selected_cluster}"
+            title=f"Komposisi RFM Segment pada {cluster_labels.title(selected_cluster)}"
         )
 
         fig_stack.update_traces(
@@ -1651,12 +1120,254 @@ with tab_clustering:
 
         st.info(
             f"""
-            **Insight Cluster {selected_cluster}:**
+            **Insight {cluster_labels.title(selected_cluster)}**
             - Didominasi oleh segment **{dominant_segment['RFM_Segment']}**
             - Proporsi: **{dominant_segment['Percentage']:.1f}%**
             """
         )
 
+    # ========== TRANSAKSI PER CLUSTER (PRODUK / NEGARA / BULAN) ==========
+    with st.expander("Transaksi per Cluster Berdasarkan Produk, Negara, dan Bulan"):
+        # Label cluster per baris transaksi dari kode customer (tanpa join)
+        breakdown_dimension = st.radio(
+            "Dimensi:",
+            list(tables["cluster_breakdowns"]),
+            horizontal=True,
+            key="cluster_breakdown_dimension"
+        )
+
+        # Plot (dimensi default sudah di-render oleh cache warmer)
+        st.plotly_chart(figures.get("cluster_breakdown", breakdown_dimension), use_container_width=True)
+
+        # ===== Teratas per cluster =====
+        breakdown = tables["cluster_breakdowns"][breakdown_dimension]
+        breakdown_column = breakdown.columns[1]
+        best_per_cluster = breakdown.loc[breakdown.groupby("Cluster")["TotalRevenue"].idxmax()]
+        st.dataframe(
+            best_per_cluster.assign(Cluster=cluster_labels.titles(best_per_cluster["Cluster"])),
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                breakdown_column: f"{breakdown_dimension} Teratas",
+                "TotalRevenue": st.column_config.NumberColumn("Total Revenue", format="£%.0f"),
+            }
+        )
+
+    # ========== MARKET BASKET: PRODUK YANG SERING DIBELI BERSAMAAN ==========
+    with st.expander("Produk yang Sering Dibeli Bersamaan (Market Basket)"):
+        basket = snapshot["basket"]
+
+        # ===== Dropdown dimensi + grup =====
+        basket_dimension = st.radio(
+            "Kelompok Pelanggan:",
+            ["Cluster", "RFM Segment"],
+            horizontal=True,
+            key="basket_dimension"
+        )
+        dimension = "cluster" if basket_dimension == "Cluster" else "segment"
+        selected_group = st.selectbox(
+            f"Pilih {basket_dimension}:",
+            basket.groups(dimension),
+            format_func=cluster_labels.title if dimension == "cluster" else str,
+            key="basket_group"
+        )
+
+        # ===== Rule dengan lift tertinggi (hasil mining di cache warmer) =====
+        rules = basket.rules(dimension, selected_group, n=10)
+        n_invoices = basket.basket_counts.get((dimension, selected_group), 0)
+
+        if rules.empty:
+            st.warning(
+                f"Tidak ada association rule untuk {basket_dimension} {selected_group} "
+                f"({n_invoices:,} invoice, support minimum {basket.params['min_support']:.1%})."
+            )
+        else:
+            rules = rules.assign(
+                Rule=rules["AntecedentDescription"] + " → " + rules["ConsequentDescription"]
+            )
+
+            # ===== Bar chart lift =====
+            fig_basket = px.bar(
+                rules.iloc[::-1],
+                x="Lift",
+                y="Rule",
+                orientation="h",
+                color="Confidence",
+                color_continuous_scale="Blues",
+                custom_data=["Support", "Confidence", "Count"],
+                title=f"Top {len(rules)} Association Rule – {basket_dimension} {selected_group}"
+            )
+
+            fig_basket.update_traces(
+                hovertemplate=
+                    "<b>%{y}</b><br>" +
+                    "Lift: %{x:.2f}<br>" +
+                    "Support: %{customdata[0]:.2%}<br>" +
+                    "Confidence: %{customdata[1]:.1%}<br>" +
+                    "Jumlah Invoice: %{customdata[2]:,}<extra></extra>"
+            )
+
+            fig_basket.update_layout(
+                xaxis_title="Lift",
+                yaxis_title="",
+                height=500
+            )
+
+            st.plotly_chart(fig_basket, use_container_width=True)
+
+            # ===== Tabel rule =====
+            st.dataframe(
+                rules[["Rule", "Count", "Support", "Confidence", "Lift"]],
+                hide_index=True,
+                use_container_width=True
+            )
+
+            # ===== INSIGHT OTOMATIS =====
+            top_rule = rules.iloc[0]
+
+            st.success(
+                f"""
+                **Insight Cross-Selling {basket_dimension} {selected_group}**
+                - Customer yang membeli **{top_rule['AntecedentDescription']}** cenderung juga membeli **{top_rule['ConsequentDescription']}**
+                - Confidence: **{top_rule['Confidence']:.1%}**, Lift: **{top_rule['Lift']:.2f}x** (dari {n_invoices:,} invoice)
+                """
+            )
+
+    # ========== CUSTOMER SERUPA (LOOKALIKE) ==========
+    with st.expander("Cari Customer Serupa (Lookalike)"):
+        neighbors = snapshot["neighbors"]
+
+        if neighbors is None:
+            st.warning(f"Bundle model `{config.BUNDLE_PATH}` tidak ditemukan.")
+        else:
+            # ===== Pilih seed =====
+            seed_type = st.radio(
+                "Seed:",
+                ["Customer", "Cluster", "RFM Segment"],
+                horizontal=True,
+                key="lookalike_seed_type"
+            )
+            k_similar = st.slider("Jumlah customer serupa (K):", 5, 50, 10, key="lookalike_k")
+
+            if seed_type == "Customer":
+                seed_query = st.text_input(
+                    "Masukkan CustomerID seed (pisahkan dengan koma):",
+                    key="lookalike_customer_ids"
+                )
+                seed_ids = [cid.strip() for cid in seed_query.split(",") if cid.strip()]
+                similar = (
+                    shared("lookalike_customers", neighbors.similar_to_customers, tuple(seed_ids), k_similar)
+                    if seed_ids else None
+                )
+            else:
+                column = "Cluster" if seed_type == "Cluster" else "RFM_Segment"
+                seed_group = st.selectbox(
+                    f"Pilih {seed_type}:",
+                    sorted(neighbors.customers[column].dropna().unique()),
+                    format_func=cluster_labels.title if column == "Cluster" else str,
+                    key="lookalike_group"
+                )
+                similar = shared("lookalike_group", neighbors.similar_to_group, column, seed_group, k_similar)
+
+            # ===== Hasil =====
+            if similar is None:
+                st.caption("Masukkan CustomerID untuk mencari customer serupa.")
+            elif similar.empty:
+                st.warning("Seed tidak ditemukan.")
+            else:
+                st.dataframe(similar, use_container_width=True, hide_index=True)
+                st.caption(
+                    f"Jarak Euclidean di ruang fitur model ({', '.join(neighbors.feature_names)})"
+                    + (f"; mode approximate (eps={neighbors.eps:g})." if neighbors.approximate else ".")
+                )
+
+    # ========== PERPINDAHAN CUSTOMER ANTAR SNAPSHOT (CHURN & DRIFT) ==========
+    with st.expander("Perpindahan Customer Antar Snapshot Segmentasi (Churn & Drift)"):
+        drift_monitor = snapshot["drift"]
+        drift_history = shared("drift_history", drift_monitor.history)
+
+        if drift_history.empty:
+            st.info(
+                "Baru ada satu snapshot segmentasi. Perbandingan muncul setelah "
+                f"`{get_source('segmentation')}` diperbarui (mis. setelah retraining)."
+            )
+        else:
+            latest_diff = shared("drift_latest", drift_monitor.latest)
+            summary = latest_diff["summary"]
+
+            # ===== Tren antar snapshot =====
+            trend = drift_history.melt(
+                id_vars="RecordedAt",
+                value_vars=["new", "lost", "segment_changed", "cluster_changed", "downgraded"],
+                var_name="Metric",
+                value_name="Customers"
+            )
+            fig_trend = px.line(
+                trend,
+                x="RecordedAt",
+                y="Customers",
+                color="Metric",
+                markers=True,
+                title="Perpindahan Customer per Snapshot"
+            )
+            fig_trend.update_layout(xaxis_title="Waktu Snapshot", yaxis_title="Jumlah Customer", height=400)
+            st.plotly_chart(fig_trend, use_container_width=True)
+
+            # ===== Matriks transisi snapshot terakhir =====
+            drift_dimension = st.radio(
+                "Transisi:",
+                ["Cluster", "RFM Segment"],
+                horizontal=True,
+                key="drift_dimension"
+            )
+            prefix = "cluster" if drift_dimension == "Cluster" else "segment"
+            transitions = latest_diff[f"{prefix}_transitions"]
+
+            fig_transition = px.imshow(
+                transitions,
+                text_auto=True,
+                color_continuous_scale="Blues",
+                labels=dict(x=f"{drift_dimension} Baru", y=f"{drift_dimension} Lama", color="Customer"),
+                title=f"Matriks Transisi {drift_dimension} (Snapshot Terakhir)"
+            )
+            fig_transition.update_layout(height=500)
+            st.plotly_chart(fig_transition, use_container_width=True)
+
+            # ===== Pergeseran populasi =====
+            shift = latest_diff[f"{prefix}_shift"]
+            fig_shift = px.bar(
+                shift,
+                x=shift["Label"].astype(str),
+                y="Delta",
+                color="Delta",
+                color_continuous_scale="RdYlGn",
+                custom_data=["Previous", "Current", "PSI"],
+                title=f"Perubahan Jumlah Customer per {drift_dimension}"
+            )
+            fig_shift.update_traces(
+                hovertemplate=
+                    "<b>%{x}</b><br>" +
+                    "Sebelumnya: %{customdata[0]:,}<br>" +
+                    "Sekarang: %{customdata[1]:,}<br>" +
+                    "PSI: %{customdata[2]:.4f}<extra></extra>"
+            )
+            fig_shift.update_layout(xaxis_title=drift_dimension, yaxis_title="Selisih Customer", height=400)
+            st.plotly_chart(fig_shift, use_container_width=True)
+
+            # ===== Drift centroid =====
+            st.caption("Drift centroid per cluster (dalam satuan standar deviasi snapshot sebelumnya):")
+            st.dataframe(latest_diff["centroid_drift"], use_container_width=True, hide_index=True)
+
+            # ===== INSIGHT OTOMATIS =====
+            st.success(
+                f"""
+                **Ringkasan Snapshot Terakhir**
+                - Customer hilang: **{summary['lost']:,}**, customer baru: **{summary['new']:,}**
+                - Pindah cluster: **{summary['cluster_changed']:,}**, turun RFM Score: **{summary['downgraded']:,}**
+                - PSI segment: **{summary['segment_psi']:.3f}**, PSI cluster: **{summary['cluster_psi']:.3f}**
+                """
+            )
+
 #======== TAB INTERPRETASI ============ 
 with tab_insight:
     # ================= SCATTER PLOT PER CLUSTER (DROPDOWN) =================
@@ -1684,17 +1395,10 @@ with tab_insight:
         selected_cluster = st.selectbox(
             "Pilih Cluster:",
             sorted(data["Cluster"].dropna().unique()),
+            format_func=cluster_labels.title,
             key="cluster_scatter_single"
         )
 
-        # ===== Warna cluster (KONSISTEN) =====
-        cluster_colors = {
-            0: "#D61355",  # merah
-            1: "#F94A29",  # oranye
-            2: "#FCE22A",  # kuning
-            3: "#30E3DF"   # biru
-        }
-
         # ===== Filter data cluster =====
         df_cluster = data[data["Cluster"] == selected_cluster]
 
@@ -1703,9 +1407,9 @@ with tab_insight:
             df_cluster,
             x=x_col,
             y=y_col,
-            color_discrete_sequence=[cluster_colors.get(selected_cluster, "#999999")],
+            color_discrete_sequence=[cluster_labels.color(selected_cluster)],
             opacity=0.75,
-            title=f"Scatter Plot {y_col} vs {x_col} — Cluster {selected_cluster}",
+            title=f"Scatter Plot {y_col} vs {x_col} — {cluster_labels.title(selected_cluster)}",
             hover_data=["CustomerID", "Recency", "Frequency", "Monetary"]
         )
 
@@ -1740,50 +1444,94 @@ with tab_insight:
         # ===== INSIGHT PER CLUSTER =====
         st.subheader("Insight Cluster")
 
-        cluster_insights = {
-        0: """
-        *Cluster 0: High Value But At Risk*
-
-        Cluster ini berisi pelanggan bernilai tinggi dengan intensitas transaksi yang kuat,
-        namun menunjukkan indikasi penurunan aktivitas. Dominasi segmen Loyal Customer
-        dan Can’t Lose Them menandakan risiko churn yang signifikan jika tidak dikelola
-        secara proaktif. Strategi yang tepat adalah pendekatan personal, win-back campaign,
-        dan penawaran eksklusif untuk mempertahankan nilai mereka.
-        """,
-
-        1: """
-        *Cluster 1: VIP Customers*
-
-        Cluster ini merepresentasikan pelanggan terbaik perusahaan yang didominasi segmen
-        Champions. Mereka memiliki nilai transaksi tinggi, konsistensi pembelian yang stabil,
-        dan loyalitas kuat. Fokus utama pada cluster ini adalah mempertahankan hubungan jangka
-        panjang melalui program loyalitas, upselling, dan cross-selling.
-        """,
-
-        2: """
-        *Cluster 2: Mass Customers*
-
-        Cluster ini mencakup mayoritas pelanggan dengan nilai transaksi rendah hingga menengah.
-        Banyak di antaranya berada pada fase tidak aktif atau berisiko churn. Meskipun kontribusi
-        per pelanggan relatif kecil, cluster ini menjadi basis volume transaksi. Strategi yang
-        disarankan adalah edukasi produk, promosi massal, dan reaktivasi ringan.
-        """,
-
-        3: """
-        *Cluster 3: High Value Active*
-
-        Cluster ini berisi pelanggan bernilai tinggi yang masih aktif dan stabil. Dominasi segmen
-        Champions dan Loyal Customers menunjukkan potensi pertumbuhan lanjutan. Pelanggan di
-        cluster ini ideal untuk strategi upselling, cross-selling, dan program loyalitas
-        berjenjang guna meningkatkan lifetime value.
-        """,
-        }
-
-        # Tampilkan insight sesuai cluster yang dipilih
-        st.info(cluster_insights.get(selected_cluster, "Insight belum tersedia untuk cluster ini."))
+        # Nama & insight dari label cluster stabil (cluster_labels.json)
+        cluster_insight = cluster_labels.insight(selected_cluster)
+        if cluster_insight:
+            st.info(f"*{cluster_labels.title(selected_cluster)}*\n\n{cluster_insight}")
+        else:
+            st.info("Insight belum tersedia untuk cluster ini.")
         
 
-
-
-
-
+    # ================= SIMULASI PROMOSI (WHAT-IF) =================
+    with st.expander("Simulasi Promosi (What-If) per Segment / Cluster"):
+        promotion = snapshot["promotion"]
+
+        promo_dimension = st.radio(
+            "Target promosi berdasarkan:",
+            list(PROMO_DIMENSIONS),
+            horizontal=True,
+            key="promo_dimension"
+        )
+        promo_column = PROMO_DIMENSIONS[promo_dimension]
+
+        # ===== Asumsi per grup (bisa diedit) =====
+        scenario = promotion.default_scenario(promo_dimension).reset_index()
+        scenario.insert(
+            1, "Nama",
+            cluster_labels.titles(scenario[promo_column]) if promo_column == "Cluster" else scenario[promo_column].astype(str)
+        )
+        scenario = st.data_editor(
+            scenario,
+            hide_index=True,
+            use_container_width=True,
+            disabled=[promo_column, "Nama"],
+            column_config={
+                "Target": st.column_config.CheckboxColumn("Target"),
+                "ResponseRate": st.column_config.NumberColumn("Response Rate", min_value=0.0, max_value=1.0, step=0.01, format="%.2f"),
+                "Uplift": st.column_config.NumberColumn("Uplift Belanja", min_value=0.0, step=0.01, format="%.2f"),
+                "UpliftSD": st.column_config.NumberColumn("Std. Uplift", min_value=0.0, step=0.01, format="%.2f"),
+                "CostPerCustomer": st.column_config.NumberColumn("Biaya / Customer (£)", min_value=0.0, format="%.2f"),
+                "IncentivePerResponder": st.column_config.NumberColumn("Insentif / Responder (£)", min_value=0.0, format="%.2f"),
+            },
+            key=f"promo_scenario_{promo_column}"
+        )
+        promo_draws = st.select_slider(
+            "Jumlah simulasi:",
+            sorted({1_000, 5_000, 20_000, 50_000, config.PROMO_DRAWS}),
+            value=config.PROMO_DRAWS,
+            key="promo_draws"
+        )
+
+        # ===== Simulasi (pool bersama, kunci = asumsi) =====
+        scenario_rows = tuple(
+            tuple(row) for row in scenario[[promo_column] + SCENARIO_COLUMNS].itertuples(index=False)
+        )
+        promo_summary, profit_draws = shared("promotion", promotion.summary, promo_dimension, scenario_rows, promo_draws)
+        total = promo_summary.loc["Total"]
+
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Tambahan Revenue", f"£{total['Revenue']:,.0f}")
+        col2.metric("Biaya", f"£{total['Cost']:,.0f}")
+        col3.metric("Profit", f"£{total['Profit']:,.0f}")
+        col4.metric("ROI", f"{total['ROI']:.0%}" if pd.notna(total["ROI"]) else "-")
+
+        # ===== Profit per grup (rata-rata, P5-P95) =====
+        per_group = promo_summary.drop(index="Total").reset_index()
+        per_group["Nama"] = scenario["Nama"].to_numpy()
+        fig_promo = px.bar(
+            per_group,
+            x="Nama",
+            y="Profit",
+            error_y=per_group["Profit_P95"] - per_group["Profit"],
+            error_y_minus=per_group["Profit"] - per_group["Profit_P5"],
+            color_discrete_sequence=["#FF8C00"],
+            title="Proyeksi Profit per Grup (rata-rata, P5-P95)"
+        )
+        fig_promo.update_layout(xaxis_title=promo_dimension, yaxis_title="Profit (£)", plot_bgcolor="white")
+        st.plotly_chart(fig_promo, use_container_width=True)
+
+        # ===== Distribusi profit total =====
+        fig_dist = px.histogram(
+            x=profit_draws,
+            nbins=60,
+            color_discrete_sequence=["#FFB74D"],
+            title="Distribusi Profit Total dari Semua Simulasi"
+        )
+        fig_dist.update_layout(xaxis_title="Profit (£)", yaxis_title="Jumlah Simulasi", plot_bgcolor="white")
+        st.plotly_chart(fig_dist, use_container_width=True)
+
+        st.caption(
+            f"{promo_draws:,} simulasi Monte Carlo. Peluang profit positif: {total['ProbProfit']:.0%}. "
+            "Uplift = kenaikan belanja customer yang merespons relatif terhadap Monetary-nya; "
+            "response rate diberi ketidakpastian Beta di sekitar asumsi."
+        )